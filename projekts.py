@@ -1,1255 +1,7526 @@
-import os
-import sqlite3
-import hashlib
-import matplotlib.pyplot as plt
-from flask import Flask, request, jsonify, render_template_string, session, redirect, url_for
-import requests
-from datetime import datetime
-import json
-import random
-
-# OOP principu izmantošana - klases definīcijas
-class User:
-    def __init__(self, username, password_hash, role):
-        self.username = username
-        self.password_hash = password_hash
-        self.role = role  # admin vai user
-    
-    def verify_password(self, password):
-        hashed = hashlib.sha256(password.encode()).hexdigest()
-        return hashed == self.password_hash
-    
-    @staticmethod
-    def hash_password(password):
-        return hashlib.sha256(password.encode()).hexdigest()
-
-class Team:
-    def __init__(self, id, name, city, coach):
-        self.id = id
-        self.name = name
-        self.city = city
-        self.coach = coach
-        self.players = []
-    
-    def add_player(self, player):
-        self.players.append(player)
-    
-    def get_team_stats(self):
-        # Aprēķina komandas vidējo statistiku
-        if not self.players:
-            return {"avg_points": 0, "avg_blocks": 0, "avg_serves": 0}
-        
-        avg_points = sum(player.stats.get("points", 0) for player in self.players) / len(self.players)
-        avg_blocks = sum(player.stats.get("blocks", 0) for player in self.players) / len(self.players)
-        avg_serves = sum(player.stats.get("serves", 0) for player in self.players) / len(self.players)
-        
-        return {
-            "avg_points": round(avg_points, 2),
-            "avg_blocks": round(avg_blocks, 2),
-            "avg_serves": round(avg_serves, 2)
-        }
-
-class Player:
-    def __init__(self, id, name, number, position, team_id):
-        self.id = id
-        self.name = name
-        self.number = number
-        self.position = position
-        self.team_id = team_id
-        self.stats = {"points": 0, "blocks": 0, "serves": 0, "games": 0}
-    
-    def update_stats(self, points, blocks, serves, games=1):
-        self.stats["points"] += points
-        self.stats["blocks"] += blocks
-        self.stats["serves"] += serves
-        self.stats["games"] += games
-    
-    def get_average_stats(self):
-        if self.stats["games"] == 0:
-            return {"avg_points": 0, "avg_blocks": 0, "avg_serves": 0}
-        
-        return {
-            "avg_points": round(self.stats["points"] / self.stats["games"], 2),
-            "avg_blocks": round(self.stats["blocks"] / self.stats["games"], 2),
-            "avg_serves": round(self.stats["serves"] / self.stats["games"], 2)
-        }
-
-class Match:
-    def __init__(self, id, team1_id, team2_id, date, score_team1, score_team2):
-        self.id = id
-        self.team1_id = team1_id
-        self.team2_id = team2_id
-        self.date = date
-        self.score_team1 = score_team1
-        self.score_team2 = score_team2
-    
-    def get_winner(self):
-        if self.score_team1 > self.score_team2:
-            return self.team1_id
-        elif self.score_team2 > self.score_team1:
-            return self.team2_id
-        else:
-            return None  # Neizšķirts
-
-class Database:
-    def __init__(self, db_name='volleyball.db'):
-        self.db_name = db_name
-        self.conn = None
-        self.cursor = None
-        
-    def connect(self):
-        self.conn = sqlite3.connect(self.db_name)
-        self.cursor = self.conn.cursor()
-        
-    def close(self):
-        if self.conn:
-            self.conn.close()
-            
-    def execute(self, query, params=()):
-        if not self.conn:
-            self.connect()
-        self.cursor.execute(query, params)
-        self.conn.commit()
-        return self.cursor
-        
-    def fetch_all(self, query, params=()):
-        if not self.conn:
-            self.connect()
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
-    
-    def fetch_one(self, query, params=()):
-        if not self.conn:
-            self.connect()
-        self.cursor.execute(query, params)
-        return self.cursor.fetchone()
-    
-    def initialize_db(self):
-        # Izveido tabulas, ja tās neeksistē
-        self.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT DEFAULT 'user'
-        )
-        ''')
-        
-        self.execute('''
-        CREATE TABLE IF NOT EXISTS teams (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            city TEXT,
-            coach TEXT
-        )
-        ''')
-        
-        self.execute('''
-        CREATE TABLE IF NOT EXISTS players (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            number INTEGER,
-            position TEXT,
-            team_id INTEGER,
-            FOREIGN KEY (team_id) REFERENCES teams (id)
-        )
-        ''')
-        
-        self.execute('''
-        CREATE TABLE IF NOT EXISTS matches (
-            id INTEGER PRIMARY KEY,
-            team1_id INTEGER,
-            team2_id INTEGER,
-            date TEXT,
-            score_team1 INTEGER,
-            score_team2 INTEGER,
-            FOREIGN KEY (team1_id) REFERENCES teams (id),
-            FOREIGN KEY (team2_id) REFERENCES teams (id)
-        )
-        ''')
-        
-        self.execute('''
-        CREATE TABLE IF NOT EXISTS player_stats (
-            id INTEGER PRIMARY KEY,
-            player_id INTEGER,
-            match_id INTEGER,
-            points INTEGER DEFAULT 0,
-            blocks INTEGER DEFAULT 0,
-            serves INTEGER DEFAULT 0,
-            FOREIGN KEY (player_id) REFERENCES players (id),
-            FOREIGN KEY (match_id) REFERENCES matches (id)
-        )
-        ''')
-        
-        # Pievieno admin lietotāju, ja tas vēl nav izveidots
-        admin_exists = self.fetch_one("SELECT COUNT(*) FROM users WHERE username = ?", ("admin",))
-        if admin_exists[0] == 0:
-            admin_password_hash = User.hash_password("admin123")
-            self.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", 
-                        ("admin", admin_password_hash, "admin"))
-        
-        # Pievieno testa datus, ja tabula teams ir tukša
-        teams_count = self.fetch_one("SELECT COUNT(*) FROM teams")[0]
-        if teams_count == 0:
-            self.insert_sample_data()
-    
-    def insert_sample_data(self):
-        # Komandas
-        teams = [
-            ("Lauvas", "Rīga", "Jānis Bērziņš"),
-            ("Tīģeri", "Daugavpils", "Andris Kalniņš"),
-            ("Vilki", "Liepāja", "Ieva Liepiņa"),
-            ("Lāči", "Ventspils", "Kārlis Ozols")
-        ]
-        
-        for team in teams:
-            self.execute("INSERT INTO teams (name, city, coach) VALUES (?, ?, ?)", team)
-        
-        # Spēlētāji
-        players = [
-            # Lauvas komanda
-            ("Artūrs Zariņš", 7, "Setter", 1),
-            ("Mārtiņš Liepa", 9, "Outside Hitter", 1),
-            ("Valdis Egle", 12, "Middle Blocker", 1),
-            
-            # Tīģeri komanda
-            ("Pēteris Briedis", 5, "Setter", 2),
-            ("Juris Kalns", 8, "Outside Hitter", 2),
-            ("Kristaps Lācis", 10, "Middle Blocker", 2),
-            
-            # Vilki komanda
-            ("Raivis Bērziņš", 3, "Setter", 3),
-            ("Uldis Priede", 11, "Outside Hitter", 3),
-            ("Gatis Kļava", 15, "Middle Blocker", 3),
-            
-            # Lāči komanda
-            ("Oskars Ziemelis", 2, "Setter", 4),
-            ("Edgars Linde", 6, "Outside Hitter", 4),
-            ("Normunds Kļaviņš", 14, "Middle Blocker", 4)
-        ]
-        
-        for player in players:
-            self.execute("INSERT INTO players (name, number, position, team_id) VALUES (?, ?, ?, ?)", player)
-        
-        # Spēles
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        matches = [
-            (1, 2, current_date, 3, 1),  # Lauvas vs Tīģeri
-            (3, 4, current_date, 2, 3),  # Vilki vs Lāči
-            (1, 3, current_date, 3, 0),  # Lauvas vs Vilki
-            (2, 4, current_date, 1, 3)   # Tīģeri vs Lāči
-        ]
-        
-        for match in matches:
-            self.execute("INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, ?, ?, ?)", match)
-        
-        # Spēlētāju statistika
-        # Nejauši ģenerēt statistiku katram spēlētājam katrā spēlē
-        for match_id in range(1, 5):
-            # Nosaka komandu ID, kas piedalās spēlē
-            match_data = self.fetch_one("SELECT team1_id, team2_id FROM matches WHERE id = ?", (match_id,))
-            team1_id, team2_id = match_data
-            
-            # Iegūst spēlētājus no abām komandām
-            team1_players = self.fetch_all("SELECT id FROM players WHERE team_id = ?", (team1_id,))
-            team2_players = self.fetch_all("SELECT id FROM players WHERE team_id = ?", (team2_id,))
-            
-            # Pievieno statistiku katram spēlētājam
-            for player_id in team1_players + team2_players:
-                points = random.randint(0, 15)
-                blocks = random.randint(0, 5)
-                serves = random.randint(0, 8)
-                
-                self.execute(
-                    "INSERT INTO player_stats (player_id, match_id, points, blocks, serves) VALUES (?, ?, ?, ?, ?)",
-                    (player_id[0], match_id, points, blocks, serves)
-                )
-
-# API klase sporta datu iegūšanai
-class SportsAPI:
-    def __init__(self):
-        self.base_url = "https://api.example.com/volleyball"  # Šis ir piemēra URL
-        self.api_key = "your_api_key"  # Šeit būtu jāievieto īstais API atslēga
-    
-    def get_recent_matches(self):
-        # Reālajā dzīvē šeit būtu API pieprasījums
-        # response = requests.get(f"{self.base_url}/matches/recent", headers={"Authorization": f"Bearer {self.api_key}"})
-        # return response.json()
-        
-        # Tā kā šī ir demonstrācija, atgriežam piemēra datus
-        return [
-            {"team1": "International Team A", "team2": "International Team B", "score": "3-2", "date": "2023-04-20"},
-            {"team1": "International Team C", "team2": "International Team D", "score": "3-0", "date": "2023-04-19"},
-            {"team1": "International Team E", "team2": "International Team F", "score": "2-3", "date": "2023-04-18"}
-        ]
-    
-    def get_player_info(self, player_name):
-        # Reālajā dzīvē šeit būtu API pieprasījums
-        # response = requests.get(f"{self.base_url}/players/{player_name}", headers={"Authorization": f"Bearer {self.api_key}"})
-        # return response.json()
-        
-        # Tā kā šī ir demonstrācija, atgriežam piemēra datus
-        return {
-            "name": player_name,
-            "rank": random.randint(1, 100),
-            "country": "International",
-            "height": f"{random.randint(180, 210)} cm",
-            "position": random.choice(["Setter", "Outside Hitter", "Middle Blocker", "Libero"]),
-            "career_points": random.randint(1000, 5000)
-        }
-
-# Flask lietotne
-app = Flask(__name__)
-app.secret_key = os.urandom(24)  # Drošai sessiju glabāšanai
-
-# Datubāzes instances izveidošana
-db = Database()
-db.initialize_db()
-
-# Sports API instances izveidošana
-sports_api = SportsAPI()
-
-# Pārbaudīt, vai lietotājs ir autentificēts
-def is_authenticated():
-    return 'username' in session
-
-# Pārbaudīt, vai lietotājam ir admin tiesības
-def is_admin():
-    if not is_authenticated():
-        return False
-    
-    user_data = db.fetch_one("SELECT role FROM users WHERE username = ?", (session['username'],))
-    if user_data and user_data[0] == 'admin':
-        return True
-    return False
-
-@app.route('/')
-def home():
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Volejbola Statistikas App</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
-            .container { width: 80%; margin: auto; padding: 20px; }
-            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
-            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
-            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
-            .menu a:hover { background-color: #555; }
-            .content { background-color: white; padding: 20px; border-radius: 5px; }
-            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Volejbola Statistikas Lietotne</h1>
-        </div>
-        <div class="menu">
-            <a href="/teams">Komandas</a>
-            <a href="/players">Spēlētāji</a>
-            <a href="/matches">Spēles</a>
-            <a href="/api-data">API Dati</a>
-            <a href="/logout" style="float: right;">Iziet</a>
-        </div>
-        <div class="container">
-            <div class="content">
-                <div class="section">
-                    <h2>Komandas informācija</h2>
-                    <p><strong>Nosaukums:</strong> {{ team_name }}</p>
-                    <p><strong>Pilsēta:</strong> {{ team_city }}</p>
-                    <p><strong>Treneris:</strong> {{ team_coach }}</p>
-                </div>
-                
-                <div class="section">
-                    <h2>Spēlētāji</h2>
-                    {% if is_admin %}
-                    <p><a href="/player/add/{{ team_id }}" class="btn">Pievienot jaunu spēlētāju</a></p>
-                    {% endif %}
-                    <table>
-                        <tr>
-                            <th>Nr.</th>
-                            <th>Vārds</th>
-                            <th>Pozīcija</th>
-                            <th>Spēles</th>
-                            <th>Punkti (vid.)</th>
-                            <th>Bloki (vid.)</th>
-                            <th>Serves (vid.)</th>
-                            <th>Darbības</th>
-                        </tr>
-                        {% for player in players %}
-                        <tr>
-                            <td>{{ player.number }}</td>
-                            <td>{{ player.name }}</td>
-                            <td>{{ player.position }}</td>
-                            <td>{{ player.games }}</td>
-                            <td>{{ player.total_points }} ({{ player.avg_points }})</td>
-                            <td>{{ player.total_blocks }} ({{ player.avg_blocks }})</td>
-                            <td>{{ player.total_serves }} ({{ player.avg_serves }})</td>
-                            <td>
-                                <a href="/player/{{ player.id }}" class="btn">Detaļas</a>
-                                {% if is_admin %}
-                                <a href="/player/edit/{{ player.id }}" class="btn">Rediģēt</a>
-                                {% endif %}
-                            </td>
-                        </tr>
-                        {% endfor %}
-                    </table>
-                </div>
-                
-                <div class="section">
-                    <h2>Spēles</h2>
-                    <table>
-                        <tr>
-                            <th>Datums</th>
-                            <th>Mājinieki</th>
-                            <th>Viesi</th>
-                            <th>Rezultāts</th>
-                            <th>Iznākums</th>
-                            <th>Darbības</th>
-                        </tr>
-                        {% for match in matches %}
-                        <tr>
-                            <td>{{ match.date }}</td>
-                            <td>{{ match.team1_name }}</td>
-                            <td>{{ match.team2_name }}</td>
-                            <td>{{ match.score }}</td>
-                            <td>{{ match.result }}</td>
-                            <td>
-                                <a href="/match/{{ match.id }}" class="btn">Detaļas</a>
-                            </td>
-                        </tr>
-                        {% endfor %}
-                    </table>
-                </div>
-            </div>
-        </div>
-        <div class="footer">
-            &copy; 2023 Volejbola Statistikas Lietotne
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(html, 
-                                team_id=team_id,
-                                team_name=name,
-                                team_city=city,
-                                team_coach=coach,
-                                players=players,
-                                matches=matches,
-                                is_admin=is_admin())
-
-@app.route('/players')
-def players():
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    players_data = db.fetch_all("""
-        SELECT p.id, p.name, p.number, p.position, t.name as team_name, t.id as team_id,
-            SUM(ps.points) as total_points, 
-            SUM(ps.blocks) as total_blocks, 
-            SUM(ps.serves) as total_serves,
-            COUNT(DISTINCT ps.match_id) as games_played
-        FROM players p
-        JOIN teams t ON p.team_id = t.id
-        LEFT JOIN player_stats ps ON p.id = ps.player_id
-        GROUP BY p.id
-        ORDER BY total_points DESC
-    """)
-    
-    players_list = []
-    for player_data in players_data:
-        player_id, name, number, position, team_name, team_id, points, blocks, serves, games = player_data
-        
-        # Aprēķina vidējos rādītājus
-        avg_points = round(points / games if games > 0 else 0, 2)
-        avg_blocks = round(blocks / games if games > 0 else 0, 2)
-        avg_serves = round(serves / games if games > 0 else 0, 2)
-        
-        players_list.append({
-            'id': player_id,
-            'name': name,
-            'number': number,
-            'position': position,
-            'team_name': team_name,
-            'team_id': team_id,
-            'total_points': points or 0,
-            'total_blocks': blocks or 0,
-            'total_serves': serves or 0,
-            'games': games or 0,
-            'avg_points': avg_points,
-            'avg_blocks': avg_blocks,
-            'avg_serves': avg_serves
-        })
-    
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Spēlētāji - Volejbola Statistikas App</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
-            .container { width: 80%; margin: auto; padding: 20px; }
-            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
-            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
-            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
-            .menu a:hover { background-color: #555; }
-            .content { background-color: white; padding: 20px; border-radius: 5px; }
-            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
-            table { width: 100%; border-collapse: collapse; }
-            table, th, td { border: 1px solid #ddd; }
-            th, td { padding: 12px; text-align: left; }
-            th { background-color: #444; color: white; }
-            tr:nth-child(even) { background-color: #f2f2f2; }
-            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
-            .btn:hover { background-color: #45a049; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Volejbola Spēlētāji</h1>
-        </div>
-        <div class="menu">
-            <a href="/">Sākums</a>
-            <a href="/teams">Komandas</a>
-            <a href="/players">Spēlētāji</a>
-            <a href="/matches">Spēles</a>
-            <a href="/api-data">API Dati</a>
-            <a href="/logout" style="float: right;">Iziet</a>
-        </div>
-        <div class="container">
-            <div class="content">
-                <h2>Spēlētāju saraksts</h2>
-                {% if is_admin %}
-                <p><a href="/player/add" class="btn">Pievienot jaunu spēlētāju</a></p>
-                {% endif %}
-                <table>
-                    <tr>
-                        <th>Nr.</th>
-                        <th>Vārds</th>
-                        <th>Pozīcija</th>
-                        <th>Komanda</th>
-                        <th>Spēles</th>
-                        <th>Punkti (vid.)</th>
-                        <th>Bloki (vid.)</th>
-                        <th>Serves (vid.)</th>
-                        <th>Darbības</th>
-                    </tr>
-                    {% for player in players %}
-                    <tr>
-                        <td>{{ player.number }}</td>
-                        <td>{{ player.name }}</td>
-                        <td>{{ player.position }}</td>
-                        <td><a href="/team/{{ player.team_id }}">{{ player.team_name }}</a></td>
-                        <td>{{ player.games }}</td>
-                        <td>{{ player.total_points }} ({{ player.avg_points }})</td>
-                        <td>{{ player.total_blocks }} ({{ player.avg_blocks }})</td>
-                        <td>{{ player.total_serves }} ({{ player.avg_serves }})</td>
-                        <td>
-                            <a href="/player/{{ player.id }}" class="btn">Detaļas</a>
-                            {% if is_admin %}
-                            <a href="/player/edit/{{ player.id }}" class="btn">Rediģēt</a>
-                            {% endif %}
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </table>
-            </div>
-        </div>
-        <div class="footer">
-            &copy; 2023 Volejbola Statistikas Lietotne
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(html, players=players_list, is_admin=is_admin())
-
-@app.route('/player/<int:player_id>')
-def player_details(player_id):
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    player_data = db.fetch_one("""
-        SELECT p.id, p.name, p.number, p.position, t.name as team_name, t.id as team_id
-        FROM players p
-        JOIN teams t ON p.team_id = t.id
-        WHERE p.id = ?
-    """, (player_id,))
-    
-    if not player_data:
-        return "Spēlētājs nav atrasts", 404
-    
-    player_id, name, number, position, team_name, team_id = player_data
-    
-    # Iegūst spēlētāja statistiku pa spēlēm
-    stats_data = db.fetch_all("""
-        SELECT ps.match_id, m.date, t1.name as team1_name, t2.name as team2_name, 
-            m.score_team1, m.score_team2, ps.points, ps.blocks, ps.serves
-        FROM player_stats ps
-        JOIN matches m ON ps.match_id = m.id
-        JOIN teams t1 ON m.team1_id = t1.id
-        JOIN teams t2 ON m.team2_id = t2.id
-        WHERE ps.player_id = ?
-        ORDER BY m.date DESC
-    """, (player_id,))
-    
-    stats = []
-    total_points = 0
-    total_blocks = 0
-    total_serves = 0
-    games_played = 0
-    
-    for stat in stats_data:
-        match_id, date, team1_name, team2_name, score_team1, score_team2, points, blocks, serves = stat
-        
-        # Aprēķina kopējo statistiku
-        total_points += points or 0
-        total_blocks += blocks or 0
-        total_serves += serves or 0
-        games_played += 1
-        
-        stats.append({
-            'match_id': match_id,
-            'date': date,
-            'match': f"{team1_name} vs {team2_name}",
-            'score': f"{score_team1}-{score_team2}",
-            'points': points or 0,
-            'blocks': blocks or 0,
-            'serves': serves or 0
-        })
-    
-    # Aprēķina vidējos rādītājus
-    avg_points = round(total_points / games_played if games_played > 0 else 0, 2)
-    avg_blocks = round(total_blocks / games_played if games_played > 0 else 0, 2)
-    avg_serves = round(total_serves / games_played if games_played > 0 else 0, 2)
-    
-    # Iegūst internacionālo statistiku no API
-    api_data = sports_api.get_player_info(name)
-    
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{{ player_name }} - Spēlētāja Detaļas</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
-            .container { width: 80%; margin: auto; padding: 20px; }
-            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
-            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
-            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
-            .menu a:hover { background-color: #555; }
-            .content { background-color: white; padding: 20px; border-radius: 5px; }
-            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
-            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-            table, th, td { border: 1px solid #ddd; }
-            th, td { padding: 12px; text-align: left; }
-            th { background-color: #444; color: white; }
-            tr:nth-child(even) { background-color: #f2f2f2; }
-            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
-            .btn:hover { background-color: #45a049; }
-            .section { margin-bottom: 30px; }
-            .player-info { display: flex; }
-            .player-details { flex: 1; }
-            .player-stats { flex: 1; padding-left: 20px; }
-            .api-section { background-color: #f9f9f9; padding: 15px; border-radius: 5px; margin-top: 20px; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>{{ player_name }} - Spēlētāja Detaļas</h1>
-        </div>
-        <div class="menu">
-            <a href="/">Sākums</a>
-            <a href="/teams">Komandas</a>
-            <a href="/players">Spēlētāji</a>
-            <a href="/matches">Spēles</a>
-            <a href="/api-data">API Dati</a>
-            <a href="/logout" style="float: right;">Iziet</a>
-        </div>
-        <div class="container">
-            <div class="content">
-                <div class="player-info">
-                    <div class="player-details">
-                        <h2>Spēlētāja informācija</h2>
-                        <p><strong>Vārds:</strong> {{ player_name }}</p>
-                        <p><strong>Numurs:</strong> {{ player_number }}</p>
-                        <p><strong>Pozīcija:</strong> {{ player_position }}</p>
-                        <p><strong>Komanda:</strong> <a href="/team/{{ team_id }}">{{ team_name }}</a></p>
-                    </div>
-                    <div class="player-stats">
-                        <h2>Kopējā statistika</h2>
-                        <p><strong>Spēles:</strong> {{ games_played }}</p>
-                        <p><strong>Kopējie punkti:</strong> {{ total_points }} (vidēji {{ avg_points }} spēlē)</p>
-                        <p><strong>Kopējie bloki:</strong> {{ total_blocks }} (vidēji {{ avg_blocks }} spēlē)</p>
-                        <p><strong>Kopējās serves:</strong> {{ total_serves }} (vidēji {{ avg_serves }} spēlē)</p>
-                    </div>
-                </div>
-                
-                <div class="api-section">
-                    <h2>Internacionālā statistika (API dati)</h2>
-                    <p><strong>Rangs:</strong> {{ api_data.rank }}</p>
-                    <p><strong>Valsts:</strong> {{ api_data.country }}</p>
-                    <p><strong>Augums:</strong> {{ api_data.height }}</p>
-                    <p><strong>Pozīcija:</strong> {{ api_data.position }}</p>
-                    <p><strong>Karjeras punkti:</strong> {{ api_data.career_points }}</p>
-                </div>
-                
-                <div class="section">
-                    <h2>Statistika pa spēlēm</h2>
-                    <table>
-                        <tr>
-                            <th>Datums</th>
-                            <th>Spēle</th>
-                            <th>Rezultāts</th>
-                            <th>Punkti</th>
-                            <th>Bloki</th>
-                            <th>Serves</th>
-                        </tr>
-                        {% for stat in stats %}
-                        <tr>
-                            <td>{{ stat.date }}</td>
-                            <td>{{ stat.match }}</td>
-                            <td>{{ stat.score }}</td>
-                            <td>{{ stat.points }}</td>
-                            <td>{{ stat.blocks }}</td>
-                            <td>{{ stat.serves }}</td>
-                        </tr>
-                        {% endfor %}
-                    </table>
-                </div>
-                
-                <div class="section">
-                    <h2>Statistikas vizualizācija</h2>
-                    <div id="chart-container">
-                        <img src="/player/{{ player_id }}/chart" alt="Spēlētāja statistikas grafiks" width="100%">
-                    </div>
-                </div>
-                
-                {% if is_admin %}
-                <div class="section">
-                    <a href="/player/edit/{{ player_id }}" class="btn">Rediģēt spēlētāju</a>
-                    <a href="/player/stats/add/{{ player_id }}" class="btn">Pievienot statistiku</a>
-                </div>
-                {% endif %}
-            </div>
-        </div>
-        <div class="footer">
-            &copy; 2023 Volejbola Statistikas Lietotne
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(html, 
-                                player_id=player_id,
-                                player_name=name,
-                                player_number=number,
-                                player_position=position,
-                                team_name=team_name,
-                                team_id=team_id,
-                                games_played=games_played,
-                                total_points=total_points,
-                                total_blocks=total_blocks,
-                                total_serves=total_serves,
-                                avg_points=avg_points,
-                                avg_blocks=avg_blocks,
-                                avg_serves=avg_serves,
-                                stats=stats,
-                                api_data=api_data,
-                                is_admin=is_admin())
-
-@app.route('/player/<int:player_id>/chart')
-def player_chart(player_id):
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    # Iegūst spēlētāja statistiku pa spēlēm
-    stats_data = db.fetch_all("""
-        SELECT ps.match_id, m.date, ps.points, ps.blocks, ps.serves
-        FROM player_stats ps
-        JOIN matches m ON ps.match_id = m.id
-        WHERE ps.player_id = ?
-        ORDER BY m.date
-    """, (player_id,))
-    
-    dates = []
-    points = []
-    blocks = []
-    serves = []
-    
-    for stat in stats_data:
-        match_id, date, point, block, serve = stat
-        dates.append(date)
-        points.append(point or 0)
-        blocks.append(block or 0)
-        serves.append(serve or 0)
-    
-    # Izveido grafiku
-    plt.figure(figsize=(10, 6))
-    plt.plot(dates, points, 'ro-', label='Punkti')
-    plt.plot(dates, blocks, 'go-', label='Bloki')
-    plt.plot(dates, serves, 'bo-', label='Serves')
-    plt.title(f'Spēlētāja statistika pa spēlēm')
-    plt.xlabel('Datums')
-    plt.ylabel('Vērtība')
-    plt.legend()
-    plt.grid(True)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    # Saglabā grafiku atmiņā
-    from io import BytesIO
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    
-    # Atgriež grafiku
-    from flask import send_file
-    return send_file(buffer, mimetype='image/png')
-
-@app.route('/matches')
-def matches():
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    matches_data = db.fetch_all("""
-        SELECT m.id, t1.name as team1_name, t2.name as team2_name, 
-            m.date, m.score_team1, m.score_team2
-        FROM matches m
-        JOIN teams t1 ON m.team1_id = t1.id
-        JOIN teams t2 ON m.team2_id = t2.id
-        ORDER BY m.date DESC
-    """)
-    
-    matches_list = []
-    for match in matches_data:
-        match_id, team1_name, team2_name, date, score_team1, score_team2 = match
-        
-        # Nosaka uzvarētāju
-        if score_team1 > score_team2:
-            winner = team1_name
-        elif score_team2 > score_team1:
-            winner = team2_name
-        else:
-            winner = "Neizšķirts"
-        
-        matches_list.append({
-            'id': match_id,
-            'team1_name': team1_name,
-            'team2_name': team2_name,
-            'date': date,
-            'score': f"{score_team1} - {score_team2}",
-            'winner': winner
-        })
-    
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Spēles - Volejbola Statistikas App</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
-            .container { width: 80%; margin: auto; padding: 20px; }
-            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
-            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
-            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
-            .menu a:hover { background-color: #555; }
-            .content { background-color: white; padding: 20px; border-radius: 5px; }
-            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
-            table { width: 100%; border-collapse: collapse; }
-            table, th, td { border: 1px solid #ddd; }
-            th, td { padding: 12px; text-align: left; }
-            th { background-color: #444; color: white; }
-            tr:nth-child(even) { background-color: #f2f2f2; }
-            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
-            .btn:hover { background-color: #45a049; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Volejbola Spēles</h1>
-        </div>
-        <div class="menu">
-            <a href="/">Sākums</a>
-            <a href="/teams">Komandas</a>
-            <a href="/players">Spēlētāji</a>
-            <a href="/matches">Spēles</a>
-            <a href="/api-data">API Dati</a>
-            <a href="/logout" style="float: right;">Iziet</a>
-        </div>
-        <div class="container">
-            <div class="content">
-                <h2>Spēļu saraksts</h2>
-                {% if is_admin %}
-                <p><a href="/match/add" class="btn">Pievienot jaunu spēli</a></p>
-                {% endif %}
-                <table>
-                    <tr>
-                        <th>Datums</th>
-                        <th>Mājinieki</th>
-                        <th>Viesi</th>
-                        <th>Rezultāts</th>
-                        <th>Uzvarētājs</th>
-                        <th>Darbības</th>
-                    </tr>
-                    {% for match in matches %}
-                    <tr>
-                        <td>{{ match.date }}</td>
-                        <td>{{ match.team1_name }}</td>
-                        <td>{{ match.team2_name }}</td>
-                        <td>{{ match.score }}</td>
-                        <td>{{ match.winner }}</td>
-                        <td>
-                            <a href="/match/{{ match.id }}" class="btn">Detaļas</a>
-                            {% if is_admin %}
-                            <a href="/match/edit/{{ match.id }}" class="btn">Rediģēt</a>
-                            {% endif %}
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </table>
-            </div>
-        </div>
-        <div class="footer">
-            &copy; 2023 Volejbola Statistikas Lietotne
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(html, matches=matches_list, is_admin=is_admin())
-
-@app.route('/match/<int:match_id>')
-def match_details(match_id):
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    match_data = db.fetch_one("""
-        SELECT m.id, t1.name as team1_name, t2.name as team2_name, t1.id as team1_id, t2.id as team2_id,
-            m.date, m.score_team1, m.score_team2
-        FROM matches m
-        JOIN teams t1 ON m.team1_id = t1.id
-        JOIN teams t2 ON m.team2_id = t2.id
-        WHERE m.id = ?
-    """, (match_id,))
-    
-    if not match_data:
-        return "Spēle nav atrasta", 404
-    
-    match_id, team1_name, team2_name, team1_id, team2_id, date, score_team1, score_team2 = match_data
-    
-    # Nosaka uzvarētāju
-    if score_team1 > score_team2:
-        winner = team1_name
-    elif score_team2 > score_team1:
-        winner = team2_name
-    else:
-        winner = "Neizšķirts"
-    
-    # Iegūst spēlētāju statistiku šajā spēlē
-    team1_stats = db.fetch_all("""
-        SELECT p.id, p.name, p.number, ps.points, ps.blocks, ps.serves
-        FROM player_stats ps
-        JOIN players p ON ps.player_id = p.id
-        WHERE ps.match_id = ? AND p.team_id = ?
-        ORDER BY ps.points DESC
-    """, (match_id, team1_id))
-    
-    team2_stats = db.fetch_all("""
-        SELECT p.id, p.name, p.number, ps.points, ps.blocks, ps.serves
-        FROM player_stats ps
-        JOIN players p ON ps.player_id = p.id
-        WHERE ps.match_id = ? AND p.team_id = ?
-        ORDER BY ps.points DESC
-    """, (match_id, team2_id))
-    
-    # Konvertē datus sarakstā
-    team1_players = []
-    team2_players = []
-    
-    for stat in team1_stats:
-        player_id, name, number, points, blocks, serves = stat
-        team1_players.append({
-            'id': player_id,
-            'name': name,
-            'number': number,
-            'points': points or 0,
-            'blocks': blocks or 0,
-            'serves': serves or 0
-        })
-    
-    for stat in team2_stats:
-        player_id, name, number, points, blocks, serves = stat
-        team2_players.append({
-            'id': player_id,
-            'name': name,
-            'number': number,
-            'points': points or 0,
-            'blocks': blocks or 0,
-            'serves': serves or 0
-        })
-    
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Spēles Detaļas - Volejbola Statistikas App</title>
-        <style>
-            body { font-family: Arial, sans-serif
-            <a href="/api-data">API Dati</a>
-            <a href="/logout" style="float: right;">Iziet</a>
-        </div>
-        <div class="container">
-            <div class="content">
-                <h2>Sveicināti, {{username}}!</h2>
-                <p>Šī lietotne ļauj jums aplūkot volejbola komandu, spēlētāju un spēļu statistiku.</p>
-                <p>Ko jūs vēlētos darīt šodien?</p>
-            </div>
-        </div>
-        <div class="footer">
-            &copy; 2023 Volejbola Statistikas Lietotne
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(html, username=session['username'])
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if request.method == 'POST':
-        username = request.form.get('username')
-        password = request.form.get('password')
-        
-        user_data = db.fetch_one("SELECT password_hash FROM users WHERE username = ?", (username,))
-        
-        if user_data and User.hash_password(password) == user_data[0]:
-            session['username'] = username
-            return redirect(url_for('home'))
-        else:
-            error_message = "Nepareizs lietotājvārds vai parole"
-            return render_template_string(LOGIN_HTML, error=error_message)
-    
-    return render_template_string(LOGIN_HTML)
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if request.method == 'POST':
-        username = request.form.get('username')
-        password = request.form.get('password')
-        confirm_password = request.form.get('confirm_password')
-        
-        if password != confirm_password:
-            error_message = "Paroles nesakrīt"
-            return render_template_string(REGISTER_HTML, error=error_message)
-        
-        # Pārbauda, vai lietotājvārds jau eksistē
-        user_exists = db.fetch_one("SELECT COUNT(*) FROM users WHERE username = ?", (username,))
-        if user_exists[0] > 0:
-            error_message = "Lietotājvārds jau eksistē"
-            return render_template_string(REGISTER_HTML, error=error_message)
-        
-        # Reģistrē jaunu lietotāju
-        password_hash = User.hash_password(password)
-        db.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
-        
-        session['username'] = username
-        return redirect(url_for('home'))
-    
-    return render_template_string(REGISTER_HTML)
-
-@app.route('/logout')
-def logout():
-    session.pop('username', None)
-    return redirect(url_for('login'))
-
-@app.route('/teams')
-def teams():
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    teams_data = db.fetch_all("SELECT id, name, city, coach FROM teams")
-    teams_list = []
-    
-    for team_data in teams_data:
-        team_id, name, city, coach = team_data
-        
-        # Iegūst komandas spēlētāju skaitu
-        player_count = db.fetch_one("SELECT COUNT(*) FROM players WHERE team_id = ?", (team_id,))[0]
-        
-        # Iegūst komandas spēļu rezultātus
-        wins = db.fetch_one("""
-            SELECT COUNT(*) FROM matches 
-            WHERE (team1_id = ? AND score_team1 > score_team2) OR (team2_id = ? AND score_team2 > score_team1)
-        """, (team_id, team_id))[0]
-        
-        losses = db.fetch_one("""
-            SELECT COUNT(*) FROM matches 
-            WHERE (team1_id = ? AND score_team1 < score_team2) OR (team2_id = ? AND score_team2 < score_team1)
-        """, (team_id, team_id))[0]
-        
-        teams_list.append({
-            'id': team_id,
-            'name': name,
-            'city': city,
-            'coach': coach,
-            'player_count': player_count,
-            'wins': wins,
-            'losses': losses
-        })
-    
-    html = '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Komandas - Volejbola Statistikas App</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
-            .container { width: 80%; margin: auto; padding: 20px; }
-            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
-            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
-            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
-            .menu a:hover { background-color: #555; }
-            .content { background-color: white; padding: 20px; border-radius: 5px; }
-            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
-            table { width: 100%; border-collapse: collapse; }
-            table, th, td { border: 1px solid #ddd; }
-            th, td { padding: 12px; text-align: left; }
-            th { background-color: #444; color: white; }
-            tr:nth-child(even) { background-color: #f2f2f2; }
-            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
-            .btn:hover { background-color: #45a049; }
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Volejbola Komandas</h1>
-        </div>
-        <div class="menu">
-            <a href="/">Sākums</a>
-            <a href="/teams">Komandas</a>
-            <a href="/players">Spēlētāji</a>
-            <a href="/matches">Spēles</a>
-            <a href="/api-data">API Dati</a>
-            <a href="/logout" style="float: right;">Iziet</a>
-        </div>
-        <div class="container">
-            <div class="content">
-                <h2>Komandu saraksts</h2>
-                {% if is_admin %}
-                <p><a href="/team/add" class="btn">Pievienot jaunu komandu</a></p>
-                {% endif %}
-                <table>
-                    <tr>
-                        <th>Nosaukums</th>
-                        <th>Pilsēta</th>
-                        <th>Treneris</th>
-                        <th>Spēlētāju skaits</th>
-                        <th>Uzvaras</th>
-                        <th>Zaudējumi</th>
-                        <th>Darbības</th>
-                    </tr>
-                    {% for team in teams %}
-                    <tr>
-                        <td>{{ team.name }}</td>
-                        <td>{{ team.city }}</td>
-                        <td>{{ team.coach }}</td>
-                        <td>{{ team.player_count }}</td>
-                        <td>{{ team.wins }}</td>
-                        <td>{{ team.losses }}</td>
-                        <td>
-                            <a href="/team/{{ team.id }}" class="btn">Detaļas</a>
-                            {% if is_admin %}
-                            <a href="/team/edit/{{ team.id }}" class="btn">Rediģēt</a>
-                            {% endif %}
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </table>
-            </div>
-        </div>
-        <div class="footer">
-            &copy; 2023 Volejbola Statistikas Lietotne
-        </div>
-    </body>
-    </html>
-    '''
-    return render_template_string(html, teams=teams_list, is_admin=is_admin())
-
-@app.route('/team/<int:team_id>')
-def team_details(team_id):
-    if not is_authenticated():
-        return redirect(url_for('login'))
-    
-    team_data = db.fetch_one("SELECT id, name, city, coach FROM teams WHERE id = ?", (team_id,))
-    if not team_data:
-        return "Komanda nav atrasta", 404
-    
-    team_id, name, city, coach = team_data
-    
-    # Iegūst komandas spēlētājus
-    players_data = db.fetch_all("""
-        SELECT p.id, p.name, p.number, p.position, 
-            SUM(ps.points) as total_points, 
-            SUM(ps.blocks) as total_blocks, 
-            SUM(ps.serves) as total_serves,
-            COUNT(DISTINCT ps.match_id) as games_played
-        FROM players p
-        LEFT JOIN player_stats ps ON p.id = ps.player_id
-        WHERE p.team_id = ?
-        GROUP BY p.id
-    """, (team_id,))
-    
-    players = []
-    for player_data in players_data:
-        player_id, player_name, number, position, points, blocks, serves, games = player_data
-        
-        # Aprēķina vidējos rādītājus
-        avg_points = round(points / games if games > 0 else 0, 2)
-        avg_blocks = round(blocks / games if games > 0 else 0, 2)
-        avg_serves = round(serves / games if games > 0 else 0, 2)
-        
-        players.append({
-            'id': player_id,
-            'name': player_name,
-            'number': number,
-            'position': position,
-            'total_points': points or 0,
-            'total_blocks': blocks or 0,
-            'total_serves': serves or 0,
-            'games': games or 0,
-            'avg_points': avg_points,
-            'avg_blocks': avg_blocks,
-            'avg_serves': avg_serves
-        })
-    
-    # Iegūst komandas spēļu informāciju
-    matches_data = db.fetch_all("""
-        SELECT m.id, t1.name as team1_name, t2.name as team2_name, 
-            m.date, m.score_team1, m.score_team2
-        FROM matches m
-        JOIN teams t1 ON m.team1_id = t1.id
-        JOIN teams t2 ON m.team2_id = t2.id
-        WHERE m.team1_id = ? OR m.team2_id = ?
-    """, (team_id, team_id))
-    
-    matches = []
-    for match_data in matches_data:
-        match_id, team1_name, team2_name, date, score_team1, score_team2 = match_data
-        
-        # Nosaka, vai komanda uzvarēja
-        if (team1_name == name and score_team1 > score_team2) or (team2_name == name and score_team2 > score_team1):
-            result = "Uzvara"
-        elif score_team1 == score_team2:
-            result = "Neizšķirts"
-        else:
-            result = "Zaudējums"
-        
-        matches.append({
-            'id': match_id,
-            'team1_name': team1_name,
-            'team2_name': team2_name,
-            'date': date,
-            'score': f"{score_team1} - {score_team2}",
-            'result': result
-        })
\ No newline at end of file
+import os
+import sqlite3
+import hashlib
+from matplotlib.figure import Figure
+import numpy as np
+from flask import Flask, request, jsonify, render_template_string, session, redirect, url_for, send_file, Response, has_request_context, g, stream_template_string, stream_with_context
+import click
+from itsdangerous import BadData
+import requests
+from datetime import datetime
+import json
+import random
+import re
+import time
+import logging
+import asyncio
+import socket
+import csv
+import cProfile
+import hmac
+import pstats
+import sys
+import mmap
+import multiprocessing
+import resource
+import struct
+import tempfile
+import threading
+from collections import deque, namedtuple, OrderedDict
+from queue import Queue, Full, Empty
+from functools import wraps
+from io import BytesIO, StringIO
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import RotatingFileHandler
+from urllib.parse import parse_qsl
+from simulation import simulate_season_chunk
+
+# OOP principu izmantošana - klases definīcijas
+class User:
+    def __init__(self, username, password_hash, role):
+        self.username = username
+        self.password_hash = password_hash
+        self.role = role  # admin vai user
+    
+    def verify_password(self, password):
+        hashed = hashlib.sha256(password.encode()).hexdigest()
+        return hashed == self.password_hash
+    
+    @staticmethod
+    def hash_password(password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+class Team:
+    def __init__(self, id, name, city, coach):
+        self.id = id
+        self.name = name
+        self.city = city
+        self.coach = coach
+        self.players = []
+    
+    def add_player(self, player):
+        self.players.append(player)
+    
+    def get_team_stats(self):
+        # Aprēķina komandas vidējo statistiku
+        if not self.players:
+            return {"avg_points": 0, "avg_blocks": 0, "avg_serves": 0}
+        
+        avg_points = sum(player.stats.get("points", 0) for player in self.players) / len(self.players)
+        avg_blocks = sum(player.stats.get("blocks", 0) for player in self.players) / len(self.players)
+        avg_serves = sum(player.stats.get("serves", 0) for player in self.players) / len(self.players)
+        
+        return {
+            "avg_points": round(avg_points, 2),
+            "avg_blocks": round(avg_blocks, 2),
+            "avg_serves": round(avg_serves, 2)
+        }
+
+class Player:
+    def __init__(self, id, name, number, position, team_id):
+        self.id = id
+        self.name = name
+        self.number = number
+        self.position = position
+        self.team_id = team_id
+        self.stats = {"points": 0, "blocks": 0, "serves": 0, "games": 0}
+    
+    def update_stats(self, points, blocks, serves, games=1):
+        self.stats["points"] += points
+        self.stats["blocks"] += blocks
+        self.stats["serves"] += serves
+        self.stats["games"] += games
+    
+    def get_average_stats(self):
+        if self.stats["games"] == 0:
+            return {"avg_points": 0, "avg_blocks": 0, "avg_serves": 0}
+        
+        return {
+            "avg_points": round(self.stats["points"] / self.stats["games"], 2),
+            "avg_blocks": round(self.stats["blocks"] / self.stats["games"], 2),
+            "avg_serves": round(self.stats["serves"] / self.stats["games"], 2)
+        }
+
+class Match:
+    def __init__(self, id, team1_id, team2_id, date, score_team1, score_team2):
+        self.id = id
+        self.team1_id = team1_id
+        self.team2_id = team2_id
+        self.date = date
+        self.score_team1 = score_team1
+        self.score_team2 = score_team2
+    
+    def get_winner(self):
+        if self.score_team1 > self.score_team2:
+            return self.team1_id
+        elif self.score_team2 > self.score_team1:
+            return self.team2_id
+        else:
+            return None  # Neizšķirts
+
+# Lēno SQL vaicājumu žurnāls: vaicājumi virs sliekšņa tiek ierakstīti rotējošā failā
+# kopā ar parametriem, izpildes plānu un maršrutu, un apkopoti admin lapai
+class SlowQueryLog:
+    def __init__(self, threshold_ms=100, log_path='logs/slow_queries.log', max_bytes=5 * 1024 * 1024,
+                 backup_count=5, max_statements=500):
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_statements = max_statements
+        self.lock = threading.Lock()
+        self.statements = {}
+        self.logger = None
+    
+    def get_logger(self):
+        # Fails un direktorija tiek izveidoti tikai pie pirmā lēnā vaicājuma
+        if self.logger is None:
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            handler = RotatingFileHandler(self.log_path, maxBytes=self.max_bytes,
+                                          backupCount=self.backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger = logging.getLogger(f'volleyball.slow_queries.{self.log_path}')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            self.logger = logger
+        return self.logger
+    
+    def get_route(self):
+        if has_request_context():
+            return f"{request.method} {request.endpoint or request.path}"
+        return threading.current_thread().name
+    
+    def record(self, conn, query, params, elapsed):
+        if elapsed < self.threshold:
+            return
+        
+        # Izpildes plāns ar atsevišķu kursoru, lai neizjauktu izsaucēja rezultātu
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+        except (sqlite3.Error, ValueError):
+            plan = []
+        
+        statement = ' '.join(query.split())
+        route = self.get_route()
+        self.get_logger().info(json.dumps({
+            'ms': round(elapsed * 1000, 2),
+            'route': route,
+            'sql': statement,
+            'params': [repr(param) for param in params] if isinstance(params, (list, tuple)) else repr(params),
+            'plan': plan
+        }, ensure_ascii=False))
+        
+        with self.lock:
+            entry = self.statements.get(statement)
+            if entry is None:
+                if len(self.statements) >= self.max_statements:
+                    # Izmet vaicājumu ar mazāko kopējo laiku, lai apkopojums nepieaugtu bez ierobežojuma
+                    del self.statements[min(self.statements, key=lambda key: self.statements[key]['total'])]
+                entry = self.statements[statement] = {'sql': statement, 'count': 0, 'total': 0.0,
+                                                      'max': 0.0, 'routes': set()}
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            entry['routes'].add(route)
+            entry['plan'] = plan
+    
+    def get_worst(self, limit=50):
+        with self.lock:
+            entries = sorted(self.statements.values(), key=lambda entry: entry['total'], reverse=True)[:limit]
+            return [{
+                'sql': entry['sql'],
+                'count': entry['count'],
+                'total_ms': round(entry['total'] * 1000, 1),
+                'avg_ms': round(entry['total'] / entry['count'] * 1000, 1),
+                'max_ms': round(entry['max'] * 1000, 1),
+                'routes': sorted(entry['routes']),
+                'plan': entry['plan']
+            } for entry in entries]
+    
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+
+class Database:
+    def __init__(self, db_name='volleyball.db', slow_log=None):
+        self.db_name = db_name
+        self.slow_log = slow_log
+        # SQLite savienojumu nevar lietot no cita pavediena, tāpēc katram pavedienam ir savs
+        self.local = threading.local()
+    
+    @property
+    def conn(self):
+        return getattr(self.local, 'conn', None)
+    
+    @property
+    def cursor(self):
+        return getattr(self.local, 'cursor', None)
+        
+    def connect(self):
+        self.local.conn = sqlite3.connect(self.db_name)
+        self.local.cursor = self.local.conn.cursor()
+        self.local.attached = set()
+        
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.local.conn = None
+            self.local.cursor = None
+            self.local.attached = set()
+            
+    def record_timing(self, query, params, start):
+        # Nodod izpildes laiku lēno vaicājumu žurnālam (ja tāds pievienots)
+        if self.slow_log:
+            self.slow_log.record(self.conn, query, params, time.perf_counter() - start)
+    
+    def execute(self, query, params=()):
+        if not self.conn:
+            self.connect()
+        start = time.perf_counter()
+        self.cursor.execute(query, params)
+        self.conn.commit()
+        self.record_timing(query, params, start)
+        return self.cursor
+        
+    def fetch_all(self, query, params=()):
+        if not self.conn:
+            self.connect()
+        start = time.perf_counter()
+        self.cursor.execute(query, params)
+        rows = self.cursor.fetchall()
+        self.record_timing(query, params, start)
+        return rows
+    
+    def fetch_one(self, query, params=()):
+        if not self.conn:
+            self.connect()
+        start = time.perf_counter()
+        self.cursor.execute(query, params)
+        row = self.cursor.fetchone()
+        self.record_timing(query, params, start)
+        return row
+    
+    def execute_many(self, query, rows):
+        if not self.conn:
+            self.connect()
+        start = time.perf_counter()
+        self.cursor.executemany(query, rows)
+        self.conn.commit()
+        # Plānam pietiek ar vaicājuma tekstu; parametru rindas jau ir patērētas
+        if self.slow_log:
+            self.slow_log.record(self.conn, query, (None,) * query.count('?'), time.perf_counter() - start)
+        return self.cursor
+        
+    def iter_rows(self, query, params=(), batch_size=1000):
+        # Straumē rezultātu pa daļām ar atsevišķu savienojumu, lai garš lasījums
+        # netraucētu kopīgajam kursoram un atmiņā vienlaikus būtu tikai viena daļa
+        conn = sqlite3.connect(self.db_name)
+        try:
+            # Vaicājums var lasīt arī no arhivētajām sezonām (sk. career_table)
+            self.attach_archives(conn, set())
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            conn.close()
+    
+    # Sezonu partīcijās glabātās tabulas un to kolonnas (kopīgas galvenajai un arhīva datubāzēm)
+    partition_columns = {
+        'matches': ('id', 'team1_id', 'team2_id', 'date', 'score_team1', 'score_team2'),
+        'player_stats': ('id', 'player_id', 'match_id', 'points', 'blocks', 'serves', 'team_id')
+    }
+    
+    def attach_archives(self, conn, attached):
+        # Pievieno savienojumam visas arhivētās sezonas, kas vēl nav pievienotas. SQLite pēc
+        # noklusējuma atļauj ne vairāk kā 10 pievienotas datubāzes (sk. SeasonPartitions.max_partitions)
+        for season, path in conn.execute("SELECT season, path FROM season_partitions ORDER BY season").fetchall():
+            if season not in attached:
+                conn.execute(f"ATTACH DATABASE ? AS season_{season}", (path,))
+                attached.add(season)
+                # Agrāk arhivētām sezonām nav spēlētāja komandas kolonnas
+                if 'team_id' not in [row[1] for row in conn.execute(f"PRAGMA season_{season}.table_info(player_stats)")]:
+                    conn.execute(f"ALTER TABLE season_{season}.player_stats ADD COLUMN team_id INTEGER")
+                    conn.execute(f"""
+                        UPDATE season_{season}.player_stats SET team_id = (
+                            SELECT team_id FROM main.players WHERE players.id = player_stats.player_id)
+                    """)
+                    conn.commit()
+        return sorted(attached)
+    
+    def season_table(self, table, season):
+        # Arhivētas sezonas lasījumi iet uz tās partīciju, visi pārējie - uz galveno (karsto) datubāzi
+        if not self.conn:
+            self.connect()
+        if season and self.fetch_one("SELECT 1 FROM season_partitions WHERE season = ?", (str(season),)):
+            self.attach_archives(self.conn, self.local.attached)
+            return f"season_{season}.{table}"
+        return f"main.{table}"
+    
+    def career_table(self, table):
+        # Visu sezonu apvienojums karjeras skatiem; bez arhīviem tā ir pati tabula
+        if not self.conn:
+            self.connect()
+        seasons = self.attach_archives(self.conn, self.local.attached)
+        if not seasons:
+            return f"main.{table}"
+        columns = ', '.join(self.partition_columns[table])
+        parts = [f"SELECT {columns} FROM main.{table}"]
+        parts.extend(f"SELECT {columns} FROM season_{season}.{table}" for season in seasons)
+        return f"({' UNION ALL '.join(parts)})"
+    
+    def add_column(self, schema, table, column, definition):
+        # Pievieno kolonnu esošai tabulai, ja tās vēl nav; atgriež True, ja kolonna tika pievienota
+        if not self.conn:
+            self.connect()
+        columns = [row[1] for row in self.conn.execute(f"PRAGMA {schema}.table_info({table})")]
+        if column in columns:
+            return False
+        self.conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {column} {definition}")
+        self.conn.commit()
+        return True
+    
+    def use_autoincrement(self, table):
+        # Pārbūvē tabulu ar AUTOINCREMENT primāro atslēgu (SQLite to nevar pievienot ar ALTER TABLE).
+        # Tabulas indeksi un trigeri tiek dzēsti kopā ar veco tabulu; initialize_db tos izveido no jauna
+        if not self.conn:
+            self.connect()
+        conn = self.conn
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+        if 'AUTOINCREMENT' in sql.upper():
+            return False
+        
+        # Arhivētās sezonas jau izmantojušas id, kas galvenajā tabulā vairs nav
+        archived_id = 0
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'season_partitions'").fetchone():
+            archived_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self.career_table(table)}").fetchone()[0]
+        
+        definition = sql[sql.index('('):].replace('PRIMARY KEY', 'PRIMARY KEY AUTOINCREMENT', 1)
+        columns = ', '.join(row[1] for row in conn.execute(f"PRAGMA table_info({table})"))
+        # Pārdēvējot netiek pārbaudīti citu tabulu trigeri, kas atsaucas uz šo tabulu
+        conn.execute("PRAGMA legacy_alter_table = ON")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"CREATE TABLE {table}_rebuild {definition}")
+            conn.execute(f"INSERT INTO {table}_rebuild ({columns}) SELECT {columns} FROM {table}")
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+            if not conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = ?", (table,)).fetchone():
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, 0)", (table,))
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (archived_id, table))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("PRAGMA legacy_alter_table = OFF")
+        return True
+    
+    def initialize_db(self):
+        # WAL režīmā lasītāji (arī rezerves kopēšana) nebloķē rakstītājus; režīms saglabājas datubāzes failā
+        self.execute("PRAGMA journal_mode=WAL")
+        
+        # Izveido tabulas, ja tās neeksistē
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'user'
+        )
+        ''')
+        
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            city TEXT,
+            coach TEXT
+        )
+        ''')
+        
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            number INTEGER,
+            position TEXT,
+            team_id INTEGER,
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        )
+        ''')
+        
+        # AUTOINCREMENT: pēc sezonas arhivēšanas galvenā tabula var būt tukša, bet jau izmantotie
+        # id (tie dzīvo arhīvā un atvasinātajās tabulās) nedrīkst tikt piešķirti atkārtoti
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team1_id INTEGER,
+            team2_id INTEGER,
+            date TEXT,
+            score_team1 INTEGER,
+            score_team2 INTEGER,
+            FOREIGN KEY (team1_id) REFERENCES teams (id),
+            FOREIGN KEY (team2_id) REFERENCES teams (id)
+        )
+        ''')
+        
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS player_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER,
+            match_id INTEGER,
+            points INTEGER DEFAULT 0,
+            blocks INTEGER DEFAULT 0,
+            serves INTEGER DEFAULT 0,
+            team_id INTEGER,
+            FOREIGN KEY (player_id) REFERENCES players (id),
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        )
+        ''')
+        # Komanda, par kuru spēlētājs spēlēja šajā spēlē (pēc pārejas players.team_id mainās).
+        # Vecākai datubāzei kolonnu pievieno un aizpilda ar pašreizējo komandu
+        if self.add_column('main', 'player_stats', 'team_id', 'INTEGER REFERENCES teams (id)'):
+            self.execute("""
+                UPDATE player_stats SET team_id = (SELECT team_id FROM players WHERE players.id = player_stats.player_id)
+            """)
+        
+        # Vecākā datubāzē tabulas izveidotas bez AUTOINCREMENT - tās tiek pārbūvētas
+        self.use_autoincrement('matches')
+        self.use_autoincrement('player_stats')
+        
+        # Spēļu saraksts tiek kārtots pēc datuma - ar indeksu rindas var straumēt bez kārtošanas
+        self.execute("CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (date)")
+
+        # Arhivēto sezonu partīcijas
+        self.create_partition_tables()
+
+        # Atvasinātās tabulas spēlētāju formai un tendencēm
+        self.create_trend_tables()
+
+        # Pilnteksta meklēšanas indekss
+        self.create_search_index()
+
+        # Komandu reitingi
+        self.create_rating_tables()
+
+        # Iepriekš uzzīmēto grafiku uzskaite
+        self.create_chart_tables()
+
+        # Izspēļu notikumi un statistika pa setiem
+        self.create_rally_tables()
+
+        # Savstarpējo spēļu matrica
+        self.create_h2h_tables()
+
+        # Izmaiņu žurnāls kešu un atvasināto datu atjaunošanai
+        self.create_change_feed()
+
+        # Spēlētāju līdzības indeksa izmaiņu uzskaite
+        self.create_similarity_tables()
+
+        # Pozīciju procentiļu skiču izmaiņu uzskaite
+        self.create_sketch_tables()
+
+        # Turnīra tabulas kumulatīvās summas pēc datuma
+        self.create_standings_tables()
+
+        # Pievieno admin lietotāju, ja tas vēl nav izveidots
+        admin_exists = self.fetch_one("SELECT COUNT(*) FROM users WHERE username = ?", ("admin",))
+        if admin_exists[0] == 0:
+            admin_password_hash = User.hash_password("admin123")
+            self.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", 
+                        ("admin", admin_password_hash, "admin"))
+        
+        # Pievieno testa datus, ja tabula teams ir tukša
+        teams_count = self.fetch_one("SELECT COUNT(*) FROM teams")[0]
+        if teams_count == 0:
+            self.insert_sample_data()
+    
+    def create_trend_tables(self):
+        # Viena rinda katrai spēlētāja spēlei ar datumu un iznākumu, lai pēdējās N spēles
+        # varētu nolasīt pa indeksu, neskenējot visu karjeru
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS player_form (
+            stat_id INTEGER PRIMARY KEY,
+            player_id INTEGER NOT NULL,
+            match_id INTEGER NOT NULL,
+            date TEXT,
+            season TEXT,
+            points INTEGER DEFAULT 0,
+            blocks INTEGER DEFAULT 0,
+            serves INTEGER DEFAULT 0,
+            won INTEGER DEFAULT 0,
+            drawn INTEGER DEFAULT 0
+        )
+        ''')
+        # Neizšķirtu spēļu pazīme vecākai datubāzei: rindas tiek pārrēķinātas zemāk
+        form_migrated = self.add_column('main', 'player_form', 'drawn', 'INTEGER DEFAULT 0')
+        if form_migrated:
+            # Trigeri ar iepriekšējo iznākuma aprēķinu tiek izveidoti no jauna
+            for trigger in ('trg_player_stats_form_insert', 'trg_player_stats_form_update', 'trg_matches_form_update'):
+                self.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        self.execute("CREATE INDEX IF NOT EXISTS idx_player_form_player_date ON player_form (player_id, date, stat_id)")
+        self.execute("CREATE INDEX IF NOT EXISTS idx_player_form_match ON player_form (match_id)")
+
+        # Sezonu kopsummas un uzvaru sērijas tiek uzturētas inkrementāli
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS player_season_stats (
+            player_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            games INTEGER DEFAULT 0,
+            points INTEGER DEFAULT 0,
+            blocks INTEGER DEFAULT 0,
+            serves INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            PRIMARY KEY (player_id, season)
+        ) WITHOUT ROWID
+        ''')
+
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS player_streaks (
+            player_id INTEGER PRIMARY KEY,
+            current_streak INTEGER DEFAULT 0,
+            best_streak INTEGER DEFAULT 0
+        )
+        ''')
+
+        # player_stats -> player_form. Iznākumu nosaka komanda no statistikas rindas
+        # (ja tā nav zināma - spēlētāja pašreizējā komanda)
+        form_insert = f'''
+            INSERT INTO player_form (stat_id, player_id, match_id, date, season, points, blocks, serves, won, drawn)
+            SELECT NEW.id, NEW.player_id, NEW.match_id, m.date, substr(m.date, 1, 4),
+                COALESCE(NEW.points, 0), COALESCE(NEW.blocks, 0), COALESCE(NEW.serves, 0),
+                {self.form_result_sql('m', 'COALESCE(NEW.team_id, p.team_id)')}
+            FROM matches m, players p
+            WHERE m.id = NEW.match_id AND p.id = NEW.player_id;
+        '''
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_stats_form_insert AFTER INSERT ON player_stats
+        BEGIN
+            {form_insert}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_stats_form_update AFTER UPDATE ON player_stats
+        BEGIN
+            DELETE FROM player_form WHERE stat_id = OLD.id;
+            {form_insert}
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_stats_form_delete AFTER DELETE ON player_stats
+        WHEN NOT (SELECT archiving FROM partition_state WHERE id = 1)
+        BEGIN
+            DELETE FROM player_form WHERE stat_id = OLD.id;
+        END
+        ''')
+        stat_team = '''COALESCE((SELECT ps.team_id FROM player_stats ps WHERE ps.id = player_form.stat_id),
+                    (SELECT p.team_id FROM players p WHERE p.id = player_form.player_id))'''
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_form_update
+        AFTER UPDATE OF date, team1_id, team2_id, score_team1, score_team2 ON matches
+        BEGIN
+            UPDATE player_form SET
+                date = NEW.date,
+                season = substr(NEW.date, 1, 4),
+                (won, drawn) = (SELECT {self.form_result_sql('NEW', stat_team)})
+            WHERE match_id = NEW.id;
+        END
+        ''')
+
+        # player_form -> player_season_stats
+        season_add = '''
+            INSERT INTO player_season_stats (player_id, season, games, points, blocks, serves, wins)
+            VALUES (NEW.player_id, NEW.season, 1, NEW.points, NEW.blocks, NEW.serves, NEW.won)
+            ON CONFLICT (player_id, season) DO UPDATE SET
+                games = games + 1,
+                points = points + excluded.points,
+                blocks = blocks + excluded.blocks,
+                serves = serves + excluded.serves,
+                wins = wins + excluded.wins;
+        '''
+        season_remove = '''
+            UPDATE player_season_stats SET
+                games = games - 1,
+                points = points - OLD.points,
+                blocks = blocks - OLD.blocks,
+                serves = serves - OLD.serves,
+                wins = wins - OLD.won
+            WHERE player_id = OLD.player_id AND season = OLD.season;
+            DELETE FROM player_season_stats
+            WHERE player_id = OLD.player_id AND season = OLD.season AND games <= 0;
+        '''
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_season_insert AFTER INSERT ON player_form
+        BEGIN
+            {season_add}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_season_delete AFTER DELETE ON player_form
+        BEGIN
+            {season_remove}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_season_update AFTER UPDATE ON player_form
+        BEGIN
+            {season_remove}
+            {season_add}
+        END
+        ''')
+
+        # player_form -> player_streaks. Jauna spēle karjeras beigās sēriju atjauno O(1),
+        # visos citos gadījumos (vēsturiski dati, labojumi, dzēšana) sērija tiek pārrēķināta
+        newer_exists = '''
+            SELECT 1 FROM player_form f
+            WHERE f.player_id = NEW.player_id AND (f.date, f.stat_id) > (NEW.date, NEW.stat_id)
+        '''
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_streak_append AFTER INSERT ON player_form
+        WHEN NOT EXISTS ({newer_exists})
+        BEGIN
+            INSERT OR IGNORE INTO player_streaks (player_id) VALUES (NEW.player_id);
+            UPDATE player_streaks SET
+                current_streak = CASE WHEN NEW.won THEN current_streak + 1 ELSE 0 END,
+                best_streak = MAX(best_streak, CASE WHEN NEW.won THEN current_streak + 1 ELSE 0 END)
+            WHERE player_id = NEW.player_id;
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_streak_backfill AFTER INSERT ON player_form
+        WHEN EXISTS ({newer_exists})
+        BEGIN
+            {self.streak_refresh_sql("NEW.player_id")}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_streak_update AFTER UPDATE ON player_form
+        BEGIN
+            {self.streak_refresh_sql("NEW.player_id")}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_streak_delete AFTER DELETE ON player_form
+        BEGIN
+            {self.streak_refresh_sql("OLD.player_id")}
+        END
+        ''')
+
+        # Aizpilda tabulas no jau esošās statistikas (piemēram, vecākai datubāzei)
+        self.execute(f'''
+            INSERT INTO player_form (stat_id, player_id, match_id, date, season, points, blocks, serves, won, drawn)
+            SELECT ps.id, ps.player_id, ps.match_id, m.date, substr(m.date, 1, 4),
+                COALESCE(ps.points, 0), COALESCE(ps.blocks, 0), COALESCE(ps.serves, 0),
+                {self.form_result_sql('m', 'COALESCE(ps.team_id, p.team_id)')}
+            FROM player_stats ps
+            JOIN matches m ON ps.match_id = m.id
+            JOIN players p ON ps.player_id = p.id
+            WHERE ps.id NOT IN (SELECT stat_id FROM player_form)
+            ORDER BY m.date, ps.id
+        ''')
+        if form_migrated:
+            # Arī arhivēto sezonu rindas: komanda no statistikas rindas vai pašreizējā
+            matches_table = self.career_table('matches')
+            career_team = f'''COALESCE((SELECT ps.team_id FROM {self.career_table('player_stats')} ps
+                        WHERE ps.id = player_form.stat_id),
+                    (SELECT p.team_id FROM players p WHERE p.id = player_form.player_id))'''
+            self.execute(f'''
+                UPDATE player_form SET (won, drawn) = (
+                    SELECT {self.form_result_sql('m', career_team)}
+                    FROM {matches_table} m WHERE m.id = player_form.match_id)
+                WHERE match_id IN (SELECT id FROM {matches_table})
+            ''')
+
+    def form_result_sql(self, match_ref, team):
+        # Spēlētāja komandas iznākums spēlē: (uzvara, neizšķirts); neizspēlēta spēle - (0, 0)
+        return f'''COALESCE(({match_ref}.team1_id = {team} AND {match_ref}.score_team1 > {match_ref}.score_team2)
+                    OR ({match_ref}.team2_id = {team} AND {match_ref}.score_team2 > {match_ref}.score_team1), 0),
+                COALESCE({team} IN ({match_ref}.team1_id, {match_ref}.team2_id)
+                    AND {match_ref}.score_team1 = {match_ref}.score_team2, 0)'''
+
+    def streak_refresh_sql(self, player_ref):
+        # Pilns uzvaru sērijas pārrēķins vienam spēlētājam (gaps-and-islands ar logu funkcijām)
+        return f'''
+            INSERT OR REPLACE INTO player_streaks (player_id, current_streak, best_streak)
+            SELECT {player_ref},
+                (SELECT COUNT(*) FROM player_form f
+                 WHERE f.player_id = {player_ref} AND f.won = 1 AND NOT EXISTS (
+                     SELECT 1 FROM player_form l
+                     WHERE l.player_id = {player_ref} AND l.won = 0
+                         AND (l.date, l.stat_id) > (f.date, f.stat_id))),
+                (SELECT COALESCE(MAX(run), 0) FROM (
+                     SELECT COUNT(*) AS run FROM (
+                         SELECT won,
+                             ROW_NUMBER() OVER (ORDER BY date, stat_id)
+                             - ROW_NUMBER() OVER (PARTITION BY won ORDER BY date, stat_id) AS island
+                         FROM player_form WHERE player_id = {player_ref})
+                     WHERE won = 1 GROUP BY island));
+        '''
+
+    def create_rating_tables(self):
+        # Komandu pašreizējie Elo reitingi
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS team_ratings (
+            team_id INTEGER PRIMARY KEY,
+            rating REAL NOT NULL,
+            matches INTEGER DEFAULT 0,
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        )
+        ''')
+        
+        # Kompakta vēsture: viena rinda katrai spēlei ar abu komandu reitingu pirms spēles
+        # un izmaiņu pirmajai komandai (otrai komandai izmaiņa ir pretēja)
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS rating_history (
+            match_id INTEGER PRIMARY KEY,
+            rating1 REAL NOT NULL,
+            rating2 REAL NOT NULL,
+            delta REAL NOT NULL,
+            FOREIGN KEY (match_id) REFERENCES matches (id)
+        )
+        ''')
+        
+        # Reitingu versija kešiem: palielinās ar katru team_ratings izmaiņu, arī pārrēķinā no
+        # komandrindas, kas neraksta izmaiņu žurnālā
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS rating_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        self.execute("INSERT OR IGNORE INTO rating_version (id, version) VALUES (1, 0)")
+        
+        # Novērtētas spēles labojums vai dzēšana: nākamā sinhronizācija pārrēķina visu vēsturi.
+        # Sezonas arhivēšana spēles tikai pārvieto
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS rating_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            stale INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        self.execute("INSERT OR IGNORE INTO rating_state (id, stale) VALUES (1, 0)")
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_rating_update
+        AFTER UPDATE OF date, team1_id, team2_id, score_team1, score_team2 ON matches
+        WHEN EXISTS (SELECT 1 FROM rating_history WHERE match_id = OLD.id)
+            AND (OLD.date IS NOT NEW.date OR OLD.team1_id IS NOT NEW.team1_id OR OLD.team2_id IS NOT NEW.team2_id
+                 OR OLD.score_team1 IS NOT NEW.score_team1 OR OLD.score_team2 IS NOT NEW.score_team2)
+        BEGIN
+            UPDATE rating_state SET stale = 1 WHERE id = 1;
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_rating_delete AFTER DELETE ON matches
+        WHEN EXISTS (SELECT 1 FROM rating_history WHERE match_id = OLD.id)
+            AND NOT (SELECT archiving FROM partition_state WHERE id = 1)
+        BEGIN
+            UPDATE rating_state SET stale = 1 WHERE id = 1;
+        END
+        ''')
+        for operation in ('insert', 'update', 'delete'):
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_team_ratings_version_{operation} AFTER {operation.upper()} ON team_ratings
+            BEGIN
+                UPDATE rating_version SET version = version + 1 WHERE id = 1;
+            END
+            ''')
+    
+    def create_chart_tables(self):
+        # Kurš grafiks (pēc satura atslēgas) atbilst spēlētāja pašreizējai statistikai
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS chart_renders (
+            player_id INTEGER PRIMARY KEY,
+            chart_key TEXT NOT NULL,
+            stale INTEGER DEFAULT 0
+        )
+        ''')
+        
+        # Jebkuras izmaiņas spēlētāja statistikā padara viņa grafiku novecojušu. Pēdējais
+        # grafiks tiek paturēts, lai pārslodzes gadījumā to varētu atgriezt kā rezerves atbildi
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_chart_insert AFTER INSERT ON player_form
+        BEGIN
+            UPDATE chart_renders SET stale = 1 WHERE player_id = NEW.player_id;
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_chart_update AFTER UPDATE ON player_form
+        BEGIN
+            UPDATE chart_renders SET stale = 1 WHERE player_id IN (OLD.player_id, NEW.player_id);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_form_chart_delete AFTER DELETE ON player_form
+        BEGIN
+            UPDATE chart_renders SET stale = 1 WHERE player_id = OLD.player_id;
+        END
+        ''')
+    
+    def create_rally_tables(self):
+        # Neapstrādātie izspēļu notikumi, kas saņemti spēles laikā
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS rally_events (
+            id INTEGER PRIMARY KEY,
+            match_id INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            set_number INTEGER NOT NULL,
+            timestamp REAL NOT NULL,
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (player_id) REFERENCES players (id)
+        )
+        ''')
+        self.execute("CREATE INDEX IF NOT EXISTS idx_rally_events_match ON rally_events (match_id)")
+        
+        # Spēlētāja statistika pa setiem
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS player_set_stats (
+            player_id INTEGER NOT NULL,
+            match_id INTEGER NOT NULL,
+            set_number INTEGER NOT NULL,
+            points INTEGER DEFAULT 0,
+            blocks INTEGER DEFAULT 0,
+            serves INTEGER DEFAULT 0,
+            PRIMARY KEY (match_id, set_number, player_id)
+        ) WITHOUT ROWID
+        ''')
+    
+    def create_h2h_tables(self):
+        # Savstarpējo spēļu kopsavilkums katram komandu pārim. Katrs pāris glabājas divās
+        # rindās (no katras komandas skatpunkta), lai jebkuru virzienu nolasītu pēc primārās atslēgas
+        table_exists = self.fetch_one("SELECT COUNT(*) FROM sqlite_master WHERE name = 'head_to_head'")[0]
+        
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS head_to_head (
+            team_id INTEGER NOT NULL,
+            opponent_id INTEGER NOT NULL,
+            played INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            draws INTEGER DEFAULT 0,
+            sets_for INTEGER DEFAULT 0,
+            sets_against INTEGER DEFAULT 0,
+            last_match_id INTEGER,
+            last_date TEXT,
+            last_sets_for INTEGER,
+            last_sets_against INTEGER,
+            PRIMARY KEY (team_id, opponent_id)
+        ) WITHOUT ROWID
+        ''')
+        
+        # Arhivēto sezonu spēļu kopsummas tādā pašā formā (sk. SeasonPartitions.archive)
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS head_to_head_archived (
+            team_id INTEGER NOT NULL,
+            opponent_id INTEGER NOT NULL,
+            played INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            draws INTEGER DEFAULT 0,
+            sets_for INTEGER DEFAULT 0,
+            sets_against INTEGER DEFAULT 0,
+            last_match_id INTEGER,
+            last_date TEXT,
+            last_sets_for INTEGER,
+            last_sets_against INTEGER,
+            PRIMARY KEY (team_id, opponent_id)
+        ) WITHOUT ROWID
+        ''')
+        
+        # Jauna spēle tiek pieskaitīta abiem virzieniem bez pārrēķina
+        for team, opponent, sets_for, sets_against in (
+                ('team1_id', 'team2_id', 'score_team1', 'score_team2'),
+                ('team2_id', 'team1_id', 'score_team2', 'score_team1')):
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_matches_h2h_insert_{team} AFTER INSERT ON matches
+            WHEN NEW.score_team1 IS NOT NULL AND NEW.score_team2 IS NOT NULL
+            BEGIN
+                INSERT INTO head_to_head (team_id, opponent_id, played, wins, losses, draws,
+                    sets_for, sets_against, last_match_id, last_date, last_sets_for, last_sets_against)
+                VALUES (NEW.{team}, NEW.{opponent}, 1, NEW.{sets_for} > NEW.{sets_against},
+                    NEW.{sets_for} < NEW.{sets_against}, NEW.{sets_for} = NEW.{sets_against},
+                    NEW.{sets_for}, NEW.{sets_against}, NEW.id, NEW.date, NEW.{sets_for}, NEW.{sets_against})
+                ON CONFLICT (team_id, opponent_id) DO UPDATE SET
+                    played = played + 1,
+                    wins = wins + excluded.wins,
+                    losses = losses + excluded.losses,
+                    draws = draws + excluded.draws,
+                    sets_for = sets_for + excluded.sets_for,
+                    sets_against = sets_against + excluded.sets_against,
+                    last_match_id = CASE WHEN (excluded.last_date, excluded.last_match_id) >= (last_date, last_match_id)
+                        THEN excluded.last_match_id ELSE last_match_id END,
+                    last_sets_for = CASE WHEN (excluded.last_date, excluded.last_match_id) >= (last_date, last_match_id)
+                        THEN excluded.last_sets_for ELSE last_sets_for END,
+                    last_sets_against = CASE WHEN (excluded.last_date, excluded.last_match_id) >= (last_date, last_match_id)
+                        THEN excluded.last_sets_against ELSE last_sets_against END,
+                    last_date = MAX(last_date, excluded.last_date);
+            END
+            ''')
+        
+        # Labojumi un dzēšana pārrēķina tikai skartos pārus
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_h2h_update AFTER UPDATE ON matches
+        BEGIN
+            {self.h2h_refresh_sql("OLD.team1_id", "OLD.team2_id")}
+            {self.h2h_refresh_sql("NEW.team1_id", "NEW.team2_id")}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_h2h_delete AFTER DELETE ON matches
+        WHEN NOT (SELECT archiving FROM partition_state WHERE id = 1)
+        BEGIN
+            {self.h2h_refresh_sql("OLD.team1_id", "OLD.team2_id")}
+        END
+        ''')
+        
+        # Vienā gājienā pār matches aizpilda tabulu vecākai datubāzei
+        if not table_exists:
+            self.execute(f"INSERT INTO head_to_head {self.h2h_aggregate_sql('1')}")
+    
+    def h2h_aggregate_sql(self, match_filter, matches_table='matches'):
+        # Katra spēle no abu komandu skatpunkta kopā ar arhivēto sezonu kopsummām, sagrupēta pa pāriem.
+        # Ja vaicājumā ir tieši viens MAX agregāts, SQLite ņem pārējās kolonnas no rindas ar maksimumu,
+        # t.i. no pēdējās spēles. Filtrs izmanto kolonnas team1_id un team2_id
+        return f'''
+            SELECT team_id, opponent_id, played, wins, losses, draws, total_for, total_against,
+                match_id, date, sets_for, sets_against
+            FROM (
+                SELECT team_id, opponent_id, SUM(played) AS played, SUM(wins) AS wins,
+                    SUM(losses) AS losses, SUM(draws) AS draws,
+                    SUM(total_for) AS total_for, SUM(total_against) AS total_against,
+                    MAX(date || printf('%012d', match_id)), match_id, date, sets_for, sets_against
+                FROM (
+                    SELECT team1_id AS team_id, team2_id AS opponent_id, 1 AS played,
+                        score_team1 > score_team2 AS wins, score_team1 < score_team2 AS losses,
+                        score_team1 = score_team2 AS draws, score_team1 AS total_for, score_team2 AS total_against,
+                        id AS match_id, date, score_team1 AS sets_for, score_team2 AS sets_against
+                    FROM {matches_table} WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL AND ({match_filter})
+                    UNION ALL
+                    SELECT team2_id, team1_id, 1, score_team2 > score_team1, score_team2 < score_team1,
+                        score_team1 = score_team2, score_team2, score_team1, id, date, score_team2, score_team1
+                    FROM {matches_table} WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL AND ({match_filter})
+                    UNION ALL
+                    SELECT team1_id, team2_id, played, wins, losses, draws, sets_for, sets_against,
+                        last_match_id, last_date, last_sets_for, last_sets_against
+                    FROM (SELECT team_id AS team1_id, opponent_id AS team2_id, * FROM head_to_head_archived)
+                    WHERE ({match_filter})
+                )
+                GROUP BY team_id, opponent_id
+            )
+        '''
+    
+    def h2h_refresh_sql(self, team_ref, opponent_ref):
+        # Pilns viena komandu pāra pārrēķins abos virzienos
+        pair_filter = (f"(team1_id = {team_ref} AND team2_id = {opponent_ref}) "
+                       f"OR (team1_id = {opponent_ref} AND team2_id = {team_ref})")
+        return f'''
+            DELETE FROM head_to_head
+            WHERE (team_id = {team_ref} AND opponent_id = {opponent_ref})
+                OR (team_id = {opponent_ref} AND opponent_id = {team_ref});
+            INSERT INTO head_to_head {self.h2h_aggregate_sql(pair_filter)};
+        '''
+
+    def create_change_feed(self):
+        # Tikai papildināms izmaiņu žurnāls. AUTOINCREMENT garantē, ka seq vienmēr pieaug un netiek
+        # atkārtoti izmantots arī pēc vecāko ierakstu dzēšanas, tāpēc to var lietot kā kursoru
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            operation TEXT NOT NULL,
+            changed_at REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+        )
+        ''')
+        self.execute("CREATE INDEX IF NOT EXISTS idx_changes_table ON changes (table_name, seq)")
+        
+        # Patērētāju kursori: līdz kuram seq katrs patērētājs ir apstrādājis izmaiņas
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS change_cursors (
+            consumer TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )
+        ''')
+        
+        for table_name in ('teams', 'players', 'matches', 'player_stats'):
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_changes_insert AFTER INSERT ON {table_name}
+            BEGIN
+                INSERT INTO changes (table_name, row_id, operation) VALUES ('{table_name}', NEW.id, 'insert');
+            END
+            ''')
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_changes_update AFTER UPDATE ON {table_name}
+            BEGIN
+                INSERT INTO changes (table_name, row_id, operation) VALUES ('{table_name}', NEW.id, 'update');
+            END
+            ''')
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table_name}_changes_delete AFTER DELETE ON {table_name}
+            WHEN NOT (SELECT archiving FROM partition_state WHERE id = 1)
+            BEGIN
+                INSERT INTO changes (table_name, row_id, operation) VALUES ('{table_name}', OLD.id, 'delete');
+            END
+            ''')
+        
+        # Sezonas simulāciju kešs tagad izmanto izmaiņu žurnālu - atsevišķs versiju skaitītājs vairs nav vajadzīgs
+        for trigger in ('trg_matches_result_insert', 'trg_matches_result_update', 'trg_matches_result_delete'):
+            self.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        self.execute("DROP TABLE IF EXISTS match_results_version")
+    
+    def create_partition_tables(self):
+        # Arhivēto sezonu reģistrs: katra sezona ir atsevišķs SQLite fails
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS season_partitions (
+            season TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            matches INTEGER NOT NULL,
+            stats INTEGER NOT NULL,
+            archived_at REAL NOT NULL,
+            compacted_at REAL
+        )
+        ''')
+        
+        # Kamēr sezona tiek pārvietota uz arhīvu, dzēšanas trigeri neatjauno atvasinātās tabulas
+        # un neraksta izmaiņu žurnālā - dati netiek dzēsti, tikai pārvietoti. Karodziņš tiek
+        # ieslēgts un izslēgts vienā transakcijā, tāpēc citi savienojumi to nekad neredz ieslēgtu
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS partition_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            archiving INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        self.execute("INSERT OR IGNORE INTO partition_state (id, archiving) VALUES (1, 0)")
+        
+        # Vecākā datubāzē šie trigeri ir izveidoti bez aizsarga - tie tiek izdzēsti un
+        # izveidoti no jauna turpmākajās create_* metodēs
+        guarded = ['trg_player_stats_form_delete', 'trg_matches_h2h_delete']
+        guarded.extend(f"trg_{table_name}_changes_delete" for table_name in ('teams', 'players', 'matches', 'player_stats'))
+        outdated = self.fetch_all(f"""
+            SELECT name FROM sqlite_master
+            WHERE type = 'trigger' AND (
+                (name IN ({', '.join('?' * len(guarded))}) AND sql NOT LIKE '%partition_state%')
+                OR (name = 'trg_matches_h2h_update' AND sql NOT LIKE '%head_to_head_archived%'))
+        """, guarded)
+        for (name,) in outdated:
+            self.execute(f"DROP TRIGGER {name}")
+    
+    def create_similarity_tables(self):
+        # Spēlētāji, kuru statistikas vektors jāpārrēķina līdzības indeksā
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS similarity_dirty (
+            player_id INTEGER PRIMARY KEY
+        )
+        ''')
+        
+        for operation, ref in (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD')):
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_player_form_similarity_{operation} AFTER {operation.upper()} ON player_form
+            BEGIN
+                INSERT OR IGNORE INTO similarity_dirty (player_id) VALUES ({ref}.player_id);
+            END
+            ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_players_similarity_insert AFTER INSERT ON players
+        BEGIN
+            INSERT OR IGNORE INTO similarity_dirty (player_id) VALUES (NEW.id);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_players_similarity_update AFTER UPDATE OF id, position ON players
+        BEGIN
+            INSERT OR IGNORE INTO similarity_dirty (player_id) VALUES (OLD.id);
+            INSERT OR IGNORE INTO similarity_dirty (player_id) VALUES (NEW.id);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_players_similarity_delete AFTER DELETE ON players
+        BEGIN
+            INSERT OR IGNORE INTO similarity_dirty (player_id) VALUES (OLD.id);
+        END
+        ''')
+    
+    def create_sketch_tables(self):
+        # Kvantiļu skices pa sezonām (partīcijām), pozīcijām un rādītājiem
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS quantile_sketches (
+            season TEXT NOT NULL,
+            position TEXT NOT NULL,
+            stat TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            levels TEXT NOT NULL,
+            PRIMARY KEY (season, position, stat)
+        ) WITHOUT ROWID
+        ''')
+        # Skiču versija: palielinās pēc katras saglabāšanas, lai citi procesi zinātu, ka jāpārlādē
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS sketch_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        self.execute("INSERT OR IGNORE INTO sketch_state (id, version) VALUES (1, 0)")
+        
+        # Skices glabā vienu vērtību katram spēlētājam sezonā - viņa vidējo rādītāju spēlē. Jebkura
+        # statistikas rinda maina kāda spēlētāja vidējo, un no skices vērtību izņemt nevar, tāpēc
+        # izmaiņas atzīmē sezonu pārbūvei
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS sketch_dirty (
+            season TEXT PRIMARY KEY
+        )
+        ''')
+        # Agrākās skices glabāja atsevišķas spēļu rindas, ko sketch_pending papildināja inkrementāli -
+        # tās tiek izmestas un pārbūvētas no jauna
+        if self.fetch_one("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sketch_pending'")[0]:
+            self.execute("DROP TRIGGER IF EXISTS trg_player_stats_sketch_insert")
+            self.execute("DROP TABLE sketch_pending")
+            self.execute("DELETE FROM quantile_sketches")
+            self.execute("UPDATE sketch_state SET version = 0 WHERE id = 1")
+        
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_stats_sketch_insert AFTER INSERT ON player_stats
+        BEGIN
+            INSERT OR IGNORE INTO sketch_dirty (season)
+            SELECT substr(date, 1, 4) FROM matches WHERE id = NEW.match_id;
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_stats_sketch_update AFTER UPDATE ON player_stats
+        BEGIN
+            INSERT OR IGNORE INTO sketch_dirty (season)
+            SELECT substr(date, 1, 4) FROM matches WHERE id IN (OLD.match_id, NEW.match_id);
+        END
+        ''')
+        # Sezonas arhivēšana rindas tikai pārvieto, tāpēc skices paliek derīgas
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_player_stats_sketch_delete AFTER DELETE ON player_stats
+        WHEN NOT (SELECT archiving FROM partition_state WHERE id = 1)
+        BEGIN
+            INSERT OR IGNORE INTO sketch_dirty (season)
+            SELECT substr(date, 1, 4) FROM matches WHERE id = OLD.match_id;
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_sketch_update AFTER UPDATE OF date ON matches
+        WHEN substr(OLD.date, 1, 4) IS NOT substr(NEW.date, 1, 4)
+        BEGIN
+            INSERT OR IGNORE INTO sketch_dirty (season) VALUES (substr(OLD.date, 1, 4));
+            INSERT OR IGNORE INTO sketch_dirty (season) VALUES (substr(NEW.date, 1, 4));
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_sketch_delete AFTER DELETE ON matches
+        WHEN NOT (SELECT archiving FROM partition_state WHERE id = 1)
+        BEGIN
+            INSERT OR IGNORE INTO sketch_dirty (season) VALUES (substr(OLD.date, 1, 4));
+        END
+        ''')
+        # Pozīcijas maiņa ietekmē tikai karstās sezonas; arhīvā spēlētājs paliek savā toreizējā pozīcijā
+        for operation, condition, ref in (('update', 'UPDATE OF position', 'NEW'), ('delete', 'DELETE', 'OLD')):
+            self.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_players_sketch_{operation} AFTER {condition} ON players
+            BEGIN
+                INSERT OR IGNORE INTO sketch_dirty (season)
+                SELECT DISTINCT substr(m.date, 1, 4)
+                FROM player_stats ps
+                JOIN matches m ON ps.match_id = m.id
+                WHERE ps.player_id = {ref}.id;
+            END
+            ''')
+    
+    def create_standings_tables(self):
+        # Kumulatīvās (prefiksu) summas katrai komandai sezonā datuma secībā: rinda pēc katras
+        # spēles satur komandas tabulas stāvokli pēc tās. Stāvoklis jebkurā datumā ir viena B-koka meklēšana
+        table_exists = self.fetch_one("SELECT COUNT(*) FROM sqlite_master WHERE name = 'standings_prefix'")[0]
+        
+        self.execute('''
+        CREATE TABLE IF NOT EXISTS standings_prefix (
+            team_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            date TEXT NOT NULL,
+            match_id INTEGER NOT NULL,
+            played INTEGER NOT NULL,
+            wins INTEGER NOT NULL,
+            losses INTEGER NOT NULL,
+            draws INTEGER NOT NULL,
+            sets_for INTEGER NOT NULL,
+            sets_against INTEGER NOT NULL,
+            PRIMARY KEY (team_id, season, date, match_id)
+        ) WITHOUT ROWID
+        ''')
+        
+        sides = (('team1_id', 'score_team1', 'score_team2'), ('team2_id', 'score_team2', 'score_team1'))
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_standings_insert AFTER INSERT ON matches
+        BEGIN
+            {''.join(self.standings_add_sql('NEW', *side) for side in sides)}
+        END
+        ''')
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_standings_update
+        AFTER UPDATE OF date, team1_id, team2_id, score_team1, score_team2 ON matches
+        BEGIN
+            {''.join(self.standings_remove_sql('OLD', *side) for side in sides)}
+            {''.join(self.standings_add_sql('NEW', *side) for side in sides)}
+        END
+        ''')
+        # Arhivētās sezonas prefiksi paliek, lai tās tabulu varētu apskatīt arī vēlāk
+        self.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_matches_standings_delete AFTER DELETE ON matches
+        WHEN NOT (SELECT archiving FROM partition_state WHERE id = 1)
+        BEGIN
+            {''.join(self.standings_remove_sql('OLD', *side) for side in sides)}
+        END
+        ''')
+        
+        # Vecākai datubāzei prefiksus aprēķina ar loga funkcijām vienā gājienā
+        if not table_exists:
+            self.execute(f'''
+            INSERT INTO standings_prefix
+            SELECT team_id, season, date, match_id,
+                COUNT(*) OVER running, SUM(won) OVER running, SUM(lost) OVER running, SUM(drawn) OVER running,
+                SUM(sets_for) OVER running, SUM(sets_against) OVER running
+            FROM (
+                SELECT team1_id AS team_id, substr(date, 1, 4) AS season, date, id AS match_id,
+                    score_team1 > score_team2 AS won, score_team1 < score_team2 AS lost,
+                    score_team1 = score_team2 AS drawn, score_team1 AS sets_for, score_team2 AS sets_against
+                FROM {self.career_table('matches')}
+                WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL AND date IS NOT NULL AND team1_id <> team2_id
+                UNION ALL
+                SELECT team2_id, substr(date, 1, 4), date, id, score_team2 > score_team1, score_team2 < score_team1,
+                    score_team1 = score_team2, score_team2, score_team1
+                FROM {self.career_table('matches')}
+                WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL AND date IS NOT NULL AND team1_id <> team2_id
+            )
+            WINDOW running AS (PARTITION BY team_id, season ORDER BY date, match_id ROWS UNBOUNDED PRECEDING)
+            ''')
+    
+    def standings_delta_sql(self, ref, sets_for, sets_against, sign):
+        # Vienas spēles ieguldījums komandas kumulatīvajās summās (sign = '+' vai '-')
+        return f'''played = played {sign} 1,
+                wins = wins {sign} ({ref}.{sets_for} > {ref}.{sets_against}),
+                losses = losses {sign} ({ref}.{sets_for} < {ref}.{sets_against}),
+                draws = draws {sign} ({ref}.{sets_for} = {ref}.{sets_against}),
+                sets_for = sets_for {sign} {ref}.{sets_for},
+                sets_against = sets_against {sign} {ref}.{sets_against}'''
+    
+    def standings_played_sql(self, ref):
+        # Tabulā skaitās tikai izspēlētas spēles ar datumu starp divām dažādām komandām
+        return (f"{ref}.score_team1 IS NOT NULL AND {ref}.score_team2 IS NOT NULL "
+                f"AND {ref}.date IS NOT NULL AND {ref}.team1_id <> {ref}.team2_id")
+    
+    def standings_add_sql(self, ref, team, sets_for, sets_against):
+        # Pieskaita spēli visām vēlākajām komandas rindām un ievieto tās rindu (iepriekšējā + spēle).
+        # Jaunākā spēle sezonā (parastais gadījums) vēlāku rindu nemaina
+        played = self.standings_played_sql(ref)
+        return f'''
+            UPDATE standings_prefix SET {self.standings_delta_sql(ref, sets_for, sets_against, '+')}
+            WHERE {played} AND team_id = {ref}.{team} AND season = substr({ref}.date, 1, 4)
+                AND (date, match_id) > ({ref}.date, {ref}.id);
+            INSERT INTO standings_prefix (team_id, season, date, match_id, played, wins, losses, draws,
+                sets_for, sets_against)
+            SELECT {ref}.{team}, substr({ref}.date, 1, 4), {ref}.date, {ref}.id,
+                COALESCE(previous.played, 0) + 1,
+                COALESCE(previous.wins, 0) + ({ref}.{sets_for} > {ref}.{sets_against}),
+                COALESCE(previous.losses, 0) + ({ref}.{sets_for} < {ref}.{sets_against}),
+                COALESCE(previous.draws, 0) + ({ref}.{sets_for} = {ref}.{sets_against}),
+                COALESCE(previous.sets_for, 0) + {ref}.{sets_for},
+                COALESCE(previous.sets_against, 0) + {ref}.{sets_against}
+            FROM (SELECT 1) LEFT JOIN (
+                SELECT played, wins, losses, draws, sets_for, sets_against FROM standings_prefix
+                WHERE team_id = {ref}.{team} AND season = substr({ref}.date, 1, 4)
+                    AND (date, match_id) < ({ref}.date, {ref}.id)
+                ORDER BY date DESC, match_id DESC
+                LIMIT 1
+            ) previous
+            WHERE {played};
+        '''
+    
+    def standings_remove_sql(self, ref, team, sets_for, sets_against):
+        played = self.standings_played_sql(ref)
+        return f'''
+            DELETE FROM standings_prefix
+            WHERE {played} AND team_id = {ref}.{team} AND season = substr({ref}.date, 1, 4)
+                AND date = {ref}.date AND match_id = {ref}.id;
+            UPDATE standings_prefix SET {self.standings_delta_sql(ref, sets_for, sets_against, '-')}
+            WHERE {played} AND team_id = {ref}.{team} AND season = substr({ref}.date, 1, 4)
+                AND (date, match_id) > ({ref}.date, {ref}.id);
+        '''
+    
+    
+    def create_search_index(self):
+        # FTS5 indekss spēlētāju un komandu meklēšanai. unicode61 ar remove_diacritics
+        # ļauj atrast "Bērziņš" ar vaicājumu "Berzins". rowid ir pāra skaitlis spēlētājiem
+        # un nepāra komandām, lai trigeri varētu dzēst ierakstus pēc rowid, neskenējot indeksu
+        index_exists = self.fetch_one("SELECT COUNT(*) FROM sqlite_master WHERE name = 'search_index'")[0]
+        
+        self.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED,
+            ref_id UNINDEXED,
+            name,
+            position,
+            city,
+            coach,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        ''')
+        
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_players_search_insert AFTER INSERT ON players
+        BEGIN
+            INSERT INTO search_index (rowid, kind, ref_id, name, position)
+            VALUES (NEW.id * 2, 'player', NEW.id, NEW.name, NEW.position);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_players_search_update AFTER UPDATE OF id, name, position ON players
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 2;
+            INSERT INTO search_index (rowid, kind, ref_id, name, position)
+            VALUES (NEW.id * 2, 'player', NEW.id, NEW.name, NEW.position);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_players_search_delete AFTER DELETE ON players
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 2;
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_teams_search_insert AFTER INSERT ON teams
+        BEGIN
+            INSERT INTO search_index (rowid, kind, ref_id, name, city, coach)
+            VALUES (NEW.id * 2 + 1, 'team', NEW.id, NEW.name, NEW.city, NEW.coach);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_teams_search_update AFTER UPDATE OF id, name, city, coach ON teams
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 2 + 1;
+            INSERT INTO search_index (rowid, kind, ref_id, name, city, coach)
+            VALUES (NEW.id * 2 + 1, 'team', NEW.id, NEW.name, NEW.city, NEW.coach);
+        END
+        ''')
+        self.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_teams_search_delete AFTER DELETE ON teams
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 2 + 1;
+        END
+        ''')
+        
+        # Jaunam indeksam pievieno jau esošos datus
+        if index_exists == 0:
+            self.execute('''
+                INSERT INTO search_index (rowid, kind, ref_id, name, position)
+                SELECT id * 2, 'player', id, name, position FROM players
+            ''')
+            self.execute('''
+                INSERT INTO search_index (rowid, kind, ref_id, name, city, coach)
+                SELECT id * 2 + 1, 'team', id, name, city, coach FROM teams
+            ''')
+    
+    def search(self, text, limit=20):
+        # Katru vārdu meklē kā prefiksu; pēdiņas neļauj FTS5 sintaksei nonākt vaicājumā
+        terms = re.findall(r'\w+', text)
+        if not terms:
+            return []
+        match_query = ' '.join(f'"{term}"*' for term in terms)
+        
+        # Bez ORDER BY rank FTS5 var apstāties pēc pirmajiem `limit` rezultātiem,
+        # tāpēc arī bieži sastopami prefiksi neprasa visu atbilstību novērtēšanu
+        return self.fetch_all("""
+            SELECT kind, ref_id, name, position, city, coach
+            FROM search_index
+            WHERE search_index MATCH ?
+            LIMIT ?
+        """, (match_query, limit))
+
+    def insert_sample_data(self):
+        # Komandas
+        teams = [
+            ("Lauvas", "Rīga", "Jānis Bērziņš"),
+            ("Tīģeri", "Daugavpils", "Andris Kalniņš"),
+            ("Vilki", "Liepāja", "Ieva Liepiņa"),
+            ("Lāči", "Ventspils", "Kārlis Ozols")
+        ]
+        
+        for team in teams:
+            self.execute("INSERT INTO teams (name, city, coach) VALUES (?, ?, ?)", team)
+        
+        # Spēlētāji
+        players = [
+            # Lauvas komanda
+            ("Artūrs Zariņš", 7, "Setter", 1),
+            ("Mārtiņš Liepa", 9, "Outside Hitter", 1),
+            ("Valdis Egle", 12, "Middle Blocker", 1),
+            
+            # Tīģeri komanda
+            ("Pēteris Briedis", 5, "Setter", 2),
+            ("Juris Kalns", 8, "Outside Hitter", 2),
+            ("Kristaps Lācis", 10, "Middle Blocker", 2),
+            
+            # Vilki komanda
+            ("Raivis Bērziņš", 3, "Setter", 3),
+            ("Uldis Priede", 11, "Outside Hitter", 3),
+            ("Gatis Kļava", 15, "Middle Blocker", 3),
+            
+            # Lāči komanda
+            ("Oskars Ziemelis", 2, "Setter", 4),
+            ("Edgars Linde", 6, "Outside Hitter", 4),
+            ("Normunds Kļaviņš", 14, "Middle Blocker", 4)
+        ]
+        
+        for player in players:
+            self.execute("INSERT INTO players (name, number, position, team_id) VALUES (?, ?, ?, ?)", player)
+        
+        # Spēles
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        matches = [
+            (1, 2, current_date, 3, 1),  # Lauvas vs Tīģeri
+            (3, 4, current_date, 2, 3),  # Vilki vs Lāči
+            (1, 3, current_date, 3, 0),  # Lauvas vs Vilki
+            (2, 4, current_date, 1, 3)   # Tīģeri vs Lāči
+        ]
+        
+        for match in matches:
+            self.execute("INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, ?, ?, ?)", match)
+        
+        # Spēlētāju statistika
+        # Nejauši ģenerēt statistiku katram spēlētājam katrā spēlē
+        for match_id in range(1, 5):
+            # Nosaka komandu ID, kas piedalās spēlē
+            match_data = self.fetch_one("SELECT team1_id, team2_id FROM matches WHERE id = ?", (match_id,))
+            team1_id, team2_id = match_data
+            
+            # Iegūst spēlētājus no abām komandām
+            team1_players = self.fetch_all("SELECT id FROM players WHERE team_id = ?", (team1_id,))
+            team2_players = self.fetch_all("SELECT id FROM players WHERE team_id = ?", (team2_id,))
+            
+            # Pievieno statistiku katram spēlētājam
+            for team_id, player_id in [(team1_id, row[0]) for row in team1_players] + [(team2_id, row[0]) for row in team2_players]:
+                points = random.randint(0, 15)
+                blocks = random.randint(0, 5)
+                serves = random.randint(0, 8)
+                
+                self.execute(
+                    "INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, ?, ?, ?, ?)",
+                    (player_id, match_id, points, blocks, serves, team_id)
+                )
+
+# Elo reitingu dzinējs komandām
+class EloRating:
+    def __init__(self, db, k_factor=32, base_rating=1500):
+        self.db = db
+        self.k_factor = k_factor
+        self.base_rating = base_rating
+    
+    def expected(self, rating1, rating2):
+        # Varbūtība, ka pirmā komanda uzvar
+        return 1 / (1 + 10 ** ((rating2 - rating1) / 400))
+    
+    def actual(self, score_team1, score_team2):
+        if score_team1 > score_team2:
+            return 1.0
+        elif score_team2 > score_team1:
+            return 0.0
+        else:
+            return 0.5  # Neizšķirts
+    
+    def sync(self):
+        # Novērtē visas izspēlētās, vēl nenovērtētās spēles datuma secībā. Novērtētās atrod pa
+        # rating_history primāro atslēgu
+        new_matches = self.db.fetch_all("""
+            SELECT id, team1_id, team2_id, score_team1, score_team2, date
+            FROM matches m
+            WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL
+                AND NOT EXISTS (SELECT 1 FROM rating_history h WHERE h.match_id = m.id)
+            ORDER BY date, id
+        """)
+        
+        # Elo ir secīgs: ja jau novērtēta spēle ir labota vai dzēsta, vai jaunā spēle (piemēram,
+        # vēlāk ievadīts rezultāts) ir agrāka par pēdējo novērtēto, pievienošana beigās dotu citu
+        # rezultātu nekā pilns pārrēķins. Arhivētās sezonas ir beigušās, tāpēc pietiek ar galveno tabulu
+        stale = self.db.fetch_one("SELECT stale FROM rating_state WHERE id = 1")[0]
+        if new_matches and not stale:
+            last_rated = self.db.fetch_one("""
+                SELECT m.date, m.id FROM rating_history h JOIN matches m ON m.id = h.match_id
+                ORDER BY m.date DESC, m.id DESC LIMIT 1
+            """)
+            stale = last_rated is not None and (new_matches[0][5], new_matches[0][0]) < tuple(last_rated)
+        if stale:
+            self.recompute()
+            return len(new_matches)
+        
+        recorded = 0
+        for match_data in new_matches:
+            if self.record_match(*match_data[:5]) is not None:
+                recorded += 1
+        
+        return recorded
+    
+    def record_match(self, match_id, team1_id, team2_id, score_team1, score_team2):
+        # Viena rakstīšanas transakcija: vienlaicīgas sinhronizācijas spēli novērtē tieši vienreiz
+        if not self.db.conn:
+            self.db.connect()
+        conn = self.db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM rating_history WHERE match_id = ?", (match_id,)).fetchone():
+                conn.rollback()
+                return None
+            ratings = dict(conn.execute("SELECT team_id, rating FROM team_ratings WHERE team_id IN (?, ?)",
+                                        (team1_id, team2_id)).fetchall())
+            rating1 = ratings.get(team1_id, self.base_rating)
+            rating2 = ratings.get(team2_id, self.base_rating)
+            delta = self.k_factor * (self.actual(score_team1, score_team2) - self.expected(rating1, rating2))
+            
+            conn.execute("INSERT INTO rating_history (match_id, rating1, rating2, delta) VALUES (?, ?, ?, ?)",
+                         (match_id, rating1, rating2, delta))
+            conn.executemany("""
+                INSERT INTO team_ratings (team_id, rating, matches) VALUES (?, ?, 1)
+                ON CONFLICT (team_id) DO UPDATE SET rating = excluded.rating, matches = matches + 1
+            """, [(team1_id, rating1 + delta), (team2_id, rating2 - delta)])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return delta
+    
+    def get_rating(self, team_id):
+        rating_data = self.db.fetch_one("SELECT rating FROM team_ratings WHERE team_id = ?", (team_id,))
+        return rating_data[0] if rating_data else self.base_rating
+    
+    def recompute(self):
+        # Pilns pārrēķins visām spēlēm vienā rakstīšanas transakcijā: vienlaicīga sync vai rezultāta
+        # labojums nonāk vai nu pirms, vai pēc tā. Karjeras skats pievieno arhīvus pirms transakcijas
+        matches_table = self.db.career_table('matches')
+        conn = self.db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            matches_data = conn.execute(f"""
+                SELECT id, team1_id, team2_id, score_team1, score_team2
+                FROM {matches_table}
+                WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL
+                ORDER BY date, id
+            """).fetchall()
+            conn.execute("DELETE FROM rating_history")
+            conn.execute("DELETE FROM team_ratings")
+            conn.execute("UPDATE rating_state SET stale = 0 WHERE id = 1")
+            if matches_data:
+                history, team_ratings = self.compute_ratings(matches_data)
+                conn.executemany("INSERT INTO rating_history (match_id, rating1, rating2, delta) VALUES (?, ?, ?, ?)", history)
+                conn.executemany("INSERT INTO team_ratings (team_id, rating, matches) VALUES (?, ?, ?)", team_ratings)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(matches_data)
+    
+    def compute_ratings(self, matches_data):
+        # Elo ir secīgs, tāpēc spēles tiek sadalītas slāņos, kuros katra komanda parādās ne vairāk
+        # kā vienu reizi - viena slāņa spēles var atjaunināt vienlaicīgi ar NumPy vektoru operācijām
+        data = np.array(matches_data, dtype=np.int64)
+        match_ids = data[:, 0]
+        team_ids, team_index = np.unique(data[:, 1:3], return_inverse=True)
+        team_index = team_index.reshape(-1, 2)
+        home = team_index[:, 0]
+        away = team_index[:, 1]
+        actual = np.where(data[:, 3] > data[:, 4], 1.0, np.where(data[:, 3] < data[:, 4], 0.0, 0.5))
+        
+        # Slānis = viens vairāk par abu komandu iepriekšējās spēles slāni
+        layers = [0] * len(data)
+        last_layer = [-1] * len(team_ids)
+        for i, (team1, team2) in enumerate(zip(home.tolist(), away.tolist())):
+            layer = max(last_layer[team1], last_layer[team2]) + 1
+            layers[i] = layer
+            last_layer[team1] = layer
+            last_layer[team2] = layer
+        
+        order = np.argsort(np.array(layers), kind='stable')
+        boundaries = np.flatnonzero(np.diff(np.array(layers)[order])) + 1
+        
+        ratings = np.full(len(team_ids), float(self.base_rating))
+        rating1 = np.empty(len(data))
+        rating2 = np.empty(len(data))
+        delta = np.empty(len(data))
+        for batch in np.split(order, boundaries):
+            team1 = home[batch]
+            team2 = away[batch]
+            rating1[batch] = ratings[team1]
+            rating2[batch] = ratings[team2]
+            expected = 1 / (1 + 10 ** ((rating2[batch] - rating1[batch]) / 400))
+            delta[batch] = self.k_factor * (actual[batch] - expected)
+            ratings[team1] += delta[batch]
+            ratings[team2] -= delta[batch]
+        
+        played = np.bincount(team_index.ravel(), minlength=len(team_ids))
+        
+        return (list(zip(match_ids.tolist(), rating1.tolist(), rating2.tolist(), delta.tolist())),
+                list(zip(team_ids.tolist(), ratings.tolist(), played.tolist())))
+    
+    def get_ratings(self):
+        ratings_data = self.db.fetch_all("""
+            SELECT t.id, t.name, COALESCE(r.rating, ?), COALESCE(r.matches, 0)
+            FROM teams t
+            LEFT JOIN team_ratings r ON r.team_id = t.id
+            ORDER BY COALESCE(r.rating, ?) DESC
+        """, (self.base_rating, self.base_rating))
+        
+        ratings = []
+        for position, rating_data in enumerate(ratings_data, start=1):
+            team_id, name, rating, matches = rating_data
+            ratings.append({
+                'position': position,
+                'team_id': team_id,
+                'name': name,
+                'rating': round(rating),
+                'matches': matches
+            })
+        return ratings
+    
+    def get_team_history(self, team_id, limit=10):
+        history_data = self.db.fetch_all(f"""
+            SELECT m.id, m.date, m.team1_id, t1.name, t2.name, m.score_team1, m.score_team2,
+                h.rating1, h.rating2, h.delta
+            FROM rating_history h
+            JOIN {self.db.career_table('matches')} m ON h.match_id = m.id
+            JOIN teams t1 ON m.team1_id = t1.id
+            JOIN teams t2 ON m.team2_id = t2.id
+            WHERE m.team1_id = ? OR m.team2_id = ?
+            ORDER BY h.match_id DESC
+            LIMIT ?
+        """, (team_id, team_id, limit))
+        
+        history = []
+        for row in history_data:
+            match_id, date, team1_id, team1_name, team2_name, score_team1, score_team2, rating1, rating2, delta = row
+            # Izmaiņa no šīs komandas skatpunkta
+            if team1_id == team_id:
+                before, change, opponent = rating1, delta, team2_name
+            else:
+                before, change, opponent = rating2, -delta, team1_name
+            history.append({
+                'match_id': match_id,
+                'date': date,
+                'opponent': opponent,
+                'score': f"{score_team1} - {score_team2}",
+                'before': round(before),
+                'after': round(before + change),
+                'change': round(change, 1)
+            })
+        return history
+
+# Spēlētāja statistikas grafika zīmēšana (atsevišķa funkcija, lai to varētu izsaukt arī procesu pūlā)
+def render_chart_png(stats):
+    dates = [stat[0] for stat in stats]
+    points = [stat[1] for stat in stats]
+    blocks = [stat[2] for stat in stats]
+    serves = [stat[3] for stat in stats]
+    
+    # Izveido grafiku. Figure objekts netiek reģistrēts pyplot globālajā stāvoklī,
+    # tāpēc vairāki pavedieni var zīmēt grafikus vienlaikus
+    figure = Figure(figsize=(10, 6))
+    axes = figure.add_subplot()
+    axes.plot(dates, points, 'ro-', label='Punkti')
+    axes.plot(dates, blocks, 'go-', label='Bloki')
+    axes.plot(dates, serves, 'bo-', label='Serves')
+    axes.set_title(f'Spēlētāja statistika pa spēlēm')
+    axes.set_xlabel('Datums')
+    axes.set_ylabel('Vērtība')
+    axes.legend()
+    axes.grid(True)
+    axes.tick_params(axis='x', labelrotation=45)
+    figure.tight_layout()
+    
+    # Saglabā grafiku atmiņā
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def render_chart_file(job):
+    # Procesu pūla uzdevums: uzzīmē grafiku un ieraksta to kešatmiņas failā
+    path, stats = job
+    ChartCache.write_file(path, render_chart_png(stats))
+    return path
+
+# Neliela SVG līkne (sparkline) tabulas šūnai - bez matplotlib, tikai <polyline> no punktu vērtībām
+def sparkline_svg(values, width=100, height=24, color='#4CAF50'):
+    if not values:
+        return ''
+    if len(values) == 1:
+        values = values * 2  # Viena spēle - horizontāla līnija
+    
+    low = min(values)
+    span = (max(values) - low) or 1
+    step = (width - 2) / (len(values) - 1)
+    
+    coords = []
+    for i, value in enumerate(values):
+        x = 1 + i * step
+        y = height - 1 - (value - low) * (height - 2) / span
+        coords.append(f"{x:.1f},{y:.1f}")
+    
+    return (f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<polyline fill="none" stroke="{color}" stroke-width="1.5" points="{" ".join(coords)}"/></svg>')
+
+# Grafiku kešatmiņa diskā. Faila nosaukums ir grafika datu SHA-256, tāpēc vienādi dati
+# vienmēr atbilst vienam failam, un mainīti dati automātiski dod jaunu failu
+class ChartCache:
+    def __init__(self, db, cache_dir='chart_cache'):
+        self.db = db
+        self.cache_dir = cache_dir
+    
+    def get_stats(self, player_id):
+        stats_data = self.db.fetch_all("""
+            SELECT date, points, blocks, serves
+            FROM player_form
+            WHERE player_id = ?
+            ORDER BY date, stat_id
+        """, (player_id,))
+        return [tuple(stat) for stat in stats_data]
+    
+    def chart_key(self, stats):
+        return hashlib.sha256(json.dumps(stats).encode()).hexdigest()
+    
+    def chart_path(self, chart_key):
+        return os.path.join(self.cache_dir, chart_key[:2], chart_key + '.png')
+    
+    @staticmethod
+    def write_file(path, png):
+        # Ieraksta pagaidu failā un pārdēvē, lai lasītājs nekad neredzētu pusierakstītu failu
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(png)
+        os.replace(temp_path, path)
+    
+    def lookup(self, player_id, allow_stale=False):
+        # Atgriež gatavā grafika ceļu, ja spēlētāja statistika kopš zīmēšanas nav mainījusies
+        # (ar allow_stale - pēdējo uzzīmēto grafiku arī tad, ja tas ir novecojis)
+        render_data = self.db.fetch_one("SELECT chart_key, stale FROM chart_renders WHERE player_id = ?", (player_id,))
+        if render_data and (allow_stale or not render_data[1]):
+            path = self.chart_path(render_data[0])
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def store(self, player_id, stats, png=None):
+        chart_key = self.chart_key(stats)
+        path = self.chart_path(chart_key)
+        if png is not None and not os.path.exists(path):
+            self.write_file(path, png)
+        # Statistika var mainīties zīmēšanas laikā: grafiks ir aktuāls tikai tad, ja tā atslēga sakrīt ar
+        # pašreizējo statistiku, kas nolasīta tajā pašā rakstīšanas transakcijā
+        self.record_renders(lambda: {player_id: self.get_stats(player_id)}, {player_id: chart_key})
+        return path
+    
+    def record_renders(self, read_stats, chart_keys):
+        # chart_keys: spēlētājs -> uzzīmētā grafika atslēga; read_stats nolasa pašreizējo statistiku.
+        # Spēlētājs, kura nav read_stats rezultātā, jau ir atzīmēts kā aktuāls citā zīmēšanā
+        if not self.db.conn:
+            self.db.connect()
+        conn = self.db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = read_stats()
+            conn.executemany("INSERT OR REPLACE INTO chart_renders (player_id, chart_key, stale) VALUES (?, ?, ?)",
+                             [(player_id, chart_key, int(self.chart_key(current[player_id]) != chart_key))
+                              for player_id, chart_key in chart_keys.items() if player_id in current])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def get_recent_points(self, team_id=None, count=10):
+        # Pēdējo `count` spēļu punkti katram spēlētājam vienā vaicājumā (sparkline līknēm)
+        team_filter = "WHERE player_id IN (SELECT id FROM players WHERE team_id = ?)" if team_id else ""
+        points_data = self.db.fetch_all(f"""
+            SELECT player_id, points FROM (
+                SELECT player_id, points, date, stat_id,
+                    ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY date DESC, stat_id DESC) AS recent
+                FROM player_form
+                {team_filter}
+            )
+            WHERE recent <= ?
+            ORDER BY player_id, date, stat_id
+        """, (team_id, count) if team_id else (count,))
+        
+        recent_points = {}
+        for player_id, points in points_data:
+            recent_points.setdefault(player_id, []).append(points)
+        return recent_points
+    
+    def get_stale_stats(self):
+        # Spēlētāji, kuru statistika mainījusies kopš pēdējās zīmēšanas (trigeri atzīmē viņu ierakstu)
+        stats_data = self.db.fetch_all("""
+            SELECT f.player_id, f.date, f.points, f.blocks, f.serves
+            FROM player_form f
+            WHERE f.player_id NOT IN (SELECT player_id FROM chart_renders WHERE stale = 0)
+            ORDER BY f.player_id, f.date, f.stat_id
+        """)
+        
+        stale = {}
+        for stat in stats_data:
+            player_id, date, points, blocks, serves = stat
+            stale.setdefault(player_id, []).append((date, points, blocks, serves))
+        return stale
+    
+    def prerender(self, workers=None):
+        start = time.perf_counter()
+        stale = self.get_stale_stats()
+        
+        jobs = []
+        for player_id, stats in stale.items():
+            path = self.chart_path(self.chart_key(stats))
+            # Tādi paši dati jau ir uzzīmēti (piemēram, citam spēlētājam vai pirms izmaiņu atcelšanas)
+            if not os.path.exists(path):
+                jobs.append((path, stats))
+        
+        if jobs:
+            workers = workers or os.cpu_count()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                for _ in executor.map(render_chart_file, jobs, chunksize=chunksize):
+                    pass
+        
+        self.record_renders(self.get_stale_stats,
+                            {player_id: self.chart_key(stats) for player_id, stats in stale.items()})
+        
+        elapsed = time.perf_counter() - start
+        return {
+            'players': len(stale),
+            'rendered': len(jobs),
+            'seconds': elapsed,
+            'charts_per_second': len(jobs) / elapsed if elapsed > 0 else 0
+        }
+
+# Līgas datu eksports (player_stats kopā ar spēlētājiem, komandām un spēlēm)
+class LeagueExport:
+    columns = ['stat_id', 'match_id', 'date', 'team1_name', 'team2_name', 'score_team1', 'score_team2',
+               'player_id', 'player_name', 'number', 'position', 'team_id', 'team_name',
+               'points', 'blocks', 'serves']
+    
+    def __init__(self, db, batch_size=1000):
+        self.db = db
+        self.batch_size = batch_size
+    
+    def build_query(self, team_id=None, season=None, date_from=None, date_to=None):
+        conditions = []
+        params = []
+        if team_id:
+            # Komanda, par kuru spēlētājs spēlēja šajā spēlē, nevis viņa pašreizējā komanda
+            conditions.append("COALESCE(ps.team_id, p.team_id) = ?")
+            params.append(team_id)
+        if season:
+            # Sezona ir gads; filtrē kā datumu intervālu
+            conditions.append("m.date >= ? AND m.date < ?")
+            params.extend([f"{season}-01-01", f"{int(season) + 1}-01-01"])
+        if date_from:
+            conditions.append("m.date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("m.date <= ?")
+            params.append(date_to)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Vienas sezonas eksports lasa tikai tās partīciju, pārējie - visas sezonas
+        if season:
+            stats_table = self.db.season_table('player_stats', season)
+            matches_table = self.db.season_table('matches', season)
+        else:
+            stats_table = self.db.career_table('player_stats')
+            matches_table = self.db.career_table('matches')
+        # Kārtošana pēc ps.id seko tabulas glabāšanas secībai, tāpēc SQLite nav jāveido pagaidu indekss
+        query = f"""
+            SELECT ps.id, m.id, m.date, t1.name, t2.name, m.score_team1, m.score_team2,
+                p.id, p.name, p.number, p.position, t.id, t.name,
+                ps.points, ps.blocks, ps.serves
+            FROM {stats_table} ps
+            JOIN players p ON ps.player_id = p.id
+            JOIN teams t ON t.id = COALESCE(ps.team_id, p.team_id)
+            JOIN {matches_table} m ON ps.match_id = m.id
+            JOIN teams t1 ON m.team1_id = t1.id
+            JOIN teams t2 ON m.team2_id = t2.id
+            {where}
+            ORDER BY ps.id
+        """
+        return query, params
+    
+    def iter_rows(self, **filters):
+        query, params = self.build_query(**filters)
+        return self.db.iter_rows(query, params, self.batch_size)
+    
+    def iter_csv(self, **filters):
+        # Katrs ģenerētais gabals satur līdz batch_size rindām
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns)
+        count = 0
+        for row in self.iter_rows(**filters):
+            writer.writerow(row)
+            count += 1
+            if count % self.batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    def iter_jsonl(self, **filters):
+        lines = []
+        for row in self.iter_rows(**filters):
+            lines.append(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False))
+            if len(lines) == self.batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+# Izspēļu notikumu uzņemšana spēles laikā. Notikumi tiek krāti atmiņā un fona pavediens
+# tos periodiski apkopo un ieraksta vienā transakcijā (rally_events, player_set_stats, player_stats)
+class RallyIngest:
+    # Darbības veids -> (punkti, bloki, serves)
+    actions = {
+        'point': (1, 0, 0),
+        'block': (1, 1, 0),
+        'serve': (0, 0, 1),
+        'ace': (1, 0, 1)
+    }
+    
+    def __init__(self, db_name, flush_interval=1.0, max_batch=20000, max_buffered=200000):
+        self.db_name = db_name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        # Bufera augšējā robeža: ja rakstīšana atpaliek, jauni notikumi tiek atraidīti (503)
+        self.max_buffered = max_buffered
+        self.buffer = deque()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.received = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.last_flush_at = None
+        self.last_flush_seconds = 0
+        self.recent_flushes = deque()  # (laiks, notikumu skaits) pēdējām 10 sekundēm
+    
+    def parse_event(self, event):
+        if not isinstance(event, dict):
+            raise ValueError("Notikumam jābūt JSON objektam")
+        action = event.get('action')
+        if action not in self.actions:
+            raise ValueError(f"Nezināms darbības veids: {action}")
+        set_number = int(event.get('set', 0))
+        if set_number < 1:
+            raise ValueError("Seta numuram jābūt pozitīvam")
+        return (
+            int(event['match_id']),
+            int(event['player_id']),
+            action,
+            set_number,
+            float(event.get('timestamp') or time.time())
+        )
+    
+    def submit(self, events):
+        # Vispirms pārbauda visus notikumus, lai nederīgs pieprasījums netiktu pieņemts daļēji
+        parsed = [self.parse_event(event) for event in events]
+        received_at = time.time()
+        with self.lock:
+            if len(self.buffer) + len(parsed) > self.max_buffered:
+                self.rejected += len(parsed)
+                raise Full(f"Uzņemšanas buferis ir pilns ({len(self.buffer)} notikumi)")
+            self.buffer.extend((event, received_at) for event in parsed)
+            self.received += len(parsed)
+            buffered = len(self.buffer)
+        
+        self.start()
+        if buffered >= self.max_batch:
+            self.wakeup.set()
+        return len(parsed)
+    
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self.run, daemon=True)
+                    self.thread.start()
+    
+    def run(self):
+        # SQLite savienojumu nevar dalīt starp pavedieniem, tāpēc fona pavedienam ir savs
+        db = Database(self.db_name)
+        try:
+            while True:
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+                try:
+                    self.flush(db)
+                except sqlite3.Error:
+                    # Porcija jau ir atgriezta buferī; nākamais mēģinājums pēc flush_interval
+                    logging.getLogger(__name__).exception("Notikumu ierakstīšana neizdevās")
+        finally:
+            db.close()
+    
+    def drain(self):
+        with self.lock:
+            batch = list(self.buffer)
+            self.buffer.clear()
+        return batch
+    
+    def flush(self, db):
+        batch = self.drain()
+        if not batch:
+            return 0
+        
+        start = time.perf_counter()
+        
+        # Apkopo notikumus pa (spēle, spēlētājs, sets)
+        totals = {}
+        for event, received_at in batch:
+            match_id, player_id, action, set_number, timestamp = event
+            points, blocks, serves = self.actions[action]
+            key = (match_id, player_id, set_number)
+            total = totals.setdefault(key, [0, 0, 0])
+            total[0] += points
+            total[1] += blocks
+            total[2] += serves
+        
+        match_totals = {}
+        for (match_id, player_id, set_number), (points, blocks, serves) in totals.items():
+            total = match_totals.setdefault((match_id, player_id), [0, 0, 0])
+            total[0] += points
+            total[1] += blocks
+            total[2] += serves
+        
+        if not db.conn:
+            db.connect()
+        try:
+            self.write_batch(db, batch, totals, match_totals)
+        except sqlite3.Error:
+            # Transakcija atcelta: porcija atgriežas bufera sākumā, lai secība saglabātos
+            with self.lock:
+                self.buffer.extendleft(reversed(batch))
+                self.failed_flushes += 1
+            raise
+        
+        now = time.time()
+        with self.lock:
+            self.flushed += len(batch)
+            self.batches += 1
+            self.last_flush_at = now
+            self.last_flush_seconds = time.perf_counter() - start
+            self.recent_flushes.append((now, len(batch)))
+            while self.recent_flushes and self.recent_flushes[0][0] < now - 10:
+                self.recent_flushes.popleft()
+        return len(batch)
+    
+    def write_batch(self, db, batch, totals, match_totals):
+        with db.conn:
+            db.conn.executemany("""
+                INSERT INTO rally_events (match_id, player_id, action, set_number, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """, [event for event, received_at in batch])
+            db.conn.executemany("""
+                INSERT INTO player_set_stats (match_id, player_id, set_number, points, blocks, serves)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (match_id, set_number, player_id) DO UPDATE SET
+                    points = points + excluded.points,
+                    blocks = blocks + excluded.blocks,
+                    serves = serves + excluded.serves
+            """, [key + tuple(total) for key, total in totals.items()])
+            for (match_id, player_id), (points, blocks, serves) in match_totals.items():
+                cursor = db.conn.execute("""
+                    UPDATE player_stats SET
+                        points = COALESCE(points, 0) + ?,
+                        blocks = COALESCE(blocks, 0) + ?,
+                        serves = COALESCE(serves, 0) + ?
+                    WHERE match_id = ? AND player_id = ?
+                """, (points, blocks, serves, match_id, player_id))
+                if cursor.rowcount == 0:
+                    db.conn.execute("""
+                        INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id)
+                        VALUES (?, ?, ?, ?, ?, (SELECT team_id FROM players WHERE id = ?))
+                    """, (player_id, match_id, points, blocks, serves, player_id))
+    
+    def get_metrics(self):
+        now = time.time()
+        with self.lock:
+            oldest = self.buffer[0][1] if self.buffer else None
+            recent = [count for flushed_at, count in self.recent_flushes if flushed_at >= now - 10]
+            return {
+                'received': self.received,
+                'rejected': self.rejected,
+                'flushed': self.flushed,
+                'buffered': len(self.buffer),
+                'batches': self.batches,
+                'failed_flushes': self.failed_flushes,
+                # Cik ilgi vecākais vēl neierakstītais notikums gaida buferī
+                'lag_seconds': round(now - oldest, 3) if oldest else 0,
+                'last_flush_seconds': round(self.last_flush_seconds, 4),
+                'events_per_second': round(sum(recent) / 10, 1)
+            }
+
+# Tiešraides rezultātu tablo. Katrai spēlei ir viens ražotāja pavediens, kas aprēķina rezultātu
+# un spēlētāju statistiku vienreiz un izsūta izmaiņas visiem klausītājiem caur ierobežotām rindām
+class LiveSubscriber:
+    def __init__(self, queue_size):
+        self.queue = Queue(maxsize=queue_size)
+        self.dropped = False
+
+class MatchBroadcaster:
+    def __init__(self, scoreboard, match_id):
+        self.scoreboard = scoreboard
+        self.match_id = match_id
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.sequence = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def load_snapshot(self, db):
+        match_data = db.fetch_one("""
+            SELECT m.id, t1.name, t2.name, t1.id, t2.id, m.date, m.score_team1, m.score_team2
+            FROM matches m
+            JOIN teams t1 ON m.team1_id = t1.id
+            JOIN teams t2 ON m.team2_id = t2.id
+            WHERE m.id = ?
+        """, (self.match_id,))
+        if not match_data:
+            return None
+        
+        match_id, team1_name, team2_name, team1_id, team2_id, date, score_team1, score_team2 = match_data
+        snapshot = {
+            'match_id': match_id,
+            'team1_name': team1_name,
+            'team2_name': team2_name,
+            'date': date,
+            'score_team1': score_team1,
+            'score_team2': score_team2,
+            'players': {}
+        }
+        
+        for team_id in (team1_id, team2_id):
+            team_stats = db.fetch_all("""
+                SELECT p.id, p.name, p.number, ps.points, ps.blocks, ps.serves
+                FROM player_stats ps
+                JOIN players p ON ps.player_id = p.id
+                WHERE ps.match_id = ? AND COALESCE(ps.team_id, p.team_id) = ?
+                ORDER BY ps.points DESC
+            """, (self.match_id, team_id))
+            for player_id, name, number, points, blocks, serves in team_stats:
+                snapshot['players'][str(player_id)] = {
+                    'team_id': team_id,
+                    'name': name,
+                    'number': number,
+                    'points': points or 0,
+                    'blocks': blocks or 0,
+                    'serves': serves or 0
+                }
+        return snapshot
+    
+    def diff(self, old, new):
+        delta = {key: new[key] for key in ('score_team1', 'score_team2') if old[key] != new[key]}
+        players = {player_id: stats for player_id, stats in new['players'].items()
+                   if old['players'].get(player_id) != stats}
+        if players:
+            delta['players'] = players
+        return delta
+    
+    def format_event(self, event, data):
+        self.sequence += 1
+        data = dict(data, seq=self.sequence, sent_at=time.time())
+        return f"event: {event}\nid: {self.sequence}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    def subscribe(self):
+        subscriber = LiveSubscriber(self.scoreboard.queue_size)
+        with self.lock:
+            if self.snapshot is not None:
+                subscriber.queue.put_nowait(self.format_event('snapshot', self.snapshot))
+            self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+    
+    def publish(self, message):
+        # Ziņa tiek serializēta vienreiz; lēnie klausītāji, kuru rinda ir pilna, tiek atvienoti
+        with self.lock:
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.queue.put_nowait(message)
+                except Full:
+                    subscriber.dropped = True
+                    self.subscribers.discard(subscriber)
+                    self.scoreboard.dropped += 1
+    
+    def run(self):
+        db = Database(self.scoreboard.db_name)
+        db.connect()
+        data_version = None
+        try:
+            while True:
+                # Pārbaude un izņemšana notiek zem tablo slēdzenes: jauns klausītājs vai nu
+                # pievienojas šim raidītājam pirms pārbaudes, vai arī saņem jaunu raidītāju
+                if self.scoreboard.remove_if_idle(self):
+                    break
+                
+                # data_version mainās tikai tad, kad cits savienojums ir ierakstījis datus,
+                # tāpēc vaicājumi tiek izpildīti tikai pēc reālām izmaiņām
+                current_version = db.fetch_one("PRAGMA data_version")[0]
+                if current_version != data_version:
+                    data_version = current_version
+                    snapshot = self.load_snapshot(db)
+                    if snapshot is not None:
+                        with self.lock:
+                            previous = self.snapshot
+                            self.snapshot = snapshot
+                            if previous is None:
+                                message = self.format_event('snapshot', snapshot)
+                            else:
+                                delta = self.diff(previous, snapshot)
+                                message = self.format_event('delta', delta) if delta else None
+                        if message:
+                            self.publish(message)
+                
+                time.sleep(self.scoreboard.interval)
+        finally:
+            db.close()
+            self.scoreboard.remove(self)
+
+class LiveScoreboard:
+    def __init__(self, db_name, interval=1.0, queue_size=100):
+        self.db_name = db_name
+        self.interval = interval
+        self.queue_size = queue_size
+        self.broadcasters = {}
+        self.lock = threading.Lock()
+        self.dropped = 0
+    
+    def subscribe(self, match_id):
+        with self.lock:
+            broadcaster = self.broadcasters.get(match_id)
+            if broadcaster is None:
+                broadcaster = MatchBroadcaster(self, match_id)
+                self.broadcasters[match_id] = broadcaster
+                subscriber = broadcaster.subscribe()
+                broadcaster.thread.start()
+            else:
+                subscriber = broadcaster.subscribe()
+        return broadcaster, subscriber
+    
+    def remove(self, broadcaster):
+        with self.lock:
+            if self.broadcasters.get(broadcaster.match_id) is broadcaster:
+                del self.broadcasters[broadcaster.match_id]
+    
+    def remove_if_idle(self, broadcaster):
+        # Slēdzeņu secība tāda pati kā subscribe: vispirms tablo, tad raidītājs
+        with self.lock:
+            with broadcaster.lock:
+                if broadcaster.subscribers:
+                    return False
+            if self.broadcasters.get(broadcaster.match_id) is broadcaster:
+                del self.broadcasters[broadcaster.match_id]
+            return True
+    
+    def stream(self, match_id, keepalive=15):
+        broadcaster, subscriber = self.subscribe(match_id)
+        try:
+            while not subscriber.dropped:
+                try:
+                    yield subscriber.queue.get(timeout=keepalive)
+                except Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+    
+    def get_metrics(self):
+        with self.lock:
+            return {
+                'matches': len(self.broadcasters),
+                'subscribers': sum(len(broadcaster.subscribers) for broadcaster in self.broadcasters.values()),
+                'dropped': self.dropped
+            }
+
+# Pieprasījumu uzņemšanas kontrole dārgiem maršrutiem: ne vairāk kā max_concurrent vienlaicīgi
+# apstrādātu pieprasījumu un īsa gaidīšanas rinda; pārējie saņem 503 vai rezerves atbildi
+class RouteLimiter:
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout=0.5, retry_after=2):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.degraded = 0
+    
+    def acquire(self):
+        if not self.semaphore.acquire(blocking=False):
+            with self.lock:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    return False
+                self.waiting += 1
+            acquired = self.semaphore.acquire(timeout=self.queue_timeout)
+            with self.lock:
+                self.waiting -= 1
+                if not acquired:
+                    self.timed_out += 1
+                    return False
+        with self.lock:
+            self.active += 1
+            self.admitted += 1
+        return True
+    
+    def release(self):
+        with self.lock:
+            self.active -= 1
+        self.semaphore.release()
+    
+    def get_metrics(self):
+        with self.lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'queue_depth': self.waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'degraded': self.degraded
+            }
+
+def limit_concurrency(limiter, fallback=None):
+    # Dekorators maršrutam; fallback var atgriezt rezerves atbildi (piemēram, kešotu saturu)
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not limiter.acquire():
+                if fallback:
+                    response = fallback(*args, **kwargs)
+                    if response is not None:
+                        with limiter.lock:
+                            limiter.degraded += 1
+                        return response
+                return Response("Serveris ir pārslogots, lūdzu, mēģiniet vēlāk", 503,
+                                headers={'Retry-After': str(limiter.retry_after)})
+            try:
+                return view(*args, **kwargs)
+            finally:
+                limiter.release()
+        return wrapper
+    return decorator
+
+# Datubāzes rezerves kopijas ar SQLite tiešsaistes backup API. Kopēšana notiek pa nelielām
+# lapu porcijām ar pauzēm starp tām, lai lietotnes pieprasījumi netiktu bloķēti
+class BackupManager:
+    def __init__(self, db_name, backup_dir='backups', pages_per_step=16, step_sleep=0.01, keep=7):
+        self.db_name = db_name
+        self.backup_dir = backup_dir
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.keep = keep
+        self.last_source_state = None
+        self.thread = None
+        self.last_report = None
+    
+    def source_state(self):
+        # Faila izmērs un modificēšanas laiks (arī WAL failam) - ja nav mainījušies, kopija nav vajadzīga
+        state = []
+        for path in (self.db_name, self.db_name + '-wal'):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                state.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(state)
+    
+    def checksum(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def list_backups(self):
+        if not os.path.isdir(self.backup_dir):
+            return []
+        return sorted(os.path.join(self.backup_dir, name) for name in os.listdir(self.backup_dir)
+                      if name.endswith('.db'))
+    
+    def backup(self, force=False):
+        source_state = self.source_state()
+        if not force and source_state == self.last_source_state:
+            return None
+        
+        os.makedirs(self.backup_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(self.db_name))[0]
+        path = os.path.join(self.backup_dir, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db")
+        temp_path = path + '.tmp'
+        
+        steps = 0
+        def progress(status, remaining, total):
+            nonlocal steps
+            steps += 1
+            # Pauze starp porcijām ļauj citiem savienojumiem rakstīt
+            if remaining:
+                time.sleep(self.step_sleep)
+        
+        start = time.perf_counter()
+        try:
+            source = sqlite3.connect(self.db_name, isolation_level=None)
+            target = sqlite3.connect(temp_path)
+            try:
+                # Visu kopēšanas laiku tiek turēta viena lasīšanas transakcija. WAL režīmā tā nebloķē
+                # rakstītājus, un kopija atbilst vienam momentuzņēmumam - bez tās citu savienojumu
+                # ieraksti liktu SQLite sākt kopēšanu no jauna pēc katra soļa
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                source.backup(target, pages=self.pages_per_step, progress=progress)
+                source.execute("COMMIT")
+                integrity = target.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+            
+            if integrity != 'ok':
+                raise RuntimeError(f"Rezerves kopijas integritātes pārbaude neizdevās: {integrity}")
+            
+            os.replace(temp_path, path)
+        finally:
+            # Neizdevusies kopija neatstāj pusgatavu pagaidu failu
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        checksum = self.checksum(path)
+        with open(path + '.sha256', 'w') as f:
+            f.write(f"{checksum}  {os.path.basename(path)}\n")
+        
+        self.last_source_state = source_state
+        removed = self.rotate()
+        self.last_report = {
+            'path': path,
+            'seconds': time.perf_counter() - start,
+            'steps': steps,
+            'size': os.path.getsize(path),
+            'checksum': checksum,
+            'removed': removed
+        }
+        return self.last_report
+    
+    def verify(self, path):
+        # Salīdzina kontrolsummu ar saglabāto un pārbauda kopijas integritāti
+        with open(path + '.sha256') as f:
+            expected = f.read().split()[0]
+        if self.checksum(path) != expected:
+            return False
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+        finally:
+            conn.close()
+    
+    def rotate(self):
+        # Patur tikai jaunākās `keep` kopijas
+        removed = []
+        for path in self.list_backups()[:-self.keep] if self.keep else []:
+            for old_path in (path, path + '.sha256'):
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+            removed.append(path)
+        return removed
+    
+    def start_schedule(self, interval):
+        # Fona pavediens, kas ik pēc `interval` sekundēm izveido kopiju, ja dati ir mainījušies
+        def run():
+            while True:
+                try:
+                    self.backup()
+                except (sqlite3.Error, OSError, RuntimeError):
+                    logging.getLogger(__name__).exception("Rezerves kopija neizdevās")
+                time.sleep(interval)
+        
+        if self.thread is None:
+            self.thread = threading.Thread(target=run, daemon=True)
+            self.thread.start()
+
+# Apkopotās statistikas momentuzņēmums fiksēta izmēra binārajos ierakstos. Vairāki lietotnes
+# procesi to atver ar mmap tikai lasīšanai, tāpēc operētājsistēma tur vienu kopiju atmiņā
+class SnapshotBuilder:
+    magic = b'VBSNAP01'
+    version = 2
+    header = struct.Struct('<8sIIIIdq')      # maģija, versija, spēlētāji, komandas, līderi, izveides laiks, datu versija
+    player_record = struct.Struct('<iiiiii')  # player_id, team_id, games, points, blocks, serves
+    team_record = struct.Struct('<iiiiii')    # team_id, position, wins, losses, draws, player_count
+    leader_record = struct.Struct('<ii')      # player_id, points
+    
+    def __init__(self, db, path='aggregates.snap', leaderboard_size=None):
+        self.db = db
+        self.path = path
+        # Pēc noklusējuma visi spēlētāji punktu secībā (/players lapai)
+        self.leaderboard_size = leaderboard_size
+    
+    def build(self, data_version=0):
+        players_data = self.db.fetch_all("""
+            SELECT p.id, COALESCE(p.team_id, 0), COUNT(f.stat_id),
+                COALESCE(SUM(f.points), 0), COALESCE(SUM(f.blocks), 0), COALESCE(SUM(f.serves), 0)
+            FROM players p
+            LEFT JOIN player_form f ON f.player_id = p.id
+            GROUP BY p.id
+            ORDER BY p.id
+        """)
+        matches_table = self.db.career_table('matches')
+        teams_data = self.db.fetch_all(f"""
+            SELECT t.id,
+                COALESCE(SUM(r.won), 0), COALESCE(SUM(r.lost), 0), COALESCE(SUM(r.drawn), 0),
+                (SELECT COUNT(*) FROM players p WHERE p.team_id = t.id)
+            FROM teams t
+            LEFT JOIN (
+                SELECT team1_id AS team_id, score_team1 > score_team2 AS won,
+                    score_team1 < score_team2 AS lost, score_team1 = score_team2 AS drawn
+                FROM {matches_table} WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL
+                UNION ALL
+                SELECT team2_id, score_team2 > score_team1, score_team2 < score_team1, score_team1 = score_team2
+                FROM {matches_table} WHERE score_team1 IS NOT NULL AND score_team2 IS NOT NULL
+            ) r ON r.team_id = t.id
+            GROUP BY t.id
+            ORDER BY 2 DESC, 3 ASC, t.id
+        """)
+        leaders = sorted(players_data, key=lambda player: (-player[3], player[0]))[:self.leaderboard_size]
+        
+        size = (self.header.size + len(players_data) * self.player_record.size
+                + len(teams_data) * self.team_record.size + len(leaders) * self.leader_record.size)
+        buffer = bytearray(size)
+        self.header.pack_into(buffer, 0, self.magic, self.version, len(players_data), len(teams_data), len(leaders),
+                              time.time(), data_version)
+        
+        offset = self.header.size
+        for player in players_data:
+            self.player_record.pack_into(buffer, offset, *player)
+            offset += self.player_record.size
+        for position, (team_id, wins, losses, draws, player_count) in enumerate(teams_data, start=1):
+            self.team_record.pack_into(buffer, offset, team_id, position, wins, losses, draws, player_count)
+            offset += self.team_record.size
+        for player in leaders:
+            self.leader_record.pack_into(buffer, offset, player[0], player[3])
+            offset += self.leader_record.size
+        
+        # Jaunais fails aizstāj veco ar atomāru pārdēvēšanu; lasītāji, kas vēl tur veco
+        # failu atvērtu, turpina to lietot, līdz pamana jauno
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        return {'players': len(players_data), 'teams': len(teams_data), 'size': size}
+
+# Atvērtā momentuzņēmuma stāvoklis. Tiek publicēts kā viens nemainīgs objekts, tāpēc lasītājs
+# nekad nesavieno jaunā faila kartējumu ar vecā faila nobīdēm
+SnapshotState = namedtuple('SnapshotState', ('mapping', 'inode', 'counts', 'built_at', 'data_version',
+                                             'players_offset', 'teams_offset', 'leaders_offset'))
+
+class AggregateSnapshot:
+    def __init__(self, path='aggregates.snap', check_interval=1.0, db=None, change_feed=None, grace=30.0):
+        self.path = path
+        self.check_interval = check_interval
+        # Ar db un change_feed momentuzņēmums tiek pārbūvēts, kad dati mainās (sk. current)
+        self.db = db
+        self.change_feed = change_feed
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.state = None
+        self.checked_at = 0
+        self.thread = None
+        # Aizstātie mmap tiek aizvērti pēc `grace` sekundēm, kad lasītāji, kas tos paņēma, ir beiguši
+        self.grace = grace
+        self.retired = []
+    
+    def retire(self, state, now):
+        self.retired.append((now, state.mapping))
+        still_open = []
+        for retired_at, mapping in self.retired:
+            if now - retired_at < self.grace:
+                still_open.append((retired_at, mapping))
+                continue
+            try:
+                mapping.close()
+            except BufferError:
+                # Kāds vēl tur memoryview (piem., iter_leaders ģenerators) - mēģina nākamreiz
+                still_open.append((retired_at, mapping))
+        self.retired = still_open
+    
+    def refresh(self, force=False):
+        # Pēc atomāras aizstāšanas faila inode mainās - tad atver jauno momentuzņēmumu.
+        # Atgriež pašreizējo stāvokli vai None, ja derīga faila nav
+        now = time.monotonic()
+        state = self.state
+        if state is not None and not force and now - self.checked_at < self.check_interval:
+            return state
+        with self.lock:
+            self.checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self.state
+            if self.state is not None and stat.st_ino == self.state.inode:
+                return self.state
+            with open(self.path, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, players, teams, leaders, built_at, data_version = \
+                SnapshotBuilder.header.unpack_from(mapping, 0)
+            if magic != SnapshotBuilder.magic:
+                mapping.close()
+                raise ValueError(f"{self.path} nav momentuzņēmuma fails")
+            if version != SnapshotBuilder.version:
+                # Cita formāta fails: tiks pārbūvēts
+                mapping.close()
+                return None
+            players_offset = SnapshotBuilder.header.size
+            teams_offset = players_offset + players * SnapshotBuilder.player_record.size
+            leaders_offset = teams_offset + teams * SnapshotBuilder.team_record.size
+            if self.state is not None:
+                self.retire(self.state, now)
+            self.state = SnapshotState(mapping, stat.st_ino, (players, teams, leaders), built_at, data_version,
+                                       players_offset, teams_offset, leaders_offset)
+            return self.state
+    
+    def current(self):
+        # Momentuzņēmums pašreizējiem datiem. Ja dati kopš izveides mainījušies, jauno failu būvē fona
+        # pavediens, bet līdz tam tiek atgriezts iepriekšējais; pārējie procesi jauno failu pamana pēc
+        # inode maiņas. Pieprasījumā būvē tikai tad, ja derīga faila vēl nav vispār
+        data_version = self.change_feed.latest()
+        state = self.refresh()
+        if state is not None:
+            if state.data_version != data_version:
+                self.rebuild_in_background()
+            return state
+        with self.build_lock:
+            state = self.refresh(force=True)
+            if state is None:
+                SnapshotBuilder(self.db, self.path).build(data_version)
+                state = self.refresh(force=True)
+        return state
+    
+    def rebuild_in_background(self):
+        # Ja būvēšana jau notiek, jaunās izmaiņas paņems nākamā, ko izraisīs nākamais pieprasījums
+        if not self.build_lock.acquire(blocking=False):
+            return
+        try:
+            self.thread = threading.Thread(target=self.rebuild, daemon=True, name='snapshot-rebuild')
+            self.thread.start()
+        except RuntimeError:
+            self.build_lock.release()
+            raise
+    
+    def rebuild(self):
+        try:
+            data_version = self.change_feed.latest()
+            state = self.refresh(force=True)
+            if state is None or state.data_version != data_version:
+                SnapshotBuilder(self.db, self.path).build(data_version)
+                self.refresh(force=True)
+        except (sqlite3.Error, OSError, ValueError):
+            logging.getLogger(__name__).exception("Momentuzņēmuma pārbūve neizdevās")
+        finally:
+            # Pavediena savienojums vairs nav vajadzīgs
+            self.db.close()
+            self.build_lock.release()
+    
+    def get_player(self, player_id, state=None):
+        # Binārā meklēšana pa spēlētāju ierakstiem, kas sakārtoti pēc id
+        state = state or self.refresh()
+        if state is None:
+            return None
+        record = SnapshotBuilder.player_record
+        low, high = 0, state.counts[0] - 1
+        while low <= high:
+            middle = (low + high) // 2
+            values = record.unpack_from(state.mapping, state.players_offset + middle * record.size)
+            if values[0] == player_id:
+                return dict(zip(('player_id', 'team_id', 'games', 'points', 'blocks', 'serves'), values))
+            elif values[0] < player_id:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+    
+    def get_standings(self, state=None):
+        state = state or self.refresh()
+        if state is None:
+            return []
+        fields = ('team_id', 'position', 'wins', 'losses', 'draws', 'player_count')
+        return [dict(zip(fields, values)) for values in
+                SnapshotBuilder.team_record.iter_unpack(
+                    memoryview(state.mapping)[state.teams_offset:state.leaders_offset])]
+    
+    def get_leaderboard(self, limit=10, state=None):
+        state = state or self.refresh()
+        if state is None:
+            return []
+        record = SnapshotBuilder.leader_record
+        count = min(limit, state.counts[2])
+        return [dict(zip(('player_id', 'points'), record.unpack_from(state.mapping, state.leaders_offset + i * record.size)))
+                for i in range(count)]
+    
+    def iter_leaders(self, state, chunk_size=500):
+        # Spēlētāji punktu secībā pa porcijām: (player_id, points) saraksti
+        record = SnapshotBuilder.leader_record
+        for start in range(0, state.counts[2], chunk_size):
+            end = min(start + chunk_size, state.counts[2])
+            yield list(record.iter_unpack(
+                memoryview(state.mapping)[state.leaders_offset + start * record.size:state.leaders_offset + end * record.size]))
+
+# Savstarpējo spēļu (head-to-head) statistika starp komandām
+class HeadToHead:
+    fields = ('team_id', 'opponent_id', 'played', 'wins', 'losses', 'draws', 'sets_for', 'sets_against',
+              'last_match_id', 'last_date', 'last_sets_for', 'last_sets_against')
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def to_dict(self, row):
+        record = dict(zip(self.fields, row))
+        record['set_difference'] = record['sets_for'] - record['sets_against']
+        return record
+    
+    def get(self, team_id, opponent_id):
+        # Viena rinda pēc primārās atslēgas
+        row = self.db.fetch_one(f"""
+            SELECT {', '.join(self.fields)} FROM head_to_head WHERE team_id = ? AND opponent_id = ?
+        """, (team_id, opponent_id))
+        return self.to_dict(row) if row else None
+    
+    def get_team(self, team_id):
+        rows = self.db.fetch_all(f"""
+            SELECT {', '.join('h.' + field for field in self.fields)}, t.name
+            FROM head_to_head h
+            JOIN teams t ON h.opponent_id = t.id
+            WHERE h.team_id = ?
+            ORDER BY t.name
+        """, (team_id,))
+        return [dict(self.to_dict(row[:-1]), opponent_name=row[-1]) for row in rows]
+    
+    def get_matrix(self):
+        # Visas līgas matrica: rindas un kolonnas ir komandas, šūna - rindas komandas bilance pret kolonnas komandu
+        teams = [{'id': team_id, 'name': name} for team_id, name in
+                 self.db.fetch_all("SELECT id, name FROM teams ORDER BY name")]
+        cells = {}
+        for row in self.db.fetch_all(f"SELECT {', '.join(self.fields)} FROM head_to_head"):
+            record = self.to_dict(row)
+            cells[(record['team_id'], record['opponent_id'])] = record
+        return teams, cells
+
+# Izmaiņu plūsma: atvasinātie dati un keši var atjaunoties pēc kursora, nevis pārbūvēt visu
+class ChangeFeed:
+    tables = ('teams', 'players', 'matches', 'player_stats')
+    
+    def __init__(self, db, retention=7 * 24 * 3600):
+        self.db = db
+        # Cik sekundes ierakstus glabā, ja neviens patērētājs nav reģistrēts
+        self.retention = retention
+    
+    def latest(self, table_name=None):
+        # Pēdējais seq visā žurnālā vai vienai tabulai (izmantojams kā keša versija)
+        if table_name:
+            return self.db.fetch_one("SELECT COALESCE(MAX(seq), 0) FROM changes WHERE table_name = ?",
+                                     (table_name,))[0]
+        # sqlite_sequence glabā lielāko piešķirto seq arī pēc tam, kad žurnāls ir apgriezts
+        sequence_data = self.db.fetch_one("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+        return sequence_data[0] if sequence_data else 0
+    
+    def poll(self, cursor=0, tables=None, limit=1000):
+        # Izmaiņas pēc kursora; atgriež tās un nākamo kursoru. Žurnāla beigas tiek nolasītas pirms
+        # vaicājuma, lai kursors nepārlēktu pāri izmaiņām, kas ierakstītas tā izpildes laikā
+        limit = max(1, limit)
+        end = self.latest()
+        query = "SELECT seq, table_name, row_id, operation, changed_at FROM changes WHERE seq > ? AND seq <= ?"
+        params = [cursor, end]
+        if tables:
+            query += f" AND table_name IN ({', '.join('?' * len(tables))})"
+            params.extend(tables)
+        query += " ORDER BY seq LIMIT ?"
+        params.append(limit)
+        
+        changes = [dict(zip(('seq', 'table', 'row_id', 'operation', 'changed_at'), row))
+                   for row in self.db.fetch_all(query, params)]
+        # Ja viss izlasīts, kursors pārvietojas līdz beigām, arī ja tabulu filtrs izlaida pēdējos ierakstus
+        next_cursor = changes[-1]['seq'] if len(changes) == limit else max(cursor, end)
+        return changes, next_cursor
+    
+    def tail(self, cursor=None, tables=None, interval=0.5, timeout=None):
+        # Ģenerators, kas gaida un atgriež jaunas izmaiņas; bez kursora sāk no pašreizējām beigām
+        cursor = self.latest() if cursor is None else cursor
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while deadline is None or time.monotonic() < deadline:
+            changes, cursor = self.poll(cursor, tables)
+            yield from changes
+            if not changes:
+                time.sleep(interval)
+    
+    def get_cursor(self, consumer):
+        cursor_data = self.db.fetch_one("SELECT seq FROM change_cursors WHERE consumer = ?", (consumer,))
+        return cursor_data[0] if cursor_data else 0
+    
+    def commit_cursor(self, consumer, seq):
+        self.db.execute("""
+            INSERT INTO change_cursors (consumer, seq) VALUES (?, ?)
+            ON CONFLICT (consumer) DO UPDATE SET seq = MAX(seq, excluded.seq)
+        """, (consumer, seq))
+    
+    def consume(self, consumer, handler, tables=None, limit=1000):
+        # Apstrādā visas izmaiņas kopš patērētāja kursora un saglabā jauno kursoru
+        cursor = self.get_cursor(consumer)
+        processed = 0
+        while True:
+            changes, next_cursor = self.poll(cursor, tables, limit)
+            if changes:
+                handler(changes)
+                processed += len(changes)
+            self.commit_cursor(consumer, next_cursor)
+            if len(changes) < limit:
+                return processed
+            cursor = next_cursor
+    
+    def prune(self):
+        # Dzēš ierakstus, kurus jau apstrādājuši visi reģistrētie patērētāji. Ja patērētāju nav,
+        # žurnāls citādi augtu bez ierobežojuma, tāpēc tad dzēš ierakstus, kas vecāki par glabāšanas logu
+        oldest = self.db.fetch_one("SELECT MIN(seq) FROM change_cursors")[0]
+        if oldest is None:
+            condition, params = "changed_at < ?", (time.time() - self.retention,)
+        else:
+            condition, params = "seq <= ?", (oldest,)
+        count = self.db.fetch_one(f"SELECT COUNT(*) FROM changes WHERE {condition}", params)[0]
+        self.db.execute(f"DELETE FROM changes WHERE {condition}", params)
+        return count
+
+# Sezonu partīcijas: pagājušās sezonas tiek pārvietotas uz atsevišķiem failiem (aukstā glabātuve),
+# lai galvenajā datubāzē paliktu tikai karstās sezonas spēles un statistika
+class SeasonPartitions:
+    # Karjeras vaicājumi pievieno visas arhivētās sezonas vienam savienojumam, bet SQLite
+    # (SQLITE_MAX_ATTACHED) pēc noklusējuma atļauj ne vairāk kā 10 pievienotas datubāzes
+    max_partitions = 10
+    
+    def __init__(self, db, directory='seasons'):
+        self.db = db
+        self.directory = directory
+    
+    def partition_path(self, season):
+        return os.path.join(self.directory, f"season_{season}.db")
+    
+    def list_partitions(self):
+        partitions_data = self.db.fetch_all("""
+            SELECT season, path, matches, stats, archived_at, compacted_at FROM season_partitions ORDER BY season
+        """)
+        partitions = []
+        for season, path, matches, stats, archived_at, compacted_at in partitions_data:
+            partitions.append({
+                'season': season,
+                'path': path,
+                'matches': matches,
+                'stats': stats,
+                'size': os.path.getsize(path) if os.path.exists(path) else 0,
+                'archived_at': datetime.fromtimestamp(archived_at).strftime("%Y-%m-%d %H:%M"),
+                'compacted_at': datetime.fromtimestamp(compacted_at).strftime("%Y-%m-%d %H:%M") if compacted_at else None
+            })
+        return partitions
+    
+    def archive(self, season):
+        season = str(season)
+        # Sezonas nosaukums tiek izmantots shēmas nosaukumā, tāpēc atļauts tikai gads
+        if not re.fullmatch(r'\d{4}', season):
+            raise ValueError("Sezonai jābūt gadam, piemēram, 2023")
+        if season >= datetime.now().strftime("%Y"):
+            raise ValueError(f"Sezona {season} vēl nav beigusies")
+        if self.db.fetch_one("SELECT 1 FROM season_partitions WHERE season = ?", (season,)):
+            raise ValueError(f"Sezona {season} jau ir arhivēta")
+        if self.db.fetch_one("SELECT COUNT(*) FROM season_partitions")[0] >= self.max_partitions:
+            raise ValueError(f"Arhivēt var ne vairāk kā {self.max_partitions} sezonas")
+        
+        match_filter = "date >= ? AND date < ?"
+        bounds = (f"{season}-01-01", f"{int(season) + 1}-01-01")
+        counts = self.db.fetch_one(f"""
+            SELECT COUNT(*), COUNT(*) - COUNT(score_team1) FROM matches WHERE {match_filter}
+        """, bounds)
+        if counts[0] == 0:
+            raise ValueError(f"Sezonā {season} nav spēļu")
+        if counts[1]:
+            raise ValueError(f"Sezonā {season} ir {counts[1]} neizspēlētas spēles")
+        
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.partition_path(season)
+        schema = f"season_{season}"
+        
+        if not self.db.conn:
+            self.db.connect()
+        conn = self.db.conn
+        if season not in self.db.local.attached:
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            self.db.local.attached.add(season)
+        conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.matches (
+            id INTEGER PRIMARY KEY,
+            team1_id INTEGER,
+            team2_id INTEGER,
+            date TEXT,
+            score_team1 INTEGER,
+            score_team2 INTEGER
+        )
+        ''')
+        conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.player_stats (
+            id INTEGER PRIMARY KEY,
+            player_id INTEGER,
+            match_id INTEGER,
+            points INTEGER DEFAULT 0,
+            blocks INTEGER DEFAULT 0,
+            serves INTEGER DEFAULT 0,
+            team_id INTEGER
+        )
+        ''')
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_player_stats_player ON player_stats (player_id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_player_stats_match ON player_stats (match_id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_matches_date ON matches (date)")
+        
+        # Pārvietošana vienā transakcijā: vai nu sezona ir pilnībā arhīvā, vai pilnībā galvenajā datubāzē
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE partition_state SET archiving = 1 WHERE id = 1")
+            conn.execute(f"INSERT INTO {schema}.matches SELECT {', '.join(Database.partition_columns['matches'])} "
+                         f"FROM main.matches WHERE {match_filter}", bounds)
+            conn.execute(f"""
+                INSERT INTO {schema}.player_stats
+                SELECT {', '.join('ps.' + column for column in Database.partition_columns['player_stats'])}
+                FROM main.player_stats ps
+                JOIN {schema}.matches m ON ps.match_id = m.id
+            """)
+            stats = conn.execute(f"SELECT COUNT(*) FROM {schema}.player_stats").fetchone()[0]
+            
+            # Savstarpējo spēļu pārrēķiniem arhivētās spēles paliek kā gatavas kopsummas
+            baseline = conn.execute(
+                f"SELECT * FROM ({self.db.h2h_aggregate_sql('1', f'{schema}.matches')})").fetchall()
+            conn.execute("DELETE FROM head_to_head_archived")
+            conn.executemany(f"INSERT INTO head_to_head_archived VALUES ({', '.join('?' * 12)})", baseline)
+            
+            conn.execute(f"DELETE FROM main.player_stats WHERE match_id IN (SELECT id FROM {schema}.matches)")
+            conn.execute(f"DELETE FROM main.matches WHERE id IN (SELECT id FROM {schema}.matches)")
+            conn.execute("UPDATE partition_state SET archiving = 0 WHERE id = 1")
+            conn.execute("""
+                INSERT INTO season_partitions (season, path, matches, stats, archived_at) VALUES (?, ?, ?, ?, ?)
+            """, (season, path, counts[0], stats, time.time()))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return {'season': season, 'path': path, 'matches': counts[0], 'stats': stats}
+    
+    def compact(self, season):
+        # Aukstā partīcija vairs nemainās: VACUUM atbrīvo tukšās lapas, ANALYZE atjauno statistiku plānotājam
+        partition = self.db.fetch_one("SELECT path FROM season_partitions WHERE season = ?", (str(season),))
+        if not partition:
+            raise ValueError(f"Sezona {season} nav arhivēta")
+        path = partition[0]
+        size_before = os.path.getsize(path)
+        
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.execute("ANALYZE")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        
+        self.db.execute("UPDATE season_partitions SET compacted_at = ? WHERE season = ?", (time.time(), str(season)))
+        return {'season': str(season), 'size_before': size_before, 'size_after': os.path.getsize(path)}
+
+# Sezonas Monte Carlo simulators: varbūtība katrai komandai ieņemt katru vietu
+class SeasonSimulator:
+    def __init__(self, db, elo, change_feed, simulations=100000):
+        self.db = db
+        self.elo = elo
+        self.change_feed = change_feed
+        self.simulations = simulations
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.season_locks = {}
+        # Ilgdzīvojoši procesu pūli (pēc procesu skaita). 'spawn' konteksts, jo pūls tiek izveidots
+        # servera pavedienā - fork kopētu citu pavedienu aizņemtās slēdzenes
+        self.executors = {}
+        self.executor_lock = threading.Lock()
+    
+    def get_executor(self, workers):
+        with self.executor_lock:
+            executor = self.executors.get(workers)
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                self.executors[workers] = executor
+            return executor
+    
+    def get_version(self):
+        # Pēdējā spēļu izmaiņa izmaiņu žurnālā
+        return self.change_feed.latest('matches')
+    
+    def get_current_season(self):
+        season = self.db.fetch_one("SELECT MAX(substr(date, 1, 4)) FROM matches")[0]
+        return season or datetime.now().strftime("%Y")
+    
+    def load_season(self, season):
+        teams_data = self.db.fetch_all("SELECT id, name FROM teams ORDER BY id")
+        team_ids = [team_id for team_id, _ in teams_data]
+        index = {team_id: i for i, team_id in enumerate(team_ids)}
+        
+        base_wins = np.zeros(len(team_ids), dtype=np.int64)
+        set_difference = np.zeros(len(team_ids))
+        home, away = [], []
+        matches_data = self.db.fetch_all("""
+            SELECT team1_id, team2_id, score_team1, score_team2 FROM matches WHERE substr(date, 1, 4) = ?
+        """, (season,))
+        for team1_id, team2_id, score_team1, score_team2 in matches_data:
+            if team1_id not in index or team2_id not in index:
+                continue
+            if score_team1 is None or score_team2 is None:
+                # Spēle bez rezultāta ir vēl neizspēlēta
+                home.append(index[team1_id])
+                away.append(index[team2_id])
+                continue
+            if score_team1 > score_team2:
+                base_wins[index[team1_id]] += 1
+            elif score_team2 > score_team1:
+                base_wins[index[team2_id]] += 1
+            set_difference[index[team1_id]] += score_team1 - score_team2
+            set_difference[index[team2_id]] += score_team2 - score_team1
+        
+        # Komandu spēks - Elo reitings no visām izspēlētajām spēlēm
+        self.elo.sync()
+        ratings = np.array([self.elo.get_rating(team_id) for team_id in team_ids], dtype=float)
+        home = np.array(home, dtype=np.int64)
+        away = np.array(away, dtype=np.int64)
+        win_probability = 1 / (1 + 10 ** ((ratings[away] - ratings[home]) / 400))
+        
+        return teams_data, base_wins, set_difference, home, away, win_probability
+    
+    def check_season(self, season):
+        # Simulē tikai sezonas, kurām ir spēles; citādi katra patvaļīga ?season= vērtība
+        # paliktu kešā un slēdzeņu vārdnīcā
+        season = season.strip() if season else None
+        if not season:
+            return self.get_current_season()
+        if not self.db.fetch_one("SELECT 1 FROM matches WHERE substr(date, 1, 4) = ? LIMIT 1", (season,)):
+            raise ValueError(f"Sezonai {season} nav spēļu")
+        return season
+    
+    def simulate(self, season=None, simulations=None, workers=None):
+        season = self.check_season(season)
+        simulations = self.simulations if simulations is None else simulations
+        if simulations < 1:
+            raise ValueError("Simulāciju skaitam jābūt vismaz 1")
+        if workers is not None and workers < 1:
+            raise ValueError("Procesu skaitam jābūt vismaz 1")
+        teams_data, base_wins, set_difference, home, away, win_probability = self.load_season(season)
+        
+        start = time.perf_counter()
+        workers = min(workers or os.cpu_count(), simulations)
+        chunks = [simulations // workers + (1 if i < simulations % workers else 0) for i in range(workers)]
+        seeds = np.random.SeedSequence().spawn(workers)
+        jobs = [(base_wins, set_difference, home, away, win_probability, chunk, seed)
+                for chunk, seed in zip(chunks, seeds) if chunk > 0]
+        if workers > 1:
+            counts = sum(self.get_executor(workers).map(simulate_season_chunk, jobs))
+        else:
+            counts = simulate_season_chunk(jobs[0])
+        elapsed = time.perf_counter() - start
+        
+        probabilities = counts / simulations
+        teams = []
+        for i, (team_id, name) in enumerate(teams_data):
+            teams.append({
+                'team_id': team_id,
+                'name': name,
+                'wins': int(base_wins[i]),
+                'positions': [round(float(probability), 4) for probability in probabilities[i]],
+                'expected_position': round(float((probabilities[i] * np.arange(1, len(teams_data) + 1)).sum()), 2)
+            })
+        teams.sort(key=lambda team: team['expected_position'])
+        
+        return {
+            'season': season,
+            'simulations': simulations,
+            'remaining_matches': len(home),
+            'seconds': elapsed,
+            'simulations_per_second': simulations / elapsed if elapsed > 0 else 0,
+            'teams': teams
+        }
+    
+    def get_results(self, season=None):
+        # Atgriež kešoto rezultātu, ja kopš tā aprēķina nav mainījies neviens spēles rezultāts
+        season = self.check_season(season)
+        version = self.get_version()
+        with self.lock:
+            season_lock = self.season_locks.setdefault(season, threading.Lock())
+        
+        # Simulācija notiek ārpus kopējās slēdzenes: vienas sezonas pieprasījumi gaida viens otru,
+        # citu sezonu kešotie rezultāti paliek pieejami
+        with season_lock:
+            with self.lock:
+                cached = self.cache.get(season)
+            if cached and cached[0] == version:
+                return cached[1]
+            results = self.simulate(season)
+            with self.lock:
+                self.cache[season] = (version, results)
+            return results
+
+# Asinhronā datubāzes piekļuve: sqlite3 ir bloķējošs, tāpēc vaicājumi izpildās pavedienu pūlā
+# (katram pavedienam ir savs savienojums), bet notikumu cilpa tikmēr apkalpo citus pieprasījumus
+class AsyncDatabase:
+    def __init__(self, db):
+        self.db = db
+    
+    async def execute(self, query, params=()):
+        return await asyncio.to_thread(self.db.execute, query, params)
+    
+    async def fetch_all(self, query, params=()):
+        return await asyncio.to_thread(self.db.fetch_all, query, params)
+    
+    async def fetch_one(self, query, params=()):
+        return await asyncio.to_thread(self.db.fetch_one, query, params)
+
+# Asinhronais sporta API klients: gaidot atbildi, notikumu cilpa apkalpo citus pieprasījumus.
+# Vienlaicīgo ārējo pieprasījumu skaits ir ierobežots
+class AsyncSportsAPI:
+    def __init__(self, api, max_concurrent=100):
+        self.api = api
+        self.max_concurrent = max_concurrent
+        self.semaphore = None
+    
+    async def request(self):
+        # Reālajā dzīvē šeit būtu asinhrons HTTP pieprasījums (piemēram, ar aiohttp vai httpx)
+        # uz self.api.base_url; demonstrācijā tiek gaidīta tikai imitētā aizture
+        if self.semaphore is None:
+            # Semafors tiek izveidots notikumu cilpā, kurā to izmanto
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self.semaphore:
+            if self.api.latency:
+                await asyncio.sleep(self.api.latency)
+    
+    async def get_recent_matches(self):
+        await self.request()
+        return self.api.sample_recent_matches()
+    
+    async def get_player_info(self, player_name):
+        await self.request()
+        return self.api.sample_player_info(player_name)
+    
+    async def get_players_info(self, player_names):
+        # Visi spēlētāji tiek pieprasīti vienlaicīgi, nevis pēc kārtas
+        return await asyncio.gather(*(self.get_player_info(name) for name in player_names))
+
+# ASGI lietotne: maršruti ar asinhroniem variantiem tiek apkalpoti notikumu cilpā,
+# visi pārējie - nemainītā Flask lietotnē caur WsgiToAsgi
+class AsgiApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.routes = []
+        self.wsgi = None
+    
+    def route(self, pattern):
+        # Ceļa parametri kā Flask: /team/<int:team_id>
+        regex = re.sub(r'<int:(\w+)>', r'(?P<\1>\\d+)', pattern)
+        def decorator(handler):
+            self.routes.append((re.compile(f'^{regex}$'), handler))
+            return handler
+        return decorator
+    
+    def get_session(self, scope):
+        # Nolasa Flask parakstīto sesijas sīkdatni, lai asinhronie maršruti lietotu to pašu autorizāciju
+        cookie_name = self.flask_app.config['SESSION_COOKIE_NAME']
+        for name, value in scope['headers']:
+            if name == b'cookie':
+                for part in value.decode('latin-1').split(';'):
+                    key, _, cookie = part.strip().partition('=')
+                    if key == cookie_name:
+                        serializer = self.flask_app.session_interface.get_signing_serializer(self.flask_app)
+                        if serializer is None:
+                            return {}
+                        # Nederīgs paraksts, beidzies derīgums vai sabojāts saturs (BadSignature, BadPayload)
+                        try:
+                            return serializer.loads(cookie, max_age=int(self.flask_app.permanent_session_lifetime.total_seconds()))
+                        except BadData:
+                            return {}
+        return {}
+    
+    async def send_json(self, send, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for regex, handler in self.routes:
+                match = regex.match(scope['path'])
+                if match:
+                    session_data = self.get_session(scope)
+                    if 'username' not in session_data:
+                        # Tāpat kā sinhronie maršruti - pāradresē uz pieteikšanos
+                        await send({'type': 'http.response.start', 'status': 302,
+                                    'headers': [(b'location', b'/login'), (b'content-length', b'0')]})
+                        await send({'type': 'http.response.body', 'body': b''})
+                        return
+                    params = {key: int(value) for key, value in match.groupdict().items()}
+                    query = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+                    status, data = await handler(query, **params)
+                    await self.send_json(send, status, data)
+                    return
+        
+        # Pārējie maršruti darbojas nemainīti sinhronajā Flask lietotnē
+        if self.wsgi is None:
+            from asgiref.wsgi import WsgiToAsgi
+            self.wsgi = WsgiToAsgi(self.flask_app)
+        await self.wsgi(scope, receive, send)
+
+# Spēlētāju līdzības indekss: k tuvākie kaimiņi pēc normalizētiem statistikas vektoriem
+# (vidējie punkti, bloki, serves, pēdējo spēļu forma un pozīcija)
+# Līdzības indeksa stāvoklis: vienmēr tiek aizvietots kopumā, tāpēc vaicājums bez slēdzenes
+# redz vai nu veco, vai jauno indeksu, nevis pusceļā atjaunotas kolonnas
+SimilarityState = namedtuple('SimilarityState', ('columns', 'offsets', 'player_ids', 'rows', 'mean', 'std', 'positions'))
+
+class SimilarityIndex:
+    numeric_fields = ('avg_points', 'avg_blocks', 'avg_serves', 'recent_form')
+    
+    def __init__(self, db, recent_games=5, rebuild_fraction=0.1):
+        self.db = db
+        self.recent_games = recent_games
+        self.rebuild_fraction = rebuild_fraction
+        self.lock = threading.Lock()
+        self.state = None
+    
+    def fetch_features(self, player_ids=None):
+        where = ""
+        params = [self.recent_games]
+        if player_ids is not None:
+            where = f"WHERE p.id IN ({', '.join('?' * len(player_ids))})"
+            params.extend(player_ids)
+        # Forma - vidējie punkti pēdējās spēlēs (indekss (player_id, date, stat_id) dod tās bez kārtošanas)
+        return self.db.fetch_all(f"""
+            SELECT p.id, p.position, COALESCE(AVG(f.points), 0), COALESCE(AVG(f.blocks), 0),
+                COALESCE(AVG(f.serves), 0),
+                COALESCE((SELECT AVG(points) FROM (
+                    SELECT points FROM player_form r WHERE r.player_id = p.id
+                    ORDER BY date DESC, stat_id DESC LIMIT ?)), 0)
+            FROM players p
+            LEFT JOIN player_form f ON f.player_id = p.id
+            {where}
+            GROUP BY p.id
+        """, params)
+    
+    def publish(self, columns, offsets, player_ids, rows, mean, std, positions):
+        # Masīvi pēc publicēšanas netiek mainīti - refresh strādā ar kopijām
+        for array in (columns, offsets, player_ids):
+            array.flags.writeable = False
+        self.state = SimilarityState(columns, offsets, player_ids, rows, mean, std, positions)
+        return self.state
+    
+    def load(self, player_ids, positions, numeric):
+        # Standartizē skaitliskās pazīmes un pievieno pozīciju one-hot kolonnas
+        numeric = np.asarray(numeric, dtype=np.float64).reshape(-1, len(self.numeric_fields))
+        mean = numeric.mean(axis=0) if len(numeric) else np.zeros(len(self.numeric_fields))
+        std = numeric.std(axis=0) if len(numeric) else np.ones(len(self.numeric_fields))
+        std[std == 0] = 1
+        position_names = tuple(sorted({position for position in positions if position}))
+        
+        vectors = np.zeros((len(player_ids), len(self.numeric_fields) + len(position_names)), dtype=np.float32)
+        vectors[:, :len(self.numeric_fields)] = (numeric - mean) / std
+        position_index = {position: i for i, position in enumerate(position_names)}
+        for row, position in enumerate(positions):
+            if position in position_index:
+                vectors[row, len(self.numeric_fields) + position_index[position]] = 1
+        
+        # Vektori glabājas pa kolonnām (pazīme x spēlētājs), lai reizinājums ar vaicājumu lasītu atmiņu secīgi.
+        # offsets = ||x||^2, dzēstajiem spēlētājiem - bezgalība
+        return self.publish(np.ascontiguousarray(vectors.T), (vectors * vectors).sum(axis=1),
+                            np.asarray(player_ids, dtype=np.int64),
+                            {player_id: row for row, player_id in enumerate(player_ids)}, mean, std, position_names)
+    
+    def build(self):
+        with self.lock:
+            # Netīrie ieraksti tiek notīrīti pirms nolasīšanas, lai izmaiņas lasīšanas laikā netiktu pazaudētas
+            self.db.execute("DELETE FROM similarity_dirty")
+            features = self.fetch_features()
+            self.load([row[0] for row in features], [row[1] for row in features], [row[2:] for row in features])
+        return len(features)
+    
+    def vector(self, state, position, numeric):
+        vector = np.zeros(state.columns.shape[0], dtype=np.float32)
+        vector[:len(self.numeric_fields)] = (np.asarray(numeric, dtype=np.float64) - state.mean) / state.std
+        if position in state.positions:
+            vector[len(self.numeric_fields) + state.positions.index(position)] = 1
+        return vector
+    
+    def refresh(self):
+        # Pārrēķina tikai mainītos spēlētājus; ja to ir daudz, pilna pārbūve ir lētāka
+        if self.state is None:
+            return self.build()
+        dirty = [row[0] for row in self.db.fetch_all("SELECT player_id FROM similarity_dirty")]
+        if not dirty:
+            return 0
+        if len(dirty) > max(100, min(10000, len(self.state.player_ids) * self.rebuild_fraction)):
+            return self.build()
+        
+        with self.lock:
+            state = self.state
+            self.db.execute(f"DELETE FROM similarity_dirty WHERE player_id IN ({', '.join('?' * len(dirty))})", dirty)
+            features = {row[0]: row for row in self.fetch_features(dirty)}
+            # Jaunai pozīcijai vajag papildu one-hot kolonnu visiem spēlētājiem
+            if any(row[1] and row[1] not in state.positions for row in features.values()):
+                features = self.fetch_features()
+                self.load([row[0] for row in features], [row[1] for row in features], [row[2:] for row in features])
+                return len(dirty)
+            
+            # Izmaiņas tiek veiktas kopijās un publicētas vienā piešķīrumā
+            columns = state.columns.copy()
+            offsets = state.offsets.copy()
+            rows = dict(state.rows)
+            appended = []
+            for player_id in dirty:
+                row = rows.get(player_id)
+                if player_id not in features:
+                    # Spēlētājs dzēsts
+                    if row is not None:
+                        offsets[row] = np.inf
+                    continue
+                vector = self.vector(state, features[player_id][1], features[player_id][2:])
+                if row is None:
+                    appended.append((player_id, vector))
+                else:
+                    columns[:, row] = vector
+                    offsets[row] = vector @ vector
+            player_ids = state.player_ids
+            if appended:
+                start = len(player_ids)
+                vectors = np.array([vector for _, vector in appended])
+                columns = np.ascontiguousarray(np.hstack([columns, vectors.T]))
+                offsets = np.concatenate([offsets, (vectors * vectors).sum(axis=1)])
+                player_ids = np.concatenate([player_ids, [player_id for player_id, _ in appended]])
+                for offset, (player_id, _) in enumerate(appended):
+                    rows[player_id] = start + offset
+            self.publish(columns, offsets, player_ids, rows, state.mean, state.std, state.positions)
+        return len(dirty)
+    
+    def similar(self, player_id, k=10):
+        # Viens stāvokļa nolasījums: paralēls refresh publicē jaunu objektu, nevis maina šo
+        state = self.state
+        if state is None:
+            return None
+        
+        # Eiklīda attālums ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2 ar vienu vektora-matricas reizinājumu;
+        # ||q||^2 ir vienāds visiem, tāpēc kārtošanai nav vajadzīgs
+        row = state.rows.get(player_id)
+        if row is None or not np.isfinite(state.offsets[row]):
+            return None
+        query = state.columns[:, row].copy()
+        scores = query @ state.columns
+        scores *= -2
+        scores += state.offsets
+        scores[row] = np.inf
+        
+        k = min(k, int(np.isfinite(state.offsets).sum()) - 1)
+        if k <= 0:
+            return []
+        
+        # Slieksnis no izlases: k-tā mazākā vērtība ~10000 elementu izlasē (katrs len(scores) // 10000-ais
+        # elements). Ja zem tā ir vismaz k kandidāti, precīzais top-k ir starp tiem, un argpartition
+        # jāizpilda tikai mazai daļai
+        sample = scores[::max(1, len(scores) // 10000)]
+        threshold = np.partition(sample, min(k, len(sample) - 1))[min(k, len(sample) - 1)]
+        candidates = np.flatnonzero(scores <= threshold)
+        if len(candidates) < k:
+            candidates = np.arange(len(scores))
+        nearest = candidates[np.argpartition(scores[candidates], k - 1)[:k]]
+        nearest = nearest[np.argsort(scores[nearest])]
+        
+        query_norm = float(query @ query)
+        return [(int(state.player_ids[i]), float(np.sqrt(max(scores[i] + query_norm, 0)))) for i in nearest]
+
+# Spēļu iznākumu prognozēšanas modelis: loģistiskā regresija uz Elo starpības, formas un
+# vidējo punktu starpības. Tiek apmācīts bezsaistē un saglabāts kā versijots .npz artefakts
+class OutcomeModel:
+    features = ('elo_difference', 'form_difference', 'points_difference')
+    
+    def __init__(self, db, elo, change_feed, model_dir='models', check_interval=5.0):
+        self.db = db
+        self.elo = elo
+        self.change_feed = change_feed
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.model = None
+        self.checked_at = 0
+        self.state = None
+        self.state_version = None
+    
+    def load_history(self):
+        # Izspēlētās spēles hronoloģiski ar abu komandu reitingu pirms spēles un gūtajiem punktiem
+        self.elo.sync()
+        matches_data = self.db.fetch_all(f"""
+            SELECT m.id, m.team1_id, m.team2_id, m.score_team1, m.score_team2,
+                COALESCE(h.rating1, ?), COALESCE(h.rating2, ?)
+            FROM {self.db.career_table('matches')} m
+            LEFT JOIN rating_history h ON h.match_id = m.id
+            WHERE m.score_team1 IS NOT NULL AND m.score_team2 IS NOT NULL
+            ORDER BY m.date, m.id
+        """, (self.elo.base_rating, self.elo.base_rating))
+        points_data = self.db.fetch_all(f"""
+            SELECT ps.match_id, COALESCE(ps.team_id, p.team_id) AS team_id, SUM(ps.points)
+            FROM {self.db.career_table('player_stats')} ps
+            JOIN players p ON ps.player_id = p.id
+            GROUP BY ps.match_id, COALESCE(ps.team_id, p.team_id)
+        """)
+        
+        data = np.array(matches_data, dtype=np.float64).reshape(-1, 7)
+        team_points = {(match_id, team_id): points for match_id, team_id, points in points_data}
+        points = np.array([[team_points.get((match_id, team1), 0), team_points.get((match_id, team2), 0)]
+                           for match_id, team1, team2 in data[:, :3].astype(np.int64).tolist()],
+                          dtype=np.float64).reshape(-1, 2)
+        return data, points
+    
+    def prior_totals(self, teams, values):
+        # Katram ierakstam (komanda, spēle) - komandas summas un spēļu skaits pirms šīs spēles.
+        # Ieraksti ir hronoloģiski; stabila kārtošana pēc komandas saglabā secību grupas iekšienē
+        order = np.argsort(teams, kind='stable')
+        sorted_teams = teams[order]
+        sorted_values = values[order]
+        exclusive = np.cumsum(sorted_values, axis=0) - sorted_values
+        starts = np.r_[True, sorted_teams[1:] != sorted_teams[:-1]]
+        group_start = np.maximum.accumulate(np.where(starts, np.arange(len(teams)), 0))
+        
+        totals = np.empty_like(values)
+        totals[order] = exclusive - exclusive[group_start]
+        games = np.empty(len(teams))
+        games[order] = np.arange(len(teams)) - group_start
+        return totals, games
+    
+    def feature_matrix(self, rating1, rating2, form1, form2, points1, points2):
+        return np.column_stack([(rating1 - rating2) / 400, form1 - form2, points1 - points2])
+    
+    def training_data(self):
+        data, points = self.load_history()
+        count = len(data)
+        teams = np.concatenate([data[:, 1], data[:, 2]]).astype(np.int64)
+        won1 = np.where(data[:, 3] > data[:, 4], 1.0, np.where(data[:, 3] < data[:, 4], 0.0, 0.5))
+        values = np.column_stack([np.concatenate([won1, 1 - won1]), np.concatenate([points[:, 0], points[:, 1]])])
+        totals, games = self.prior_totals(teams, values)
+        
+        # Izlīdzināšana: komandai bez vēstures forma ir 0.5 un punkti - līgas vidējie
+        league_points = points.mean() if count else 0
+        form = (totals[:, 0] + 1) / (games + 2)
+        average_points = (totals[:, 1] + league_points) / (games + 1)
+        
+        x = self.feature_matrix(data[:, 5], data[:, 6], form[:count], form[count:],
+                                average_points[:count], average_points[count:])
+        return x, won1, league_points
+    
+    def fit(self, x, y, regularization=1e-3, iterations=50):
+        # Ņūtona metode (IRLS) loģistiskajai regresijai ar L2 regularizāciju
+        xb = np.column_stack([np.ones(len(x)), x])
+        weights = np.zeros(xb.shape[1])
+        identity = np.eye(xb.shape[1])
+        for _ in range(iterations):
+            p = 1 / (1 + np.exp(-(xb @ weights)))
+            gradient = xb.T @ (p - y) + regularization * weights
+            hessian = (xb * (p * (1 - p))[:, None]).T @ xb + regularization * identity
+            step = np.linalg.solve(hessian, gradient)
+            weights -= step
+            if np.abs(step).max() < 1e-8:
+                break
+        return weights
+    
+    def evaluate(self, weights, x, y):
+        p = 1 / (1 + np.exp(-(np.column_stack([np.ones(len(x)), x]) @ weights)))
+        p = np.clip(p, 1e-12, 1 - 1e-12)
+        return {
+            'log_loss': float(-(y * np.log(p) + (1 - y) * np.log(1 - p)).mean()),
+            'accuracy': float(((p > 0.5) == (y > 0.5)).mean())
+        }
+    
+    def model_versions(self):
+        if not os.path.isdir(self.model_dir):
+            return []
+        return sorted(int(match.group(1)) for match in
+                      (re.fullmatch(r'outcome_v(\d+)\.npz', name) for name in os.listdir(self.model_dir)) if match)
+    
+    def train(self, validation_fraction=0.2):
+        x, y, league_points = self.training_data()
+        if len(x) < 10:
+            raise ValueError(f"Apmācībai par maz izspēlētu spēļu ({len(x)})")
+        mean = x.mean(axis=0)
+        std = x.std(axis=0)
+        std[std == 0] = 1
+        x = (x - mean) / std
+        
+        # Validācija uz hronoloģiski pēdējām spēlēm, galīgais modelis - uz visām
+        split = int(len(x) * (1 - validation_fraction))
+        validation = self.evaluate(self.fit(x[:split], y[:split]), x[split:], y[split:])
+        weights = self.fit(x, y)
+        
+        version = (self.model_versions() or [0])[-1] + 1
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = os.path.join(self.model_dir, f"outcome_v{version:04d}.npz")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, weights=weights, mean=mean, std=std, league_points=league_points,
+                     features=np.array(self.features), version=version, trained_at=time.time(), samples=len(x),
+                     metrics=json.dumps({'validation': validation, 'training': self.evaluate(weights, x, y)}))
+        os.replace(temp_path, path)
+        return {'version': version, 'path': path, 'samples': len(x), 'validation': validation}
+    
+    def get_model(self):
+        # Artefakts tiek ielādēts pie pirmās prognozes; jaunāka versija tiek pamanīta ne biežāk kā reizi check_interval
+        now = time.monotonic()
+        if self.model is not None and now - self.checked_at < self.check_interval:
+            return self.model
+        with self.lock:
+            self.checked_at = now
+            versions = self.model_versions()
+            if versions and (self.model is None or self.model['version'] != versions[-1]):
+                with np.load(os.path.join(self.model_dir, f"outcome_v{versions[-1]:04d}.npz")) as artifact:
+                    self.model = {
+                        'version': int(artifact['version']),
+                        'weights': artifact['weights'],
+                        'mean': artifact['mean'],
+                        'std': artifact['std'],
+                        'league_points': float(artifact['league_points']),
+                        'trained_at': float(artifact['trained_at']),
+                        'metrics': json.loads(str(artifact['metrics']))
+                    }
+        return self.model
+    
+    def get_team_state(self):
+        # Komandu pašreizējais reitings, forma un vidējie punkti; tiek pārrēķināts tikai pēc izmaiņām
+        version = (self.change_feed.latest('matches'), self.change_feed.latest('player_stats'))
+        if self.state is not None and self.state_version == version:
+            return self.state
+        data, points = self.load_history()
+        ratings = dict(self.db.fetch_all("SELECT team_id, rating FROM team_ratings"))
+        team_ids = np.array(sorted({row[0] for row in self.db.fetch_all("SELECT id FROM teams")} | set(ratings)),
+                            dtype=np.int64)
+        
+        teams = np.concatenate([data[:, 1], data[:, 2]]).astype(np.int64)
+        index = np.searchsorted(team_ids, teams)
+        won1 = np.where(data[:, 3] > data[:, 4], 1.0, np.where(data[:, 3] < data[:, 4], 0.0, 0.5))
+        wins = np.bincount(index, np.concatenate([won1, 1 - won1]), minlength=len(team_ids))
+        team_points = np.bincount(index, np.concatenate([points[:, 0], points[:, 1]]), minlength=len(team_ids))
+        games = np.bincount(index, minlength=len(team_ids))
+        
+        self.state = {
+            'team_ids': team_ids,
+            'ratings': np.array([ratings.get(team_id, self.elo.base_rating) for team_id in team_ids.tolist()]),
+            'wins': wins,
+            'points': team_points,
+            'games': games
+        }
+        self.state_version = version
+        return self.state
+    
+    def predict(self, team1_ids, team2_ids):
+        # Vienā izsaukumā novērtē visas spēles: pirmās komandas uzvaras varbūtība
+        model = self.get_model()
+        if model is None:
+            return None
+        state = self.get_team_state()
+        
+        def lookup(team_ids):
+            team_ids = np.asarray(team_ids, dtype=np.int64)
+            index = np.clip(np.searchsorted(state['team_ids'], team_ids), 0, max(len(state['team_ids']) - 1, 0))
+            known = (state['team_ids'][index] == team_ids) if len(state['team_ids']) else np.zeros(len(team_ids), bool)
+            games = np.where(known, state['games'][index], 0)
+            rating = np.where(known, state['ratings'][index], self.elo.base_rating)
+            form = (np.where(known, state['wins'][index], 0) + 1) / (games + 2)
+            points = (np.where(known, state['points'][index], 0) + model['league_points']) / (games + 1)
+            return rating, form, points
+        
+        rating1, form1, points1 = lookup(team1_ids)
+        rating2, form2, points2 = lookup(team2_ids)
+        x = (self.feature_matrix(rating1, rating2, form1, form2, points1, points2) - model['mean']) / model['std']
+        weights = model['weights']
+        return 1 / (1 + np.exp(-(weights[0] + x @ weights[1:])))
+
+# Pieprasījuma profilētājs pēc izvēles: vienam pieprasījumam ieslēdz cProfile un stacku paraugu ņemšanu.
+# Rezultāts tiek saglabāts kopā ar saspiesto stacku (collapsed stack) failu liesmu grafikam
+class RequestProfiler:
+    def __init__(self, directory='profiles', token=None, sample_interval=0.001, max_samples=20000,
+                 min_interval=10.0, max_profiles=50):
+        self.directory = directory
+        self.token = token
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.min_interval = min_interval
+        self.max_profiles = max_profiles
+        # Vienlaikus tiek profilēts tikai viens pieprasījums, un ne biežāk kā reizi min_interval sekundēs
+        self.lock = threading.Lock()
+        self.last_started = None
+        self.skipped = 0
+    
+    def start(self, route):
+        if not self.lock.acquire(blocking=False):
+            self.skipped += 1
+            return None
+        now = time.monotonic()
+        if self.last_started is not None and now - self.last_started < self.min_interval:
+            self.lock.release()
+            self.skipped += 1
+            return None
+        self.last_started = now
+        
+        safe_route = re.sub(r'[^A-Za-z0-9_.-]+', '_', route).strip('_') or 'request'
+        profile = {
+            'name': f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{safe_route}",
+            'route': route,
+            'started_at': time.time(),
+            'start': time.perf_counter(),
+            'thread_id': threading.get_ident(),
+            'stacks': {},
+            'samples': 0,
+            'done': threading.Event(),
+            'profiler': cProfile.Profile()
+        }
+        profile['sampler'] = threading.Thread(target=self.sample, args=(profile,), daemon=True,
+                                              name='request-profiler')
+        profile['sampler'].start()
+        profile['profiler'].enable()
+        return profile
+    
+    def sample(self, profile):
+        # Periodiski nolasa profilējamā pavediena stacku; paraugu skaits ir ierobežots ar max_samples
+        while not profile['done'].wait(self.sample_interval) and profile['samples'] < self.max_samples:
+            frame = sys._current_frames().get(profile['thread_id'])
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                             .replace(';', ':'))
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                profile['stacks'][key] = profile['stacks'].get(key, 0) + 1
+                profile['samples'] += 1
+    
+    def stop(self, profile, status):
+        try:
+            profile['profiler'].disable()
+            duration = time.perf_counter() - profile['start']
+            profile['done'].set()
+            profile['sampler'].join()
+            
+            os.makedirs(self.directory, exist_ok=True)
+            base_path = os.path.join(self.directory, profile['name'])
+            profile['profiler'].dump_stats(f"{base_path}.prof")
+            with open(f"{base_path}.folded", 'w', encoding='utf-8') as f:
+                for stack, count in sorted(profile['stacks'].items()):
+                    f.write(f"{stack} {count}\n")
+            with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
+                json.dump({
+                    'name': profile['name'],
+                    'route': profile['route'],
+                    'status': status,
+                    'started_at': profile['started_at'],
+                    'duration_ms': round(duration * 1000, 1),
+                    'samples': profile['samples'],
+                    'truncated': profile['samples'] >= self.max_samples
+                }, f, ensure_ascii=False)
+            self.prune()
+        finally:
+            self.lock.release()
+    
+    def prune(self):
+        # Glabā tikai pēdējos max_profiles profilus
+        for profile_data in self.list_profiles()[self.max_profiles:]:
+            for extension in ('json', 'prof', 'folded'):
+                try:
+                    os.remove(os.path.join(self.directory, f"{profile_data['name']}.{extension}"))
+                except FileNotFoundError:
+                    pass
+    
+    def list_profiles(self):
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.directory, file_name), encoding='utf-8') as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(profiles, key=lambda profile_data: profile_data['started_at'], reverse=True)
+    
+    def get_path(self, name, extension):
+        if not re.fullmatch(r'[A-Za-z0-9_.-]+', name) or extension not in ('prof', 'folded'):
+            return None
+        path = os.path.join(self.directory, f"{name}.{extension}")
+        return path if os.path.isfile(path) else None
+    
+    def get_top_functions(self, name, limit=30):
+        path = self.get_path(name, 'prof')
+        if path is None:
+            return None
+        output = StringIO()
+        pstats.Stats(path, stream=output).sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+    
+    def get_limits(self):
+        return {
+            'sample_interval_ms': self.sample_interval * 1000,
+            'max_samples': self.max_samples,
+            'min_interval_s': self.min_interval,
+            'max_profiles': self.max_profiles,
+            'header_enabled': bool(self.token),
+            'skipped': self.skipped
+        }
+
+# Renderēto lapu fragmentu kešs: HTML katrai lapai un lomai (admin/lietotājs), derīgs līdz datu versijas
+# maiņai. Atmiņa ir ierobežota ar max_size (rakstzīmēs); vecākie ieraksti tiek izmesti pēc LRU principa
+class FragmentCache:
+    def __init__(self, db, change_feed, max_size=32 * 1024 * 1024, max_entry_size=4 * 1024 * 1024):
+        self.db = db
+        self.change_feed = change_feed
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0
+    
+    def get_version(self):
+        # Pēdējais izmaiņu žurnāla seq, arhivēto sezonu saraksts (arhivēšana izmaiņas nežurnalē)
+        # un reitingu versija (reitingi mainās arī bez spēļu izmaiņām, piemēram, recompute-ratings)
+        return (self.change_feed.latest(),
+                tuple(self.db.fetch_one("""
+                    SELECT COUNT(*), MAX(archived_at), (SELECT version FROM rating_version) FROM season_partitions
+                """)))
+    
+    def get(self, key, version):
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                # Novecojusi versija vairs nekad netiks izmantota
+                self.size -= len(entry[1])
+                del self.entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, version, html):
+        # Versija jānolasa pirms renderēšanas: ja dati mainās tās laikā, nākamais pieprasījums būs kļūme
+        if not self.enabled:
+            return
+        if len(html) > self.max_entry_size:
+            self.oversized += 1
+            return
+        with self.lock:
+            old_entry = self.entries.pop(key, None)
+            if old_entry is not None:
+                self.size -= len(old_entry[1])
+            self.entries[key] = (version, html)
+            self.size += len(html)
+            while self.size > self.max_size:
+                _, (_, evicted_html) = self.entries.popitem(last=False)
+                self.size -= len(evicted_html)
+                self.evictions += 1
+    
+    def capture(self, key, version, chunks):
+        # Straumētai lapai: gabali tiek sūtīti uzreiz un saglabāti tikai tad, ja lapa nepārsniedz max_entry_size
+        captured = []
+        size = 0
+        for chunk in chunks:
+            if captured is not None:
+                size += len(chunk)
+                if size > self.max_entry_size:
+                    captured = None
+                    self.oversized += 1
+                else:
+                    captured.append(chunk)
+            yield chunk
+        if captured is not None:
+            self.put(key, version, ''.join(captured))
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+    
+    def get_metrics(self):
+        with self.lock:
+            requests_count = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / requests_count, 3) if requests_count else None,
+                'evictions': self.evictions,
+                'oversized': self.oversized
+            }
+
+# KLL kvantiļu skice: ierobežota izmēra, apvienojama, ar rangu kļūdu ~1.65/k no elementu skaita.
+# Līmeņa h elements aizvieto 2^h sākotnējās vērtības
+class KLLSketch:
+    def __init__(self, k=200, levels=None, count=0):
+        self.k = k
+        self.levels = levels or [[]]
+        self.count = count
+    
+    def capacity(self, level):
+        # Augstākais līmenis glabā k elementus, katrs zemāks - 2/3 no nākamā (vismaz 2)
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def compress(self):
+        while sum(len(items) for items in self.levels) > sum(self.capacity(h) for h in range(len(self.levels))):
+            for h, items in enumerate(self.levels):
+                if len(items) >= self.capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    # Sakārto un paaugstina katru otro elementu (nejaušs sākums); nepāra elements paliek
+                    items.sort()
+                    keep = len(items) % 2
+                    self.levels[h + 1].extend(items[keep + random.getrandbits(1)::2])
+                    self.levels[h] = items[:keep]
+                    break
+    
+    def update(self, values):
+        values = list(values)
+        self.count += len(values)
+        for start in range(0, len(values), self.k):
+            self.levels[0].extend(values[start:start + self.k])
+            self.compress()
+    
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.count += other.count
+        self.compress()
+    
+    def cdf(self):
+        # Sakārtotas vērtības un kumulatīvie svari rangu vaicājumiem ar bināro meklēšanu
+        values = np.array([value for items in self.levels for value in items], dtype=np.float64)
+        weights = np.array([2 ** h for h, items in enumerate(self.levels) for _ in items], dtype=np.float64)
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+    
+    def to_json(self):
+        return json.dumps(self.levels)
+    
+    @classmethod
+    def from_json(cls, data, count, k=200):
+        return cls(k, json.loads(data), count)
+
+# Pozīciju procentiles: katrai sezonai, pozīcijai un rādītājam sava KLL skice, kurā katrs spēlētājs
+# ir viena vērtība - viņa vidējais rādītājs spēlē tajā sezonā. Mainītās sezonas pārbūvē fona pavediens
+# vai `flask refresh-sketches`, rezultāts tiek saglabāts datubāzē un apvienots pāri sezonām
+class QuantileSketches:
+    fields = ('points', 'blocks', 'serves')
+    
+    def __init__(self, db, k=200):
+        self.db = db
+        self.k = k
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.thread = None
+        self.version = None
+        self.sketches = {}
+        self.merged = {}
+    
+    def fetch_rows(self, season, stats_table='player_stats', matches_table='matches'):
+        # (sezona, pozīcija, vidējie punkti, bloki, serves) katram spēlētājam, kas sezonā spēlējis.
+        # Sezona var būt jau pārvietota uz arhīvu, tāpēc rindas lasa caur karjeras tabulām
+        return self.db.conn.execute(f"""
+            SELECT substr(m.date, 1, 4), p.position,
+                AVG(COALESCE(ps.points, 0)), AVG(COALESCE(ps.blocks, 0)), AVG(COALESCE(ps.serves, 0))
+            FROM {stats_table} ps
+            JOIN {matches_table} m ON ps.match_id = m.id
+            JOIN players p ON ps.player_id = p.id
+            WHERE p.position IS NOT NULL AND substr(m.date, 1, 4) = ?
+            GROUP BY ps.player_id
+        """, (season,)).fetchall()
+    
+    def add_rows(self, sketches, rows):
+        grouped = {}
+        for season, position, *values in rows:
+            for stat, value in zip(self.fields, values):
+                grouped.setdefault((season, position, stat), []).append(value)
+        for key, values in grouped.items():
+            if key not in sketches:
+                sketches[key] = KLLSketch(self.k)
+            sketches[key].update(values)
+    
+    def load(self):
+        sketches = {}
+        for season, position, stat, count, levels in self.db.fetch_all(
+                "SELECT season, position, stat, count, levels FROM quantile_sketches"):
+            sketches[(season, position, stat)] = KLLSketch.from_json(levels, count, self.k)
+        return sketches
+    
+    def load_current(self):
+        # Tikai lasīšana: pārlādē saglabātās skices, ja tās kopš pēdējās ielādes ir mainītas.
+        # Atgriež, vai kāda sezona gaida pārbūvi
+        version, stale = self.db.fetch_one("""
+            SELECT version, version = 0 OR EXISTS (SELECT 1 FROM sketch_dirty) FROM sketch_state WHERE id = 1
+        """)
+        if version != self.version:
+            sketches = self.load()
+            with self.lock:
+                self.sketches = sketches
+                self.merged = {}
+                self.version = version
+        return bool(stale)
+    
+    def refresh(self):
+        # Pārbūvē mainītās sezonas (vai visas pirmajā reizē) un saglabā skices. Viena rakstīšanas
+        # transakcija, lai katra izmaiņa tiktu apstrādāta arī tad, ja vairāki procesi atsvaidzina vienlaikus
+        with self.build_lock:
+            return self.build()
+    
+    def build(self):
+        if not self.load_current():
+            return 0
+        
+        # Karjeras skati pievieno arhīvus ar ATTACH, ko nevar darīt transakcijas laikā
+        stats_table = self.db.career_table('player_stats')
+        matches_table = self.db.career_table('matches')
+        conn = self.db.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("SELECT version FROM sketch_state WHERE id = 1").fetchone()[0]
+            sketches = self.load()
+            if version == 0:
+                # Pirmā izveide: visas sezonas no visām partīcijām
+                sketches = {}
+                seasons = {row[0] for row in conn.execute(
+                    f"SELECT DISTINCT substr(date, 1, 4) FROM {matches_table}").fetchall()}
+            else:
+                seasons = {row[0] for row in conn.execute("SELECT season FROM sketch_dirty").fetchall()}
+            
+            for season in seasons:
+                for key in [key for key in sketches if key[0] == season]:
+                    del sketches[key]
+                self.add_rows(sketches, self.fetch_rows(season, stats_table, matches_table))
+            
+            conn.execute("DELETE FROM quantile_sketches")
+            conn.executemany("INSERT INTO quantile_sketches (season, position, stat, count, levels) VALUES (?, ?, ?, ?, ?)",
+                             [(*key, sketch.count, sketch.to_json()) for key, sketch in sketches.items()])
+            conn.execute("DELETE FROM sketch_dirty")
+            conn.execute("UPDATE sketch_state SET version = version + 1 WHERE id = 1")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        with self.lock:
+            self.sketches = sketches
+            self.merged = {}
+            self.version = version + 1
+        return len(seasons)
+    
+    def refresh_in_background(self):
+        # Ja pārbūve jau notiek, vēlākās izmaiņas paņems nākamā
+        if not self.build_lock.acquire(blocking=False):
+            return
+        try:
+            self.thread = threading.Thread(target=self.run_refresh, daemon=True, name='sketch-refresh')
+            self.thread.start()
+        except RuntimeError:
+            self.build_lock.release()
+            raise
+    
+    def run_refresh(self):
+        try:
+            self.build()
+        except sqlite3.Error:
+            logging.getLogger(__name__).exception("Kvantiļu skiču pārbūve neizdevās")
+        finally:
+            # Pavediena savienojums vairs nav vajadzīgs
+            self.db.close()
+            self.build_lock.release()
+    
+    def get_cdf(self, position, stat):
+        # Visu sezonu skices apvienotas vienā; rezultāts tiek kešots līdz nākamajai atsvaidzināšanai.
+        # Slēdzene, jo refresh aizvieto skices un notīra kešu
+        key = (position, stat)
+        with self.lock:
+            if key not in self.merged:
+                merged = KLLSketch(self.k)
+                for (_, sketch_position, sketch_stat), sketch in self.sketches.items():
+                    if sketch_position == position and sketch_stat == stat:
+                        merged.merge(sketch)
+                self.merged[key] = merged.cdf()
+            return self.merged[key]
+    
+    def percentile(self, position, stat, value):
+        # Vidējais rangs: puse no vienādajām vērtībām skaitās zemāk. O(log k) neatkarīgi no datu apjoma
+        values, cumulative = self.get_cdf(position, stat)
+        if not len(values):
+            return None
+        below = np.searchsorted(values, value, side='left')
+        upto = np.searchsorted(values, value, side='right')
+        lower = cumulative[below - 1] if below else 0
+        upper = cumulative[upto - 1] if upto else 0
+        return round(float((lower + upper) / 2 / cumulative[-1] * 100), 1)
+    
+    def get_percentiles(self, position, averages):
+        # Lapas skatījums tikai nolasa saglabātās skices; mainītās sezonas pārbūvē fona pavediens,
+        # un līdz tam procentiles aprēķina pēc iepriekšējām
+        if self.load_current():
+            self.refresh_in_background()
+        return {stat: self.percentile(position, stat, averages[stat]) for stat in self.fields}
+
+# Vaicājumu apvienotājs (dataloader) pakešu API: atrisinātāji paziņo, kādas rindas tiem vajadzīgas,
+# un katrā slānī visi viena veida pieprasījumi tiek izpildīti ar vienu IN (...) vaicājumu
+class BatchLoader:
+    max_queries = 100
+    recent_matches = 10
+    recent_points = 10
+    
+    def __init__(self, db):
+        self.db = db
+        self.cache = {}
+        self.queue = {}
+        self.statements = 0
+        self.layers = 0
+        self.tables = {}
+    
+    def career_table(self, table):
+        # Arhīvu saraksts tiek nolasīts vienreiz pieprasījumā, nevis katrā slānī
+        if table not in self.tables:
+            self.tables[table] = self.db.career_table(table)
+        return self.tables[table]
+    
+    def fetch(self, name, keys):
+        # Atgriež vārdnīcu atslēga -> rinda (vai rindu saraksts) vienam ielādētājam
+        placeholders = ', '.join('?' * len(keys))
+        if name == 'team':
+            rows = self.db.fetch_all(f"SELECT id, name, city, coach FROM teams WHERE id IN ({placeholders})", keys)
+            return {row[0]: {'id': row[0], 'name': row[1], 'city': row[2], 'coach': row[3]} for row in rows}
+        if name == 'rating':
+            return dict(self.db.fetch_all(f"SELECT team_id, rating FROM team_ratings WHERE team_id IN ({placeholders})", keys))
+        # Spēlētājus un spēles dispatch parasti nolasa kopā (sk. fetch_players un fetch_matches)
+        if name == 'player':
+            return self.fetch_players(keys, [])[0]
+        if name == 'roster':
+            return self.fetch_players([], keys)[1]
+        if name == 'match':
+            return self.fetch_matches(keys, [])[0]
+        if name == 'team_matches':
+            return self.fetch_matches([], keys)[1]
+        if name == 'player_totals':
+            rows = self.db.fetch_all(f"""
+                SELECT player_id, SUM(points), SUM(blocks), SUM(serves), COUNT(DISTINCT match_id)
+                FROM {self.career_table('player_stats')}
+                WHERE player_id IN ({placeholders})
+                GROUP BY player_id
+            """, keys)
+            totals = {key: {'points': 0, 'blocks': 0, 'serves': 0, 'games': 0} for key in keys}
+            totals.update({row[0]: dict(zip(('points', 'blocks', 'serves', 'games'), row[1:])) for row in rows})
+            return totals
+        if name == 'recent_points':
+            grouped = {key: [] for key in keys}
+            for player_id, points in self.db.fetch_all(f"""
+                SELECT player_id, points FROM (
+                    SELECT player_id, points, date, stat_id,
+                        ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY date DESC, stat_id DESC) AS recent
+                    FROM player_form
+                    WHERE player_id IN ({placeholders})
+                )
+                WHERE recent <= ?
+                ORDER BY player_id, date, stat_id
+            """, [*keys, self.recent_points]):
+                grouped[player_id].append(points)
+            return grouped
+        if name == 'match_stats':
+            grouped = {key: [] for key in keys}
+            for row in self.db.fetch_all(f"""
+                SELECT match_id, player_id, points, blocks, serves
+                FROM {self.career_table('player_stats')}
+                WHERE match_id IN ({placeholders})
+                ORDER BY id
+            """, keys):
+                grouped[row[0]].append(dict(zip(('player_id', 'points', 'blocks', 'serves'), row[1:])))
+            return grouped
+        raise ValueError(f"Nezināms ielādētājs: {name}")
+    
+    def fetch_players(self, player_ids, team_ids):
+        # Ielādētāji 'player' (pēc id) un 'roster' (pēc komandas) vienā vaicājumā pret players.
+        # Atgriež visus nolasītos spēlētājus pēc id un sastāvus pēc komandas
+        conditions, params = [], []
+        if player_ids:
+            conditions.append(f"id IN ({', '.join('?' * len(player_ids))})")
+            params.extend(player_ids)
+        if team_ids:
+            conditions.append(f"team_id IN ({', '.join('?' * len(team_ids))})")
+            params.extend(team_ids)
+        players = {row[0]: dict(zip(('id', 'name', 'number', 'position', 'team_id'), row)) for row in self.db.fetch_all(f"""
+            SELECT id, name, number, position, team_id FROM players WHERE {' OR '.join(conditions)} ORDER BY id
+        """, params)}
+        rosters = {key: [] for key in team_ids}
+        for player in players.values():
+            if player['team_id'] in rosters:
+                rosters[player['team_id']].append(player)
+        return players, rosters
+    
+    def fetch_matches(self, match_ids, team_ids):
+        # Ielādētāji 'match' (pēc id) un 'team_matches' (pēdējās spēles katrai komandai no abām pusēm)
+        # vienā vaicājumā pret spēlēm, arī arhivētajās sezonās. Atgriež visas nolasītās spēles pēc id
+        # un komandu spēļu sarakstus
+        matches_table = self.career_table('matches')
+        parts, params = [], []
+        if match_ids:
+            parts.append(f"""
+                SELECT NULL AS team_id, 0 AS recent, id, team1_id, team2_id, date, score_team1, score_team2
+                FROM {matches_table} WHERE id IN ({', '.join('?' * len(match_ids))})
+            """)
+            params.extend(match_ids)
+        if team_ids:
+            placeholders = ', '.join('?' * len(team_ids))
+            parts.append(f"""
+                SELECT team_id, recent, id, team1_id, team2_id, date, score_team1, score_team2 FROM (
+                    SELECT team_id, id, team1_id, team2_id, date, score_team1, score_team2,
+                        ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY date DESC, id DESC) AS recent
+                    FROM (
+                        SELECT team1_id AS team_id, * FROM {matches_table} WHERE team1_id IN ({placeholders})
+                        UNION ALL
+                        SELECT team2_id AS team_id, * FROM {matches_table} WHERE team2_id IN ({placeholders})
+                    )
+                )
+                WHERE recent <= ?
+            """)
+            params.extend([*team_ids, *team_ids, self.recent_matches])
+        matches = {}
+        team_matches = {key: [] for key in team_ids}
+        for team_id, _, *row in self.db.fetch_all(' UNION ALL '.join(parts) + " ORDER BY 1, 2", params):
+            match = matches.setdefault(row[0], dict(zip(('id', 'team1_id', 'team2_id', 'date', 'score_team1', 'score_team2'), row)))
+            if team_id is not None:
+                team_matches[team_id].append(match)
+        return matches, team_matches
+    
+    def dispatch(self):
+        # Viens vaicājums katram ielādētājam, kuram šajā slānī ir jaunas atslēgas. Ielādētāji, kas lasa
+        # tās pašas rindas (spēlētāji pēc id un pēc komandas, spēles pēc id un pēc komandas), tiek izpildīti
+        # kopā, un to rindas aizpilda arī atsevišķo ierakstu kešu: sastāvā nolasītais spēlētājs vai komandas
+        # spēle vēlākā slānī vairs netiek vaicāta
+        queue, self.queue = self.queue, {}
+        for (single, grouped), fetch in ((('player', 'roster'), self.fetch_players),
+                                         (('match', 'team_matches'), self.fetch_matches)):
+            single_keys, grouped_keys = queue.pop(single, set()), queue.pop(grouped, set())
+            if not single_keys and not grouped_keys:
+                continue
+            rows, groups = fetch(sorted(single_keys), sorted(grouped_keys))
+            self.statements += 1
+            cache = self.cache.setdefault(single, {})
+            cache.update(rows)
+            for key in single_keys:
+                cache.setdefault(key, None)
+            self.cache.setdefault(grouped, {}).update(groups)
+        for name, keys in queue.items():
+            if keys:
+                cache = self.cache.setdefault(name, {})
+                results = self.fetch(name, sorted(keys))
+                self.statements += 1
+                for key in keys:
+                    cache[key] = results.get(key)
+        self.layers += 1
+    
+    def execute(self, resolvers):
+        # Katrs atrisinātājs ir ģenerators, kas atdod (ielādētājs, atslēga) sarakstu un saņem rezultātus
+        results = [None] * len(resolvers)
+        waiting = {}
+        
+        def advance(index, value):
+            try:
+                waiting[index] = resolvers[index].send(value)
+            except StopIteration as stop:
+                results[index] = stop.value
+        
+        for index in range(len(resolvers)):
+            advance(index, None)
+        while waiting:
+            for requested in waiting.values():
+                for name, key in requested:
+                    if key not in self.cache.get(name, {}):
+                        self.queue.setdefault(name, set()).add(key)
+            self.dispatch()
+            current, waiting = waiting, {}
+            for index, requested in current.items():
+                advance(index, [self.cache[name][key] for name, key in requested])
+        return results
+    
+    def resolve_team(self, team_id, include):
+        team, rating = yield [('team', team_id), ('rating', team_id)]
+        if team is None:
+            return None
+        team = dict(team, rating=round(rating, 1) if rating is not None else None)
+        
+        requested = []
+        if 'players' in include:
+            requested.append(('roster', team_id))
+        if 'matches' in include:
+            requested.append(('team_matches', team_id))
+        if not requested:
+            return team
+        loaded = dict(zip((name for name, _ in requested), (yield requested)))
+        
+        # Trešais slānis: spēlētāju kopsummas un formas līknes, pretinieku nosaukumi
+        players = loaded.get('roster') or []
+        matches = loaded.get('team_matches') or []
+        requested = []
+        if 'charts' in include:
+            requested.extend(('recent_points', player['id']) for player in players)
+        requested.extend(('player_totals', player['id']) for player in players)
+        requested.extend(('team', match['team2_id'] if match['team1_id'] == team_id else match['team1_id'])
+                         for match in matches)
+        loaded = iter((yield requested) if requested else [])
+        
+        if 'charts' in include:
+            recent = [next(loaded) for _ in players]
+        totals = [next(loaded) for _ in players]
+        if 'players' in include:
+            team['players'] = [dict(player, totals=totals[index], **({'recent_points': recent[index]} if 'charts' in include else {}))
+                               for index, player in enumerate(players)]
+        if 'matches' in include:
+            team['matches'] = []
+            for match in matches:
+                opponent = next(loaded)
+                home = match['team1_id'] == team_id
+                team['matches'].append(dict(match, opponent=opponent['name'] if opponent else None, home=home))
+        return team
+    
+    def resolve_player(self, player_id, include):
+        requested = [('player', player_id), ('player_totals', player_id)]
+        if 'charts' in include:
+            requested.append(('recent_points', player_id))
+        loaded = yield requested
+        player = loaded[0]
+        if player is None:
+            return None
+        player = dict(player, totals=loaded[1])
+        if 'charts' in include:
+            player['recent_points'] = loaded[2]
+        team, = yield [('team', player['team_id'])]
+        player['team'] = team['name'] if team else None
+        return player
+    
+    def resolve_match(self, match_id, include):
+        requested = [('match', match_id)]
+        if 'stats' in include:
+            requested.append(('match_stats', match_id))
+        loaded = yield requested
+        match = loaded[0]
+        if match is None:
+            return None
+        stats = loaded[1] if 'stats' in include else []
+        
+        loaded = yield [('team', match['team1_id']), ('team', match['team2_id'])] + \
+            [('player', stat['player_id']) for stat in stats]
+        match = dict(match, team1=loaded[0]['name'] if loaded[0] else None, team2=loaded[1]['name'] if loaded[1] else None)
+        if 'stats' in include:
+            match['stats'] = [dict(stat, name=player['name'] if player else None)
+                              for stat, player in zip(stats, loaded[2:])]
+        return match
+    
+    def resolve(self, queries):
+        # queries: [{"type": "team"|"player"|"match", "id": 1, "include": [...]}, ...]
+        if len(queries) > self.max_queries:
+            raise ValueError(f"Vienā pieprasījumā ne vairāk kā {self.max_queries} vaicājumi")
+        resolvers = []
+        for query in queries:
+            resolver = {'team': self.resolve_team, 'player': self.resolve_player,
+                        'match': self.resolve_match}.get(query.get('type'))
+            if resolver is None:
+                raise ValueError(f"Nezināms tips: {query.get('type')}")
+            # SQLite veselie skaitļi ir 64 bitu; lielāks id izraisītu OverflowError vaicājumā
+            item_id = int(query['id'])
+            if not -2 ** 63 <= item_id < 2 ** 63:
+                raise ValueError(f"Nederīgs id: {item_id}")
+            # Virkne arī ir iterējama, bet kļūtu par burtu kopu
+            include = query.get('include', [])
+            if not isinstance(include, list) or not all(isinstance(item, str) for item in include):
+                raise ValueError("'include' jābūt virkņu sarakstam")
+            resolvers.append(resolver(item_id, set(include)))
+        return self.execute(resolvers)
+
+# Turnīra tabula jebkurā datumā no standings_prefix: katrai komandai pēdējā prefiksa rinda līdz datumam
+class Standings:
+    fields = ('team_id', 'name', 'played', 'wins', 'losses', 'draws', 'sets_for', 'sets_against')
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def rank(self, rows):
+        # Kārtība kā sezonas simulatorā: uzvaras, tad setu starpība
+        rows.sort(key=lambda row: (-row['wins'], -(row['sets_for'] - row['sets_against']), row['name']))
+        for position, row in enumerate(rows, start=1):
+            row['position'] = position
+        return rows
+    
+    def get_table(self, date):
+        # Viena meklēšana pa primāro atslēgu (team_id, season, date, match_id) katrai komandai
+        standings_data = self.db.fetch_all("""
+            SELECT t.id, t.name, COALESCE(s.played, 0), COALESCE(s.wins, 0), COALESCE(s.losses, 0),
+                COALESCE(s.draws, 0), COALESCE(s.sets_for, 0), COALESCE(s.sets_against, 0)
+            FROM teams t
+            LEFT JOIN standings_prefix s ON s.team_id = t.id AND s.season = substr(?1, 1, 4)
+                AND (s.date, s.match_id) = (
+                    SELECT date, match_id FROM standings_prefix
+                    WHERE team_id = t.id AND season = substr(?1, 1, 4) AND date <= ?1
+                    ORDER BY date DESC, match_id DESC
+                    LIMIT 1
+                )
+        """, (date,))
+        return self.rank([dict(zip(self.fields, row)) for row in standings_data])
+    
+    def get_seasons(self):
+        return [row[0] for row in self.db.fetch_all("SELECT DISTINCT season FROM standings_prefix ORDER BY season")]
+    
+    def get_series(self, season):
+        # Tabula pēc katras spēļu dienas sezonā: vienā gājienā pa prefiksiem datuma secībā
+        teams = {team_id: name for team_id, name in self.db.fetch_all("SELECT id, name FROM teams")}
+        prefix_data = self.db.fetch_all("""
+            SELECT date, team_id, played, wins, losses, draws, sets_for, sets_against
+            FROM standings_prefix
+            WHERE season = ?
+            ORDER BY date, match_id
+        """, (season,))
+        
+        current = {team_id: dict(zip(self.fields, (team_id, name, 0, 0, 0, 0, 0, 0))) for team_id, name in teams.items()}
+        series = {team_id: {'team_id': team_id, 'name': name, 'positions': [], 'wins': []} for team_id, name in teams.items()}
+        dates = []
+        for index, (date, team_id, *values) in enumerate(prefix_data):
+            if team_id in current:
+                current[team_id].update(zip(self.fields[2:], values))
+            # Dienas pēdējā rinda: saglabā tabulu pēc visām tās dienas spēlēm
+            if index + 1 == len(prefix_data) or prefix_data[index + 1][0] != date:
+                dates.append(date)
+                for row in self.rank([dict(row) for row in current.values()]):
+                    series[row['team_id']]['positions'].append(row['position'])
+                    series[row['team_id']]['wins'].append(row['wins'])
+        return {'season': season, 'dates': dates, 'teams': list(series.values())}
+
+# Turnīra tabulas vietu grafiks sezonas gaitā
+def render_standings_png(series):
+    figure = Figure(figsize=(10, 6))
+    axes = figure.add_subplot()
+    for team in series['teams']:
+        axes.plot(series['dates'], team['positions'], 'o-', label=team['name'])
+    axes.set_title(f"Turnīra tabula {series['season']}. gada sezonā")
+    axes.set_xlabel('Datums')
+    axes.set_ylabel('Vieta')
+    axes.invert_yaxis()
+    axes.legend()
+    axes.grid(True)
+    axes.tick_params(axis='x', labelrotation=45)
+    figure.tight_layout()
+    
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+# API klase sporta datu iegūšanai
+class SportsAPI:
+    def __init__(self, latency=0.0):
+        self.base_url = "https://api.example.com/volleyball"  # Šis ir piemēra URL
+        self.api_key = "your_api_key"  # Šeit būtu jāievieto īstais API atslēga
+        self.latency = latency  # Imitētā tīkla aizture piemēra datiem (sekundēs)
+    
+    def get_recent_matches(self):
+        # Reālajā dzīvē šeit būtu API pieprasījums
+        # response = requests.get(f"{self.base_url}/matches/recent", headers={"Authorization": f"Bearer {self.api_key}"})
+        # return response.json()
+        
+        # Tā kā šī ir demonstrācija, atgriežam piemēra datus
+        if self.latency:
+            time.sleep(self.latency)
+        return self.sample_recent_matches()
+    
+    def get_player_info(self, player_name):
+        # Reālajā dzīvē šeit būtu API pieprasījums
+        # response = requests.get(f"{self.base_url}/players/{player_name}", headers={"Authorization": f"Bearer {self.api_key}"})
+        # return response.json()
+        
+        # Tā kā šī ir demonstrācija, atgriežam piemēra datus
+        if self.latency:
+            time.sleep(self.latency)
+        return self.sample_player_info(player_name)
+    
+    def sample_recent_matches(self):
+        return [
+            {"team1": "International Team A", "team2": "International Team B", "score": "3-2", "date": "2023-04-20"},
+            {"team1": "International Team C", "team2": "International Team D", "score": "3-0", "date": "2023-04-19"},
+            {"team1": "International Team E", "team2": "International Team F", "score": "2-3", "date": "2023-04-18"}
+        ]
+    
+    def sample_player_info(self, player_name):
+        return {
+            "name": player_name,
+            "rank": random.randint(1, 100),
+            "country": "International",
+            "height": f"{random.randint(180, 210)} cm",
+            "position": random.choice(["Setter", "Outside Hitter", "Middle Blocker", "Libero"]),
+            "career_points": random.randint(1000, 5000)
+        }
+
+# Flask lietotne
+app = Flask(__name__)
+app.secret_key = os.urandom(24)  # Drošai sessiju glabāšanai
+
+# Lēno vaicājumu žurnāls; slieksni milisekundēs var mainīt ar vides mainīgo VOLLEYBALL_SLOW_QUERY_MS
+slow_query_log = SlowQueryLog(float(os.environ.get('VOLLEYBALL_SLOW_QUERY_MS', '100')))
+
+# Pieprasījumu profilētājs (galvene X-Profile bez admin sesijas darbojas tikai ar VOLLEYBALL_PROFILE_TOKEN)
+request_profiler = RequestProfiler(token=os.environ.get('VOLLEYBALL_PROFILE_TOKEN'))
+
+# Datubāzes instances izveidošana
+db = Database(slow_log=slow_query_log)
+db.initialize_db()
+
+# Sports API instances izveidošana
+sports_api = SportsAPI()
+
+# Asinhronā režīma instances: uvicorn projekts:asgi_app
+async_db = AsyncDatabase(db)
+async_sports_api = AsyncSportsAPI(sports_api)
+asgi_app = AsgiApp(app)
+
+# Elo reitingu dzinēja instances izveidošana
+elo = EloRating(db)
+
+# Grafiku kešatmiņas instances izveidošana
+chart_cache = ChartCache(db)
+
+# Datu eksporta instances izveidošana
+league_export = LeagueExport(db)
+
+# Izspēļu notikumu uzņemšanas instances izveidošana
+rally_ingest = RallyIngest(db.db_name)
+
+# Tiešraides tablo instances izveidošana
+live_scoreboard = LiveScoreboard(db.db_name)
+
+# Rezerves kopiju pārvaldnieka instances izveidošana; periodiskas kopijas ieslēdz
+# ar vides mainīgo VOLLEYBALL_BACKUP_INTERVAL (sekundēs)
+backup_manager = BackupManager(db.db_name)
+if os.environ.get('VOLLEYBALL_BACKUP_INTERVAL'):
+    backup_manager.start_schedule(float(os.environ['VOLLEYBALL_BACKUP_INTERVAL']))
+
+# Savstarpējo spēļu statistika
+head_to_head = HeadToHead(db)
+
+# Izmaiņu plūsma kešu invalidācijai
+change_feed = ChangeFeed(db)
+
+# Sezonas simulators (rezultāti tiek kešoti līdz nākamajai spēļu izmaiņai)
+season_simulator = SeasonSimulator(db, elo, change_feed)
+
+# Spēlētāju līdzības indekss (tiek izveidots pie pirmā vaicājuma)
+similarity_index = SimilarityIndex(db)
+
+# Pozīciju procentiļu kvantiļu skices (tiek atsvaidzinātas pirms vaicājuma)
+quantile_sketches = QuantileSketches(db)
+
+# Turnīra tabula jebkurā datumā
+standings = Standings(db)
+
+# Spēļu iznākumu prognozēšanas modelis (artefakts tiek ielādēts pie pirmās prognozes)
+outcome_model = OutcomeModel(db, elo, change_feed)
+
+# Sezonu partīcijas (arhivētās sezonas atsevišķos failos)
+season_partitions = SeasonPartitions(db)
+
+# Kopīgais apkopotās statistikas momentuzņēmums (tiek atvērts ar mmap pēc pieprasījuma)
+aggregate_snapshot = AggregateSnapshot('aggregates.snap', db=db, change_feed=change_feed)
+
+# Renderēto lapu kešs (atsevišķi admin un parastajiem lietotājiem)
+fragment_cache = FragmentCache(db, change_feed)
+
+# Dārgo maršrutu vienlaicīguma ierobežojumi
+route_limiters = {
+    'player_chart': RouteLimiter('player_chart', max_concurrent=2, max_queue=4)
+}
+
+# Pārbaudīt, vai lietotājs ir autentificēts
+def is_authenticated():
+    return 'username' in session
+
+# Pārbaudīt, vai lietotājam ir admin tiesības
+def is_admin():
+    if not is_authenticated():
+        return False
+    
+    user_data = db.fetch_one("SELECT role FROM users WHERE username = ?", (session['username'],))
+    if user_data and user_data[0] == 'admin':
+        return True
+    return False
+
+# Lielas tabulas tiek sūtītas pa daļām: lapas galva uzreiz, rindas - tiklīdz nolasītas no kursora.
+# Jinja ģenerē ļoti mazus gabalus, tāpēc pēc galvas tie tiek apvienoti līdz chunk_size rakstzīmēm
+def stream_page(html, fragment=None, chunk_size=8192, **context):
+    def generate():
+        template_chunks = stream_template_string(html, **context)
+        # Pirmais gabals ir statiskā lapas galva līdz pirmajai izteiksmei (stili, izvēlne)
+        yield next(template_chunks, '')
+        chunks = []
+        size = 0
+        for chunk in template_chunks:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                yield ''.join(chunks)
+                chunks = []
+                size = 0
+        yield ''.join(chunks)
+    
+    # fragment = (atslēga, versija): lapa tiek saglabāta fragmentu kešā, kamēr tā tiek sūtīta
+    body = generate() if fragment is None else fragment_cache.capture(*fragment, generate())
+    return Response(stream_with_context(body), mimetype='text/html')
+
+@app.route('/')
+def home():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Volejbola Statistikas Lietotne</h1>
+        </div>
+        <div class="menu">
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <div class="section">
+                    <h2>Komandas informācija</h2>
+                    <p><strong>Nosaukums:</strong> {{ team_name }}</p>
+                    <p><strong>Pilsēta:</strong> {{ team_city }}</p>
+                    <p><strong>Treneris:</strong> {{ team_coach }}</p>
+                </div>
+                
+                <div class="section">
+                    <h2>Spēlētāji</h2>
+                    {% if is_admin %}
+                    <p><a href="/player/add/{{ team_id }}" class="btn">Pievienot jaunu spēlētāju</a></p>
+                    {% endif %}
+                    <table>
+                        <tr>
+                            <th>Nr.</th>
+                            <th>Vārds</th>
+                            <th>Pozīcija</th>
+                            <th>Spēles</th>
+                            <th>Punkti (vid.)</th>
+                            <th>Bloki (vid.)</th>
+                            <th>Serves (vid.)</th>
+                            <th>Darbības</th>
+                        </tr>
+                        {% for player in players %}
+                        <tr>
+                            <td>{{ player.number }}</td>
+                            <td>{{ player.name }}</td>
+                            <td>{{ player.position }}</td>
+                            <td>{{ player.games }}</td>
+                            <td>{{ player.total_points }} ({{ player.avg_points }})</td>
+                            <td>{{ player.total_blocks }} ({{ player.avg_blocks }})</td>
+                            <td>{{ player.total_serves }} ({{ player.avg_serves }})</td>
+                            <td>
+                                <a href="/player/{{ player.id }}" class="btn">Detaļas</a>
+                                {% if is_admin %}
+                                <a href="/player/edit/{{ player.id }}" class="btn">Rediģēt</a>
+                                {% endif %}
+                            </td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+                
+                <div class="section">
+                    <h2>Spēles</h2>
+                    <table>
+                        <tr>
+                            <th>Datums</th>
+                            <th>Mājinieki</th>
+                            <th>Viesi</th>
+                            <th>Rezultāts</th>
+                            <th>Iznākums</th>
+                            <th>Darbības</th>
+                        </tr>
+                        {% for match in matches %}
+                        <tr>
+                            <td>{{ match.date }}</td>
+                            <td>{{ match.team1_name }}</td>
+                            <td>{{ match.team2_name }}</td>
+                            <td>{{ match.score }}</td>
+                            <td>{{ match.result }}</td>
+                            <td>
+                                <a href="/match/{{ match.id }}" class="btn">Detaļas</a>
+                            </td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, 
+                                team_id=team_id,
+                                team_name=name,
+                                team_city=city,
+                                team_coach=coach,
+                                players=players,
+                                matches=matches,
+                                is_admin=is_admin())
+
+@app.route('/players')
+def players():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Vienīgā atšķirība starp lietotājiem ir admin rediģēšanas saites
+    admin = is_admin()
+    fragment_key = ('players', 'admin' if admin else 'user')
+    fragment_version = fragment_cache.get_version()
+    cached_html = fragment_cache.get(fragment_key, fragment_version)
+    if cached_html is not None:
+        return cached_html
+    
+    # Karjeras kopsummas (visas sezonas) un punktu secība - no koplietotā momentuzņēmuma. Spēlētāju
+    # dati un pēdējo spēļu punkti sparkline līknei tiek nolasīti pa porcijām pēc primārās atslēgas,
+    # lai atmiņā nebūtu visu spēlētāju
+    snapshot = aggregate_snapshot.current()
+    
+    def iter_players():
+        for chunk in aggregate_snapshot.iter_leaders(snapshot):
+            player_ids = [player_id for player_id, _ in chunk]
+            details = {row[0]: row[1:] for row in db.fetch_all(f"""
+                SELECT p.id, p.name, p.number, p.position, t.name, t.id,
+                    (SELECT group_concat(points) FROM (
+                        SELECT points FROM player_form f
+                        WHERE f.player_id = p.id
+                        ORDER BY f.date DESC, f.stat_id DESC
+                        LIMIT 10
+                    ))
+                FROM players p
+                JOIN teams t ON p.team_id = t.id
+                WHERE p.id IN ({', '.join('?' * len(player_ids))})
+            """, player_ids)}
+            for player_id in player_ids:
+                if player_id not in details:
+                    continue
+                yield player_row(player_id, *details[player_id], aggregate_snapshot.get_player(player_id, snapshot))
+    
+    def player_row(player_id, name, number, position, team_name, team_id, recent, totals):
+        points, blocks, serves, games = totals['points'], totals['blocks'], totals['serves'], totals['games']
+        
+        # Aprēķina vidējos rādītājus
+        avg_points = round(points / games if games > 0 else 0, 2)
+        avg_blocks = round(blocks / games if games > 0 else 0, 2)
+        avg_serves = round(serves / games if games > 0 else 0, 2)
+        recent_points = [int(value) for value in recent.split(',')][::-1] if recent else []
+        
+        return {
+            'id': player_id,
+            'name': name,
+            'number': number,
+            'position': position,
+            'team_name': team_name,
+            'team_id': team_id,
+            'total_points': points,
+            'total_blocks': blocks,
+            'total_serves': serves,
+            'games': games,
+            'avg_points': avg_points,
+            'avg_blocks': avg_blocks,
+            'avg_serves': avg_serves,
+            'sparkline': sparkline_svg(recent_points)
+        }
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Spēlētāji - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Volejbola Spēlētāji</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Spēlētāju saraksts</h2>
+                {% if is_admin %}
+                <p><a href="/player/add" class="btn">Pievienot jaunu spēlētāju</a></p>
+                {% endif %}
+                <table>
+                    <tr>
+                        <th>Nr.</th>
+                        <th>Vārds</th>
+                        <th>Pozīcija</th>
+                        <th>Komanda</th>
+                        <th>Spēles</th>
+                        <th>Punkti (vid.)</th>
+                        <th>Bloki (vid.)</th>
+                        <th>Serves (vid.)</th>
+                        <th>Forma</th>
+                        <th>Darbības</th>
+                    </tr>
+                    {% for player in players %}
+                    <tr>
+                        <td>{{ player.number }}</td>
+                        <td>{{ player.name }}</td>
+                        <td>{{ player.position }}</td>
+                        <td><a href="/team/{{ player.team_id }}">{{ player.team_name }}</a></td>
+                        <td>{{ player.games }}</td>
+                        <td>{{ player.total_points }} ({{ player.avg_points }})</td>
+                        <td>{{ player.total_blocks }} ({{ player.avg_blocks }})</td>
+                        <td>{{ player.total_serves }} ({{ player.avg_serves }})</td>
+                        <td>{{ player.sparkline|safe }}</td>
+                        <td>
+                            <a href="/player/{{ player.id }}" class="btn">Detaļas</a>
+                            {% if is_admin %}
+                            <a href="/player/edit/{{ player.id }}" class="btn">Rediģēt</a>
+                            {% endif %}
+                        </td>
+                    </tr>
+                    {% endfor %}
+                </table>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return stream_page(html, fragment=(fragment_key, fragment_version), players=iter_players(), is_admin=admin)
+
+@app.route('/player/<int:player_id>')
+def player_details(player_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    player_data = db.fetch_one("""
+        SELECT p.id, p.name, p.number, p.position, t.name as team_name, t.id as team_id
+        FROM players p
+        JOIN teams t ON p.team_id = t.id
+        WHERE p.id = ?
+    """, (player_id,))
+    
+    if not player_data:
+        return "Spēlētājs nav atrasts", 404
+    
+    player_id, name, number, position, team_name, team_id = player_data
+    
+    # Iegūst spēlētāja statistiku pa spēlēm visā karjerā
+    stats_data = db.fetch_all(f"""
+        SELECT ps.match_id, m.date, t1.name as team1_name, t2.name as team2_name, 
+            m.score_team1, m.score_team2, ps.points, ps.blocks, ps.serves
+        FROM {db.career_table('player_stats')} ps
+        JOIN {db.career_table('matches')} m ON ps.match_id = m.id
+        JOIN teams t1 ON m.team1_id = t1.id
+        JOIN teams t2 ON m.team2_id = t2.id
+        WHERE ps.player_id = ?
+        ORDER BY m.date DESC
+    """, (player_id,))
+    
+    stats = []
+    total_points = 0
+    total_blocks = 0
+    total_serves = 0
+    games_played = 0
+    
+    for stat in stats_data:
+        match_id, date, team1_name, team2_name, score_team1, score_team2, points, blocks, serves = stat
+        
+        # Aprēķina kopējo statistiku
+        total_points += points or 0
+        total_blocks += blocks or 0
+        total_serves += serves or 0
+        games_played += 1
+        
+        stats.append({
+            'match_id': match_id,
+            'date': date,
+            'match': f"{team1_name} vs {team2_name}",
+            'score': f"{score_team1}-{score_team2}",
+            'points': points or 0,
+            'blocks': blocks or 0,
+            'serves': serves or 0
+        })
+    
+    # Aprēķina vidējos rādītājus
+    avg_points = round(total_points / games_played if games_played > 0 else 0, 2)
+    avg_blocks = round(total_blocks / games_played if games_played > 0 else 0, 2)
+    avg_serves = round(total_serves / games_played if games_played > 0 else 0, 2)
+    
+    # Vieta pozīcijā: karjeras vidējais spēlē salīdzinājumā ar šīs pozīcijas spēlētāju sezonu vidējiem
+    # (nenoapaļots, lai spēlētājs ar vienu sezonu sakristu ar savu vērtību skicē)
+    if position and games_played:
+        percentiles = quantile_sketches.get_percentiles(position, {'points': total_points / games_played,
+                                                                   'blocks': total_blocks / games_played,
+                                                                   'serves': total_serves / games_played})
+    else:
+        percentiles = dict.fromkeys(QuantileSketches.fields)
+    
+    # Iegūst internacionālo statistiku no API
+    api_data = sports_api.get_player_info(name)
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>{{ player_name }} - Spēlētāja Detaļas</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+            .section { margin-bottom: 30px; }
+            .player-info { display: flex; }
+            .player-details { flex: 1; }
+            .player-stats { flex: 1; padding-left: 20px; }
+            .api-section { background-color: #f9f9f9; padding: 15px; border-radius: 5px; margin-top: 20px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>{{ player_name }} - Spēlētāja Detaļas</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <div class="player-info">
+                    <div class="player-details">
+                        <h2>Spēlētāja informācija</h2>
+                        <p><strong>Vārds:</strong> {{ player_name }}</p>
+                        <p><strong>Numurs:</strong> {{ player_number }}</p>
+                        <p><strong>Pozīcija:</strong> {{ player_position }}</p>
+                        <p><strong>Komanda:</strong> <a href="/team/{{ team_id }}">{{ team_name }}</a></p>
+                    </div>
+                    <div class="player-stats">
+                        <h2>Kopējā statistika</h2>
+                        <p><strong>Spēles:</strong> {{ games_played }}</p>
+                        <p><strong>Kopējie punkti:</strong> {{ total_points }} (vidēji {{ avg_points }} spēlē{% if percentiles.points is not none %}, {{ percentiles.points|round|int }}. procentile pozīcijā{% endif %})</p>
+                        <p><strong>Kopējie bloki:</strong> {{ total_blocks }} (vidēji {{ avg_blocks }} spēlē{% if percentiles.blocks is not none %}, {{ percentiles.blocks|round|int }}. procentile pozīcijā{% endif %})</p>
+                        <p><strong>Kopējās serves:</strong> {{ total_serves }} (vidēji {{ avg_serves }} spēlē{% if percentiles.serves is not none %}, {{ percentiles.serves|round|int }}. procentile pozīcijā{% endif %})</p>
+                    </div>
+                </div>
+                
+                <div class="api-section">
+                    <h2>Internacionālā statistika (API dati)</h2>
+                    <p><strong>Rangs:</strong> {{ api_data.rank }}</p>
+                    <p><strong>Valsts:</strong> {{ api_data.country }}</p>
+                    <p><strong>Augums:</strong> {{ api_data.height }}</p>
+                    <p><strong>Pozīcija:</strong> {{ api_data.position }}</p>
+                    <p><strong>Karjeras punkti:</strong> {{ api_data.career_points }}</p>
+                </div>
+                
+                <div class="section">
+                    <h2>Statistika pa spēlēm</h2>
+                    <table>
+                        <tr>
+                            <th>Datums</th>
+                            <th>Spēle</th>
+                            <th>Rezultāts</th>
+                            <th>Punkti</th>
+                            <th>Bloki</th>
+                            <th>Serves</th>
+                        </tr>
+                        {% for stat in stats %}
+                        <tr>
+                            <td>{{ stat.date }}</td>
+                            <td>{{ stat.match }}</td>
+                            <td>{{ stat.score }}</td>
+                            <td>{{ stat.points }}</td>
+                            <td>{{ stat.blocks }}</td>
+                            <td>{{ stat.serves }}</td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+                
+                <div class="section">
+                    <h2>Statistikas vizualizācija</h2>
+                    <div id="chart-container">
+                        <img src="/player/{{ player_id }}/chart" alt="Spēlētāja statistikas grafiks" width="100%">
+                    </div>
+                    <p>
+                        <a href="/player/{{ player_id }}/trends" class="btn">Forma un tendences</a>
+                        <a href="/player/{{ player_id }}/similar" class="btn">Līdzīgi spēlētāji</a>
+                    </p>
+                </div>
+                
+                {% if is_admin %}
+                <div class="section">
+                    <a href="/player/edit/{{ player_id }}" class="btn">Rediģēt spēlētāju</a>
+                    <a href="/player/stats/add/{{ player_id }}" class="btn">Pievienot statistiku</a>
+                </div>
+                {% endif %}
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, 
+                                player_id=player_id,
+                                player_name=name,
+                                player_number=number,
+                                player_position=position,
+                                team_name=team_name,
+                                team_id=team_id,
+                                games_played=games_played,
+                                total_points=total_points,
+                                total_blocks=total_blocks,
+                                total_serves=total_serves,
+                                avg_points=avg_points,
+                                avg_blocks=avg_blocks,
+                                avg_serves=avg_serves,
+                                stats=stats,
+                                percentiles=percentiles,
+                                api_data=api_data,
+                                is_admin=is_admin())
+
+def player_chart_fallback(player_id):
+    # Pārslodzes gadījumā atgriež pēdējo uzzīmēto grafiku, pat ja tas ir novecojis
+    cached_path = chart_cache.lookup(player_id, allow_stale=True)
+    if cached_path:
+        response = send_file(os.path.abspath(cached_path), mimetype='image/png')
+        response.headers['Warning'] = '110 - "Response is Stale"'
+        return response
+    return None
+
+@app.route('/player/<int:player_id>/chart')
+def player_chart(player_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Ja statistika kopš pēdējās zīmēšanas nav mainījusies, grafiks tiek nolasīts no diska
+    cached_path = chart_cache.lookup(player_id)
+    if cached_path:
+        return send_file(os.path.abspath(cached_path), mimetype='image/png')
+    
+    # Caur ierobežotāju iet tikai dārgā zīmēšana, nevis kešā atrastie grafiki
+    return render_player_chart(player_id)
+
+@limit_concurrency(route_limiters['player_chart'], fallback=player_chart_fallback)
+def render_player_chart(player_id):
+    # Kamēr pieprasījums gaidīja rindā, grafiku var būt uzzīmējis cits pieprasījums
+    cached_path = chart_cache.lookup(player_id)
+    if cached_path:
+        return send_file(os.path.abspath(cached_path), mimetype='image/png')
+    
+    # Iegūst spēlētāja statistiku pa spēlēm un uzzīmē grafiku
+    stats = chart_cache.get_stats(player_id)
+    png = render_chart_png(stats)
+    chart_cache.store(player_id, stats, png)
+    
+    # Atgriež grafiku
+    return send_file(BytesIO(png), mimetype='image/png')
+
+@app.cli.command('render-charts')
+@click.option('--workers', type=int, default=None, help='Procesu skaits (pēc noklusējuma visi kodoli)')
+def render_charts_command(workers):
+    # Iepriekš uzzīmē visu spēlētāju grafikus, kuru statistika ir mainījusies
+    report = chart_cache.prerender(workers)
+    print(f"Spēlētāji ar mainītu statistiku: {report['players']}")
+    print(f"Uzzīmēti grafiki: {report['rendered']}")
+    print(f"Kopējais laiks: {report['seconds']:.2f} s")
+    print(f"Grafiki sekundē: {report['charts_per_second']:.1f}")
+
+@app.cli.command('bench-sparklines')
+@click.option('--rows', type=int, default=500, help='Tabulas rindu skaits')
+@click.option('--points', type=int, default=10, help='Spēļu skaits vienā līknē')
+def bench_sparklines_command(rows, points):
+    # Salīdzina SVG līkņu ģenerēšanu ar matplotlib grafiku zīmēšanu vienai tabulas lapai
+    series = [[random.randint(0, 15) for _ in range(points)] for _ in range(rows)]
+    
+    start = time.perf_counter()
+    for values in series:
+        sparkline_svg(values)
+    svg_per_row = (time.perf_counter() - start) / rows
+    
+    # matplotlib ir daudz lēnāks, tāpēc zīmē tikai dažas rindas un rezultātu ekstrapolē
+    sample = series[:min(rows, 5)]
+    start = time.perf_counter()
+    for values in sample:
+        render_chart_png([(str(i), value, 0, 0) for i, value in enumerate(values)])
+    png_per_row = (time.perf_counter() - start) / len(sample)
+    
+    print(f"SVG: {svg_per_row * 1e6:.1f} µs rindai, {svg_per_row * rows * 1000:.1f} ms lapai ar {rows} rindām")
+    print(f"matplotlib: {png_per_row * 1000:.1f} ms rindai, {png_per_row * rows:.1f} s lapai ar {rows} rindām")
+    print(f"SVG ir {png_per_row / svg_per_row:.0f} reizes ātrāks")
+
+@app.route('/player/<int:player_id>/trends')
+def player_trends(player_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    player_data = db.fetch_one("SELECT id, name FROM players WHERE id = ?", (player_id,))
+    if not player_data:
+        return "Spēlētājs nav atrasts", 404
+    
+    player_id, name = player_data
+    
+    # Cik pēdējās spēles ņemt vērā (slīdošā loga platums)
+    window = request.args.get('n', 5, type=int)
+    window = max(1, min(window, 50))
+    
+    # Pa indeksu nolasa tikai pēdējās 2N-1 spēles, lai katrai no pēdējām N spēlēm
+    # būtu pilns slīdošais logs - vaicājuma cena nav atkarīga no karjeras garuma
+    form_data = db.fetch_all("""
+        SELECT date, points, blocks, serves, won, drawn,
+            AVG(points) OVER w, AVG(blocks) OVER w, AVG(serves) OVER w
+        FROM (
+            SELECT stat_id, date, points, blocks, serves, won, drawn
+            FROM player_form
+            WHERE player_id = ?
+            ORDER BY date DESC, stat_id DESC
+            LIMIT ?
+        )
+        WINDOW w AS (ORDER BY date, stat_id ROWS BETWEEN ? PRECEDING AND CURRENT ROW)
+        ORDER BY date DESC, stat_id DESC
+        LIMIT ?
+    """, (player_id, 2 * window - 1, window - 1, window))
+    
+    form = []
+    for row in form_data:
+        date, points, blocks, serves, won, drawn, avg_points, avg_blocks, avg_serves = row
+        form.append({
+            'date': date,
+            'points': points,
+            'blocks': blocks,
+            'serves': serves,
+            'result': "Uzvara" if won else "Neizšķirts" if drawn else "Zaudējums",
+            'avg_points': round(avg_points, 2),
+            'avg_blocks': round(avg_blocks, 2),
+            'avg_serves': round(avg_serves, 2)
+        })
+    
+    # Pēdējo N spēļu vidējie rādītāji ir jaunākās rindas slīdošais vidējais
+    recent = form[0] if form else {'avg_points': 0, 'avg_blocks': 0, 'avg_serves': 0}
+    recent_wins = sum(1 for stat in form if stat['result'] == "Uzvara")
+    
+    seasons_data = db.fetch_all("""
+        SELECT season, games, points, blocks, serves, wins
+        FROM player_season_stats
+        WHERE player_id = ?
+        ORDER BY season DESC
+    """, (player_id,))
+    
+    seasons = []
+    for season_data in seasons_data:
+        season, games, points, blocks, serves, wins = season_data
+        seasons.append({
+            'season': season,
+            'games': games,
+            'wins': wins,
+            'avg_points': round(points / games if games > 0 else 0, 2),
+            'avg_blocks': round(blocks / games if games > 0 else 0, 2),
+            'avg_serves': round(serves / games if games > 0 else 0, 2)
+        })
+    
+    streak_data = db.fetch_one("SELECT current_streak, best_streak FROM player_streaks WHERE player_id = ?", (player_id,))
+    current_streak, best_streak = streak_data if streak_data else (0, 0)
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>{{ player_name }} - Forma un tendences</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+            .section { margin-bottom: 30px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>{{ player_name }} - Forma un tendences</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <div class="section">
+                    <h2>Pēdējās {{ window }} spēles</h2>
+                    <p><strong>Uzvaras:</strong> {{ recent_wins }} no {{ form|length }}</p>
+                    <p><strong>Punkti (vid.):</strong> {{ recent.avg_points }}</p>
+                    <p><strong>Bloki (vid.):</strong> {{ recent.avg_blocks }}</p>
+                    <p><strong>Serves (vid.):</strong> {{ recent.avg_serves }}</p>
+                    <p><strong>Pašreizējā uzvaru sērija:</strong> {{ current_streak }}</p>
+                    <p><strong>Garākā uzvaru sērija:</strong> {{ best_streak }}</p>
+                </div>
+                
+                <div class="section">
+                    <h2>Slīdošie vidējie (logs: {{ window }} spēles)</h2>
+                    <table>
+                        <tr>
+                            <th>Datums</th>
+                            <th>Iznākums</th>
+                            <th>Punkti (slīd. vid.)</th>
+                            <th>Bloki (slīd. vid.)</th>
+                            <th>Serves (slīd. vid.)</th>
+                        </tr>
+                        {% for stat in form %}
+                        <tr>
+                            <td>{{ stat.date }}</td>
+                            <td>{{ stat.result }}</td>
+                            <td>{{ stat.points }} ({{ stat.avg_points }})</td>
+                            <td>{{ stat.blocks }} ({{ stat.avg_blocks }})</td>
+                            <td>{{ stat.serves }} ({{ stat.avg_serves }})</td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+                
+                <div class="section">
+                    <h2>Sezonas</h2>
+                    <table>
+                        <tr>
+                            <th>Sezona</th>
+                            <th>Spēles</th>
+                            <th>Uzvaras</th>
+                            <th>Punkti (vid.)</th>
+                            <th>Bloki (vid.)</th>
+                            <th>Serves (vid.)</th>
+                        </tr>
+                        {% for season in seasons %}
+                        <tr>
+                            <td>{{ season.season }}</td>
+                            <td>{{ season.games }}</td>
+                            <td>{{ season.wins }}</td>
+                            <td>{{ season.avg_points }}</td>
+                            <td>{{ season.avg_blocks }}</td>
+                            <td>{{ season.avg_serves }}</td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+                
+                <div class="section">
+                    <a href="/player/{{ player_id }}" class="btn">Atpakaļ pie spēlētāja</a>
+                </div>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html,
+                                player_id=player_id,
+                                player_name=name,
+                                window=window,
+                                form=form,
+                                recent=recent,
+                                recent_wins=recent_wins,
+                                seasons=seasons,
+                                current_streak=current_streak,
+                                best_streak=best_streak)
+
+@app.route('/matches')
+def matches():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Pēc noklusējuma karstās sezonas; arhivētu sezonu lasa no tās partīcijas
+    season = request.args.get('season')
+    matches_data = db.iter_rows(f"""
+        SELECT m.id, t1.name as team1_name, t2.name as team2_name, 
+            m.date, m.score_team1, m.score_team2
+        FROM {db.season_table('matches', season)} m
+        JOIN teams t1 ON m.team1_id = t1.id
+        JOIN teams t2 ON m.team2_id = t2.id
+        ORDER BY m.date DESC, m.id DESC
+    """)
+    archived_seasons = [partition['season'] for partition in season_partitions.list_partitions()]
+    
+    def iter_matches():
+        for match in matches_data:
+            match_id, team1_name, team2_name, date, score_team1, score_team2 = match
+            
+            # Nosaka uzvarētāju (spēlei bez rezultāta tā vēl nav)
+            if score_team1 is None or score_team2 is None:
+                winner = "Nav izspēlēta"
+            elif score_team1 > score_team2:
+                winner = team1_name
+            elif score_team2 > score_team1:
+                winner = team2_name
+            else:
+                winner = "Neizšķirts"
+            
+            yield {
+                'id': match_id,
+                'team1_name': team1_name,
+                'team2_name': team2_name,
+                'date': date,
+                'score': f"{score_team1} - {score_team2}",
+                'winner': winner
+            }
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Spēles - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Volejbola Spēles</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Spēļu saraksts</h2>
+                {% if is_admin %}
+                <p><a href="/match/add" class="btn">Pievienot jaunu spēli</a></p>
+                {% endif %}
+                {% if archived_seasons %}
+                <p>
+                    Arhivētās sezonas:
+                    <a href="/matches">Aktuālās</a>
+                    {% for archived_season in archived_seasons %}
+                    | <a href="/matches?season={{ archived_season }}">{{ archived_season }}</a>
+                    {% endfor %}
+                </p>
+                {% endif %}
+                <table>
+                    <tr>
+                        <th>Datums</th>
+                        <th>Mājinieki</th>
+                        <th>Viesi</th>
+                        <th>Rezultāts</th>
+                        <th>Uzvarētājs</th>
+                        <th>Darbības</th>
+                    </tr>
+                    {% for match in matches %}
+                    <tr>
+                        <td>{{ match.date }}</td>
+                        <td>{{ match.team1_name }}</td>
+                        <td>{{ match.team2_name }}</td>
+                        <td>{{ match.score }}</td>
+                        <td>{{ match.winner }}</td>
+                        <td>
+                            <a href="/match/{{ match.id }}" class="btn">Detaļas</a>
+                            {% if is_admin %}
+                            <a href="/match/edit/{{ match.id }}" class="btn">Rediģēt</a>
+                            {% endif %}
+                        </td>
+                    </tr>
+                    {% endfor %}
+                </table>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return stream_page(html, matches=iter_matches(), archived_seasons=archived_seasons, is_admin=is_admin())
+
+@app.route('/match/<int:match_id>')
+def match_details(match_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    match_data = db.fetch_one(f"""
+        SELECT m.id, t1.name as team1_name, t2.name as team2_name, t1.id as team1_id, t2.id as team2_id,
+            m.date, m.score_team1, m.score_team2
+        FROM {db.career_table('matches')} m
+        JOIN teams t1 ON m.team1_id = t1.id
+        JOIN teams t2 ON m.team2_id = t2.id
+        WHERE m.id = ?
+    """, (match_id,))
+    
+    if not match_data:
+        return "Spēle nav atrasta", 404
+    
+    match_id, team1_name, team2_name, team1_id, team2_id, date, score_team1, score_team2 = match_data
+    
+    # Nosaka uzvarētāju (spēlei bez rezultāta tā vēl nav)
+    if score_team1 is None or score_team2 is None:
+        winner = "Nav izspēlēta"
+    elif score_team1 > score_team2:
+        winner = team1_name
+    elif score_team2 > score_team1:
+        winner = team2_name
+    else:
+        winner = "Neizšķirts"
+    
+    # Iegūst spēlētāju statistiku šajā spēlē
+    team1_stats = db.fetch_all(f"""
+        SELECT p.id, p.name, p.number, ps.points, ps.blocks, ps.serves
+        FROM {db.career_table('player_stats')} ps
+        JOIN players p ON ps.player_id = p.id
+        WHERE ps.match_id = ? AND COALESCE(ps.team_id, p.team_id) = ?
+        ORDER BY ps.points DESC
+    """, (match_id, team1_id))
+    
+    team2_stats = db.fetch_all(f"""
+        SELECT p.id, p.name, p.number, ps.points, ps.blocks, ps.serves
+        FROM {db.career_table('player_stats')} ps
+        JOIN players p ON ps.player_id = p.id
+        WHERE ps.match_id = ? AND COALESCE(ps.team_id, p.team_id) = ?
+        ORDER BY ps.points DESC
+    """, (match_id, team2_id))
+    
+    # Konvertē datus sarakstā
+    team1_players = []
+    team2_players = []
+    
+    for stat in team1_stats:
+        player_id, name, number, points, blocks, serves = stat
+        team1_players.append({
+            'id': player_id,
+            'name': name,
+            'number': number,
+            'points': points or 0,
+            'blocks': blocks or 0,
+            'serves': serves or 0
+        })
+    
+    for stat in team2_stats:
+        player_id, name, number, points, blocks, serves = stat
+        team2_players.append({
+            'id': player_id,
+            'name': name,
+            'number': number,
+            'points': points or 0,
+            'blocks': blocks or 0,
+            'serves': serves or 0
+        })
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Spēles Detaļas - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Sveicināti, {{username}}!</h2>
+                <p>Šī lietotne ļauj jums aplūkot volejbola komandu, spēlētāju un spēļu statistiku.</p>
+                <p>Ko jūs vēlētos darīt šodien?</p>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, username=session['username'])
+
+@app.route('/search')
+def search():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    query = request.args.get('q', '').strip()
+    
+    results = []
+    for row in db.search(query) if query else []:
+        kind, ref_id, name, position, city, coach = row
+        if kind == 'player':
+            results.append({
+                'kind': "Spēlētājs",
+                'url': f"/player/{ref_id}",
+                'name': name,
+                'details': position or ""
+            })
+        else:
+            results.append({
+                'kind': "Komanda",
+                'url': f"/team/{ref_id}",
+                'name': name,
+                'details': f"{city or ''}, treneris {coach or ''}"
+            })
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Meklēšana - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+            input[type=text] { padding: 8px; width: 50%; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Meklēšana</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <form method="get" action="/search">
+                    <input type="text" name="q" value="{{ query }}" placeholder="Spēlētājs, komanda, pilsēta vai treneris">
+                    <button type="submit" class="btn">Meklēt</button>
+                </form>
+                {% if query %}
+                <h2>Rezultāti: {{ query }}</h2>
+                {% if results %}
+                <table>
+                    <tr>
+                        <th>Veids</th>
+                        <th>Nosaukums</th>
+                        <th>Informācija</th>
+                    </tr>
+                    {% for result in results %}
+                    <tr>
+                        <td>{{ result.kind }}</td>
+                        <td><a href="{{ result.url }}">{{ result.name }}</a></td>
+                        <td>{{ result.details }}</td>
+                    </tr>
+                    {% endfor %}
+                </table>
+                {% else %}
+                <p>Nekas netika atrasts.</p>
+                {% endif %}
+                {% endif %}
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, query=query, results=results)
+
+def export_filters():
+    # Eksporta filtri no vaicājuma parametriem
+    return {
+        'team_id': request.args.get('team', type=int),
+        'season': request.args.get('season', type=int),
+        'date_from': request.args.get('from'),
+        'date_to': request.args.get('to')
+    }
+
+@app.route('/export/player_stats.csv')
+def export_player_stats_csv():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    return Response(league_export.iter_csv(**export_filters()),
+                    mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=player_stats.csv'})
+
+@app.route('/export/player_stats.jsonl')
+def export_player_stats_jsonl():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    return Response(league_export.iter_jsonl(**export_filters()),
+                    mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=player_stats.jsonl'})
+
+@app.cli.command('export-player-stats')
+@click.option('--format', 'export_format', type=click.Choice(['csv', 'jsonl']), default='csv')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='Izvades fails (pēc noklusējuma stdout)')
+@click.option('--team', 'team_id', type=int, default=None)
+@click.option('--season', type=int, default=None)
+@click.option('--from', 'date_from', default=None, help='Datums no (YYYY-MM-DD)')
+@click.option('--to', 'date_to', default=None, help='Datums līdz (YYYY-MM-DD)')
+def export_player_stats_command(export_format, output, team_id, season, date_from, date_to):
+    filters = {'team_id': team_id, 'season': season, 'date_from': date_from, 'date_to': date_to}
+    chunks = league_export.iter_csv(**filters) if export_format == 'csv' else league_export.iter_jsonl(**filters)
+    for chunk in chunks:
+        output.write(chunk)
+
+@app.route('/ingest/rallies', methods=['POST'])
+def ingest_rallies():
+    if not is_admin():
+        return jsonify({'error': "Nepieciešamas admin tiesības"}), 403
+    
+    payload = request.get_json(silent=True)
+    events = payload if isinstance(payload, list) else [payload] if isinstance(payload, dict) else None
+    if events is None:
+        return jsonify({'error': "Sagaidīts JSON objekts vai saraksts"}), 400
+    
+    try:
+        accepted = rally_ingest.submit(events)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f"Nederīgs notikums: {e}"}), 400
+    except Full as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(max(1, round(rally_ingest.flush_interval)))}
+    
+    return jsonify({'accepted': accepted}), 202
+
+@app.route('/ingest/metrics')
+def ingest_metrics():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    return jsonify(rally_ingest.get_metrics())
+
+@app.cli.command('bench-ingest')
+@click.option('--events', type=int, default=100000, help='Notikumu skaits')
+@click.option('--batch', type=int, default=500, help='Notikumi vienā pieprasījumā')
+def bench_ingest_command(events, batch):
+    # Mēra uzņemšanas caurlaidību pagaidu datubāzē, lai neskartu īstos datus
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bench_db = Database(os.path.join(temp_dir, 'bench.db'))
+        bench_db.initialize_db()
+        players_data = bench_db.fetch_all("""
+            SELECT m.id, p.id FROM matches m
+            JOIN players p ON p.team_id IN (m.team1_id, m.team2_id)
+        """)
+        bench_db.close()
+        
+        ingest = RallyIngest(bench_db.db_name)
+        action_names = list(RallyIngest.actions)
+        start = time.perf_counter()
+        for offset in range(0, events, batch):
+            chunk = []
+            for _ in range(min(batch, events - offset)):
+                match_id, player_id = random.choice(players_data)
+                chunk.append({'match_id': match_id, 'player_id': player_id,
+                              'action': random.choice(action_names), 'set': random.randint(1, 5)})
+            ingest.submit(chunk)
+        submit_seconds = time.perf_counter() - start
+        
+        max_lag = 0
+        while ingest.get_metrics()['flushed'] < events:
+            max_lag = max(max_lag, ingest.get_metrics()['lag_seconds'])
+            time.sleep(0.05)
+        total_seconds = time.perf_counter() - start
+        
+        metrics = ingest.get_metrics()
+        print(f"Pieņemti {events} notikumi {submit_seconds:.2f} s ({events / submit_seconds:.0f} notikumi/s)")
+        print(f"Ierakstīti {metrics['flushed']} notikumi {metrics['batches']} transakcijās, kopā {total_seconds:.2f} s "
+              f"({events / total_seconds:.0f} notikumi/s)")
+        print(f"Lielākā novērotā aizture: {max_lag:.2f} s")
+
+@app.route('/match/<int:match_id>/live')
+def match_live(match_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    if not db.fetch_one("SELECT id FROM matches WHERE id = ?", (match_id,)):
+        return "Spēle nav atrasta", 404
+    
+    return Response(live_scoreboard.stream(match_id),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.cli.command('sse-load-test')
+@click.option('--subscribers', type=int, default=1000, help='Klausītāju skaits')
+@click.option('--updates', type=int, default=20, help='Statistikas izmaiņu skaits')
+def sse_load_test_command(subscribers, updates):
+    # Pieslēdz daudzus HTTP klausītājus /match/<id>/live un mēra piegādes aizturi. Izmaiņas tiek
+    # veiktas vienā statistikas rindā un testa beigās atceltas
+    from http.client import HTTPConnection
+    from werkzeug.serving import make_server
+    
+    stat_data = db.fetch_one("SELECT id, match_id FROM player_stats ORDER BY id LIMIT 1")
+    if not stat_data:
+        raise click.ClickException("Nav spēlētāju statistikas, ko mainīt")
+    stat_id, match_id = stat_data
+    
+    serializer = app.session_interface.get_signing_serializer(app)
+    cookie = f"{app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'username': 'admin'})}"
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    interval = live_scoreboard.interval
+    live_scoreboard.interval = 0.05
+    
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    
+    latencies = []
+    errors = []
+    latencies_lock = threading.Lock()
+    
+    def consume():
+        conn = HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            conn.request('GET', f'/match/{match_id}/live', headers={'Cookie': cookie})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise OSError(f"HTTP {response.status}")
+            received = 0
+            while received <= updates:
+                line = response.readline()
+                if not line:
+                    break
+                if line.startswith(b'data: '):
+                    data = json.loads(line[6:])
+                    with latencies_lock:
+                        latencies.append(time.time() - data['sent_at'])
+                    received += 1
+        except OSError as e:
+            with latencies_lock:
+                errors.append(e)
+        finally:
+            conn.close()
+    
+    consumers = [threading.Thread(target=consume, daemon=True) for _ in range(subscribers)]
+    try:
+        for consumer in consumers:
+            consumer.start()
+        wait_until = time.time() + 30
+        while live_scoreboard.get_metrics()['subscribers'] + len(errors) < subscribers and time.time() < wait_until:
+            time.sleep(0.01)
+        time.sleep(0.2)
+        
+        start = time.perf_counter()
+        for _ in range(updates):
+            db.execute("UPDATE player_stats SET points = COALESCE(points, 0) + 1 WHERE id = ?", (stat_id,))
+            time.sleep(0.1)
+        for consumer in consumers:
+            consumer.join(timeout=5)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.execute("UPDATE player_stats SET points = points - ? WHERE id = ?", (updates, stat_id))
+        server.shutdown()
+        live_scoreboard.interval = interval
+    
+    latencies.sort()
+    metrics = live_scoreboard.get_metrics()
+    print(f"Klausītāji: {subscribers}, izmaiņas: {updates}, laiks: {elapsed:.2f} s")
+    print(f"Piegādātas ziņas: {len(latencies)} (sagaidīts {subscribers * (updates + 1)}), "
+          f"atvienoti: {metrics['dropped']}, kļūdas: {len(errors)}")
+    if latencies:
+        print(f"Aizture p50: {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"p99: {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+@app.route('/admin/limits')
+def admin_limits():
+    if not is_admin():
+        return "Nepieciešamas admin tiesības", 403
+    
+    return jsonify({name: limiter.get_metrics() for name, limiter in route_limiters.items()})
+
+@app.cli.command('flood-test')
+@click.option('--threads', type=int, default=16, help='Vienlaicīgi grafiku pieprasītāji')
+@click.option('--seconds', type=float, default=5.0, help='Testa ilgums')
+def flood_test_command(threads, seconds):
+    # Pārpludina grafiku maršrutu un tajā pašā laikā mēra /teams atbildes laiku
+    def measure_teams(client, count=20):
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            client.get('/teams')
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.05)
+        latencies.sort()
+        return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+    
+    def logged_in_client():
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        return client
+    
+    baseline = measure_teams(logged_in_client())
+    
+    statuses = {}
+    statuses_lock = threading.Lock()
+    player_ids = [row[0] for row in db.fetch_all("SELECT id FROM players")]
+    stop_at = time.time() + seconds
+    
+    def flood():
+        client = logged_in_client()
+        while time.time() < stop_at:
+            player_id = random.choice(player_ids)
+            # Atzīmē grafiku kā novecojušu, lai katrs pieprasījums prasītu pilnu zīmēšanu
+            db.execute("UPDATE chart_renders SET stale = 1 WHERE player_id = ?", (player_id,))
+            response = client.get(f'/player/{player_id}/chart')
+            status = 'degraded' if 'Warning' in response.headers else response.status_code
+            with statuses_lock:
+                statuses[status] = statuses.get(status, 0) + 1
+    
+    flooders = [threading.Thread(target=flood, daemon=True) for _ in range(threads)]
+    for flooder in flooders:
+        flooder.start()
+    time.sleep(0.2)
+    under_load = measure_teams(logged_in_client())
+    for flooder in flooders:
+        flooder.join()
+    
+    print(f"/teams bez slodzes: p50 {baseline[0] * 1000:.1f} ms, p99 {baseline[1] * 1000:.1f} ms")
+    print(f"/teams grafiku plūdu laikā: p50 {under_load[0] * 1000:.1f} ms, p99 {under_load[1] * 1000:.1f} ms")
+    print(f"Grafiku atbildes: {statuses}")
+    print(f"Ierobežotājs: {route_limiters['player_chart'].get_metrics()}")
+
+@app.cli.command('backup')
+@click.option('--force', is_flag=True, help='Veidot kopiju arī tad, ja dati nav mainījušies')
+def backup_command(force):
+    report = backup_manager.backup(force=force)
+    if report is None:
+        print("Dati kopš pēdējās kopijas nav mainījušies")
+        return
+    print(f"Kopija: {report['path']} ({report['size']} baiti, {report['steps']} soļi, {report['seconds']:.2f} s)")
+    print(f"SHA-256: {report['checksum']}")
+    for path in report['removed']:
+        print(f"Dzēsta vecā kopija: {path}")
+
+@app.cli.command('backup-verify')
+def backup_verify_command():
+    for path in backup_manager.list_backups():
+        print(f"{path}: {'OK' if backup_manager.verify(path) else 'BOJĀTA'}")
+
+@app.cli.command('bench-backup')
+@click.option('--rows', type=int, default=300000, help='Papildu player_stats rindas testa datubāzē')
+@click.option('--pages', type=int, default=16, help='Lapas vienā solī')
+@click.option('--sleep', 'step_sleep', type=float, default=0.01, help='Pauze starp soļiem (s)')
+def bench_backup_command(rows, pages, step_sleep):
+    # Mēra tipiska vaicājuma aizturi bez kopēšanas un kopēšanas laikā pagaidu datubāzē
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bench_db = Database(os.path.join(temp_dir, 'bench.db'))
+        bench_db.initialize_db()
+        bench_db.execute("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            INSERT INTO rally_events (match_id, player_id, action, set_number, timestamp)
+            SELECT i % 4 + 1, i % 12 + 1, 'point', i % 5 + 1, i FROM n
+        """, (rows,))
+        manager = BackupManager(bench_db.db_name, os.path.join(temp_dir, 'backups'), pages, step_sleep)
+        
+        def measure(duration=None, until=None):
+            latencies = []
+            reader = Database(bench_db.db_name)
+            stop_at = time.time() + duration if duration else None
+            while (until is None or not until.is_set()) and (stop_at is None or time.time() < stop_at):
+                start = time.perf_counter()
+                reader.fetch_all("SELECT player_id, SUM(points) FROM player_stats GROUP BY player_id")
+                reader.execute("UPDATE player_stats SET serves = serves WHERE id = 1")
+                latencies.append(time.perf_counter() - start)
+            reader.close()
+            latencies.sort()
+            return latencies
+        
+        idle = measure(duration=2)
+        
+        done = threading.Event()
+        loaded = []
+        worker = threading.Thread(target=lambda: loaded.extend(measure(until=done)))
+        worker.start()
+        report = manager.backup(force=True)
+        done.set()
+        worker.join()
+        loaded.sort()
+        
+        def p99(latencies):
+            return latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+        
+        print(f"Kopija: {report['size'] / 1e6:.1f} MB, {report['steps']} soļi, ilgums {report['seconds']:.2f} s")
+        print(f"Pārbaude: {'OK' if manager.verify(report['path']) else 'BOJĀTA'}")
+        print(f"Vaicājumu p99 bez kopēšanas: {p99(idle):.2f} ms ({len(idle)} vaicājumi)")
+        print(f"Vaicājumu p99 kopēšanas laikā: {p99(loaded):.2f} ms ({len(loaded)} vaicājumi)")
+
+@app.route('/api/leaderboard')
+def api_leaderboard():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    snapshot = aggregate_snapshot.current()
+    return jsonify({
+        'built_at': snapshot.built_at,
+        'standings': aggregate_snapshot.get_standings(snapshot),
+        'leaders': aggregate_snapshot.get_leaderboard(request.args.get('limit', 10, type=int), snapshot)
+    })
+
+@app.cli.command('build-snapshot')
+def build_snapshot_command():
+    start = time.perf_counter()
+    report = SnapshotBuilder(db, aggregate_snapshot.path).build(change_feed.latest())
+    print(f"Momentuzņēmums: {report['players']} spēlētāji, {report['teams']} komandas, "
+          f"{report['size']} baiti, {time.perf_counter() - start:.2f} s")
+
+def process_memory():
+    # Privātā (ne koplietotā) procesa atmiņa KB; mmap lappuses no lapu keša šeit netiek skaitītas
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith(('Private_Clean', 'Private_Dirty')))
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def snapshot_bench_worker(args):
+    # Darba process: mēra atmiņu un meklēšanas ātrumu ar mmap vai ar SQL
+    mode, db_name, snapshot_path, player_ids = args
+    memory_before = process_memory()
+    start = time.perf_counter()
+    if mode == 'mmap':
+        snapshot = AggregateSnapshot(snapshot_path)
+        for player_id in player_ids:
+            snapshot.get_player(player_id)
+    else:
+        worker_db = Database(db_name)
+        for player_id in player_ids:
+            worker_db.fetch_one("""
+                SELECT COUNT(*), SUM(points), SUM(blocks), SUM(serves)
+                FROM player_form WHERE player_id = ?
+            """, (player_id,))
+    elapsed = time.perf_counter() - start
+    return elapsed / len(player_ids), process_memory() - memory_before
+
+@app.cli.command('bench-snapshot')
+@click.option('--players', type=int, default=100000, help='Spēlētāju skaits testa datubāzē')
+@click.option('--workers', type=int, default=4, help='Darba procesu skaits')
+@click.option('--lookups', type=int, default=20000, help='Meklēšanas reizes katrā procesā')
+def bench_snapshot_command(players, workers, lookups):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bench_db = Database(os.path.join(temp_dir, 'bench.db'))
+        bench_db.initialize_db()
+        bench_db.execute("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            INSERT INTO players (name, number, position, team_id) SELECT 'Spēlētājs ' || i, i % 99, 'Setter', i % 4 + 1 FROM n
+        """, (players,))
+        bench_db.execute("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            INSERT INTO player_stats (player_id, match_id, points, blocks, serves)
+            SELECT i % ? + 1, i % 4 + 1, i % 15, i % 5, i % 8 FROM n
+        """, (players * 5, players))
+        snapshot_path = os.path.join(temp_dir, 'aggregates.snap')
+        report = SnapshotBuilder(bench_db, snapshot_path).build()
+        bench_db.close()
+        
+        player_ids = [random.randint(1, players) for _ in range(lookups)]
+        print(f"Momentuzņēmums: {report['size'] / 1e6:.1f} MB, {report['players']} spēlētāji")
+        for mode in ('mmap', 'sql'):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(snapshot_bench_worker,
+                                            [(mode, bench_db.db_name, snapshot_path, player_ids)] * workers))
+            latency = sum(result[0] for result in results) / len(results)
+            memory = sum(result[1] for result in results) / len(results)
+            print(f"{mode}: {latency * 1e6:.1f} µs meklēšanai, privātās atmiņas pieaugums procesā {memory / 1024:.1f} MB")
+
+def h2h_response(team_id, other_id, teams_data, record):
+    names = dict(teams_data)
+    if team_id not in names or other_id not in names:
+        return 404, {'error': "Komanda nav atrasta"}
+    
+    if record is None:
+        # Komandas vēl nav spēlējušas viena pret otru
+        record = dict(zip(HeadToHead.fields, (team_id, other_id, 0, 0, 0, 0, 0, 0, None, None, None, None)),
+                      set_difference=0)
+    record['team_name'] = names[team_id]
+    record['opponent_name'] = names[other_id]
+    return 200, record
+
+@app.route('/team/<int:team_id>/h2h/<int:other_id>')
+def team_h2h(team_id, other_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    teams_data = db.fetch_all("SELECT id, name FROM teams WHERE id IN (?, ?)", (team_id, other_id))
+    status, data = h2h_response(team_id, other_id, teams_data, head_to_head.get(team_id, other_id))
+    return jsonify(data), status
+
+@app.route('/h2h')
+def h2h_matrix():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    teams_list, cells = head_to_head.get_matrix()
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Savstarpējās spēles - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: center; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .last { color: #777; font-size: 12px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Savstarpējās spēles</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Uzvaras - zaudējumi (setu starpība)</h2>
+                <table>
+                    <tr>
+                        <th></th>
+                        {% for opponent in teams %}
+                        <th>{{ opponent.name }}</th>
+                        {% endfor %}
+                    </tr>
+                    {% for team in teams %}
+                    <tr>
+                        <th><a href="/team/{{ team.id }}" style="color: white;">{{ team.name }}</a></th>
+                        {% for opponent in teams %}
+                        {% set cell = cells.get((team.id, opponent.id)) %}
+                        <td>
+                            {% if team.id == opponent.id %}
+                            &mdash;
+                            {% elif cell %}
+                            {{ cell.wins }} - {{ cell.losses }} ({{ '%+d' % cell.set_difference }})
+                            <div class="last">{{ cell.last_date }}: {{ cell.last_sets_for }} - {{ cell.last_sets_against }}</div>
+                            {% else %}
+                            Nav spēlēts
+                            {% endif %}
+                        </td>
+                        {% endfor %}
+                    </tr>
+                    {% endfor %}
+                </table>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, teams=teams_list, cells=cells)
+
+@app.route('/simulation')
+def season_simulation():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    try:
+        results = season_simulator.get_results(request.args.get('season'))
+    except ValueError as e:
+        return str(e), 404
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Sezonas prognoze - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Sezonas {{ results.season }} prognoze</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Vietu varbūtības</h2>
+                <p>{{ results.simulations }} simulētas sezonas, atlikušas {{ results.remaining_matches }} spēles.</p>
+                <table>
+                    <tr>
+                        <th>Komanda</th>
+                        <th>Uzvaras</th>
+                        <th>Sagaidāmā vieta</th>
+                        {% for position in range(1, results.teams|length + 1) %}
+                        <th>{{ position }}. vieta</th>
+                        {% endfor %}
+                    </tr>
+                    {% for team in results.teams %}
+                    <tr>
+                        <td><a href="/team/{{ team.team_id }}">{{ team.name }}</a></td>
+                        <td>{{ team.wins }}</td>
+                        <td>{{ team.expected_position }}</td>
+                        {% for probability in team.positions %}
+                        <td>{{ '%.1f' % (probability * 100) }}%</td>
+                        {% endfor %}
+                    </tr>
+                    {% endfor %}
+                </table>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, results=results)
+
+@app.cli.command('simulate-season')
+@click.option('--season', default=None, help='Sezona (gads); pēc noklusējuma pēdējā')
+@click.option('--simulations', type=click.IntRange(min=1), default=100000, help='Simulēto sezonu skaits')
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Procesu skaits (pēc noklusējuma visi kodoli)')
+def simulate_season_command(season, simulations, workers):
+    try:
+        results = season_simulator.simulate(season, simulations, workers)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Sezona {results['season']}: {results['simulations']} simulācijas, "
+          f"{results['remaining_matches']} atlikušās spēles, {results['seconds']:.2f} s "
+          f"({results['simulations_per_second']:.0f} simulācijas/s)")
+    for team in results['teams']:
+        positions = ' '.join(f"{probability * 100:5.1f}%" for probability in team['positions'])
+        print(f"{team['name']:<20} {team['expected_position']:5.2f}  {positions}")
+
+@app.route('/changes')
+def changes_feed():
+    if not is_admin():
+        return jsonify({'error': "Nepieciešamas admin tiesības"}), 403
+    
+    tables = [table for table in request.args.get('tables', '').split(',') if table]
+    if any(table not in ChangeFeed.tables for table in tables):
+        return jsonify({'error': f"Atļautās tabulas: {', '.join(ChangeFeed.tables)}"}), 400
+    
+    limit = max(1, min(request.args.get('limit', 1000, type=int), 10000))
+    changes, cursor = change_feed.poll(request.args.get('since', 0, type=int), tables, limit)
+    return jsonify({'changes': changes, 'cursor': cursor})
+
+@app.cli.command('changes-tail')
+@click.option('--since', type=int, default=None, help='Sākuma kursors (pēc noklusējuma žurnāla beigas)')
+@click.option('--tables', default='', help='Tabulas, atdalītas ar komatu')
+def changes_tail_command(since, tables):
+    for change in change_feed.tail(since, [table for table in tables.split(',') if table]):
+        print(f"{change['seq']}\t{change['table']}\t{change['operation']}\t{change['row_id']}", flush=True)
+
+@app.cli.command('changes-prune')
+def changes_prune_command():
+    print(f"Dzēsti {change_feed.prune()} apstrādāti izmaiņu ieraksti")
+
+@app.route('/admin/slow-queries')
+def admin_slow_queries():
+    if not is_admin():
+        return "Nepieciešamas admin tiesības", 403
+    
+    if request.args.get('reset'):
+        slow_query_log.reset()
+        return redirect(url_for('admin_slow_queries'))
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Lēnie vaicājumi - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; vertical-align: top; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+            code, pre { font-size: 12px; white-space: pre-wrap; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Lēnie vaicājumi</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Vaicājumi virs {{ threshold }} ms pēc kopējā laika</h2>
+                <p>Pilns žurnāls: {{ log_path }} <a href="?reset=1" class="btn">Notīrīt</a></p>
+                <table>
+                    <tr>
+                        <th>SQL</th>
+                        <th>Reizes</th>
+                        <th>Kopā (ms)</th>
+                        <th>Vid. (ms)</th>
+                        <th>Maks. (ms)</th>
+                        <th>Maršruti</th>
+                        <th>Izpildes plāns</th>
+                    </tr>
+                    {% for statement in statements %}
+                    <tr>
+                        <td><code>{{ statement.sql }}</code></td>
+                        <td>{{ statement.count }}</td>
+                        <td>{{ statement.total_ms }}</td>
+                        <td>{{ statement.avg_ms }}</td>
+                        <td>{{ statement.max_ms }}</td>
+                        <td>{{ statement.routes|join(', ') }}</td>
+                        <td><pre>{{ statement.plan|join('\n') }}</pre></td>
+                    </tr>
+                    {% else %}
+                    <tr><td colspan="7">Lēni vaicājumi nav reģistrēti</td></tr>
+                    {% endfor %}
+                </table>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, statements=slow_query_log.get_worst(),
+                                threshold=round(slow_query_log.threshold * 1000, 1),
+                                log_path=slow_query_log.log_path)
+
+@app.cli.command('archive-season')
+@click.argument('season')
+@click.option('--compact', is_flag=True, help='Pēc arhivēšanas saspiest partīcijas failu')
+def archive_season_command(season, compact):
+    try:
+        report = season_partitions.archive(season)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Sezona {report['season']} pārvietota uz {report['path']}: "
+          f"{report['matches']} spēles, {report['stats']} statistikas ieraksti")
+    if compact:
+        report = season_partitions.compact(season)
+        print(f"Saspiests: {report['size_before'] / 1024:.0f} KB -> {report['size_after'] / 1024:.0f} KB")
+
+@app.cli.command('compact-season')
+@click.argument('season')
+def compact_season_command(season):
+    try:
+        report = season_partitions.compact(season)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Sezona {report['season']}: {report['size_before'] / 1024:.0f} KB -> {report['size_after'] / 1024:.0f} KB")
+
+@app.cli.command('list-seasons')
+def list_seasons_command():
+    for partition in season_partitions.list_partitions():
+        print(f"{partition['season']}\t{partition['matches']} spēles\t{partition['stats']} ieraksti\t"
+              f"{partition['size'] / 1024:.0f} KB\tarhivēta {partition['archived_at']}"
+              + (f", saspiesta {partition['compacted_at']}" if partition['compacted_at'] else ""))
+
+def international_player_names():
+    names = [name for name in request.args.get('players', '').split(',') if name]
+    return names or [row[0] for row in db.fetch_all("SELECT name FROM players ORDER BY id LIMIT 5")]
+
+@app.route('/api/international')
+def api_international():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Sinhronajā režīmā katrs ārējais pieprasījums aizņem pavedienu, līdz tiek saņemta atbilde
+    return jsonify({
+        'matches': sports_api.get_recent_matches(),
+        'players': [sports_api.get_player_info(name) for name in international_player_names()]
+    })
+
+@asgi_app.route('/api/international')
+async def api_international_async(query):
+    names = [name for name in query.get('players', '').split(',') if name]
+    if not names:
+        names = [row[0] for row in await async_db.fetch_all("SELECT name FROM players ORDER BY id LIMIT 5")]
+    matches_data, players_data = await asyncio.gather(async_sports_api.get_recent_matches(),
+                                                      async_sports_api.get_players_info(names))
+    return 200, {'matches': matches_data, 'players': players_data}
+
+@asgi_app.route('/team/<int:team_id>/h2h/<int:other_id>')
+async def team_h2h_async(query, team_id, other_id):
+    teams_data = await async_db.fetch_all("SELECT id, name FROM teams WHERE id IN (?, ?)", (team_id, other_id))
+    record = await asyncio.to_thread(head_to_head.get, team_id, other_id)
+    return h2h_response(team_id, other_id, teams_data, record)
+
+@app.cli.command('bench-asgi')
+@click.option('--connections', type=int, default=200, help='Vienlaicīgi savienojumi')
+@click.option('--requests', 'requests_per_connection', type=int, default=5, help='Pieprasījumi katrā savienojumā')
+@click.option('--latency', type=float, default=0.05, help='Imitētā ārējā API aizture sekundēs')
+def bench_asgi_command(connections, requests_per_connection, latency):
+    # Salīdzina WSGI (pavediens katram savienojumam) un ASGI (notikumu cilpa) ar vienādu slodzi
+    try:
+        import uvicorn
+    except ImportError:
+        raise click.ClickException("ASGI testam nepieciešams uvicorn un asgiref (pip install uvicorn asgiref)")
+    from http.client import HTTPConnection
+    from werkzeug.serving import make_server
+    
+    serializer = app.session_interface.get_signing_serializer(app)
+    cookie = f"{app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'username': 'admin'})}"
+    sports_api.latency = latency
+    
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+    
+    def run_load(port):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        peak_threads = [0]
+        done = threading.Event()
+        baseline_threads = threading.active_count()
+        
+        def client():
+            conn = HTTPConnection('127.0.0.1', port, timeout=60)
+            for _ in range(requests_per_connection):
+                start = time.perf_counter()
+                try:
+                    conn.request('GET', '/api/international', headers={'Cookie': cookie})
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except OSError:
+                    ok = False
+                    conn.close()
+                    conn = HTTPConnection('127.0.0.1', port, timeout=60)
+                with lock:
+                    (latencies if ok else errors).append(time.perf_counter() - start)
+            conn.close()
+        
+        def monitor():
+            # Servera pavedieni = visi pavedieni mīnus klienti un šis pavediens
+            while not done.is_set():
+                peak_threads[0] = max(peak_threads[0], threading.active_count() - baseline_threads - connections - 1)
+                time.sleep(0.01)
+        
+        monitor_thread = threading.Thread(target=monitor, daemon=True)
+        monitor_thread.start()
+        clients = [threading.Thread(target=client, daemon=True) for _ in range(connections)]
+        start = time.perf_counter()
+        for client_thread in clients:
+            client_thread.start()
+        for client_thread in clients:
+            client_thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        monitor_thread.join()
+        
+        latencies.sort()
+        return {
+            'requests_per_second': len(latencies) / elapsed,
+            'p50': latencies[len(latencies) // 2] if latencies else 0,
+            'p99': latencies[int(len(latencies) * 0.99)] if latencies else 0,
+            'errors': len(errors),
+            'threads': peak_threads[0]
+        }
+    
+    results = {}
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    
+    port = free_port()
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    results['WSGI (pavedieni)'] = run_load(port)
+    server.shutdown()
+    
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host='127.0.0.1', port=port, log_level='warning',
+                                           backlog=max(2048, connections)))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    results['ASGI (uvicorn)'] = run_load(port)
+    server.should_exit = True
+    server_thread.join()
+    
+    print(f"{connections} savienojumi x {requests_per_connection} pieprasījumi, ārējā API aizture {latency * 1000:.0f} ms")
+    for mode, result in results.items():
+        print(f"{mode}: {result['requests_per_second']:.0f} piepr./s, p50 {result['p50'] * 1000:.0f} ms, "
+              f"p99 {result['p99'] * 1000:.0f} ms, kļūdas {result['errors']}, servera pavedieni līdz {result['threads']}")
+
+@app.route('/player/<int:player_id>/similar')
+def player_similar(player_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    similarity_index.refresh()
+    neighbours = similarity_index.similar(player_id, min(request.args.get('k', 10, type=int), 100))
+    if neighbours is None:
+        return jsonify({'error': "Spēlētājs nav atrasts"}), 404
+    
+    players_data = db.fetch_all(f"""
+        SELECT p.id, p.name, p.position, t.name
+        FROM players p
+        LEFT JOIN teams t ON p.team_id = t.id
+        WHERE p.id IN ({', '.join('?' * len(neighbours))})
+    """, [neighbour_id for neighbour_id, _ in neighbours]) if neighbours else []
+    players = {row[0]: row for row in players_data}
+    
+    similar = []
+    for neighbour_id, distance in neighbours:
+        if neighbour_id in players:
+            _, name, position, team_name = players[neighbour_id]
+            similar.append({'player_id': neighbour_id, 'name': name, 'position': position,
+                            'team': team_name, 'distance': round(distance, 4)})
+    return jsonify({'player_id': player_id, 'similar': similar})
+
+@app.cli.command('bench-similarity')
+@click.option('--players', type=int, default=1000000, help='Spēlētāju skaits indeksā')
+@click.option('--queries', type=int, default=200, help='Vaicājumu skaits')
+@click.option('--k', type=int, default=10, help='Kaimiņu skaits')
+def bench_similarity_command(players, queries, k):
+    # Indekss no sintētiskiem vektoriem (bez datubāzes), lai mērītu tikai meklēšanas ātrumu
+    rng = np.random.default_rng()
+    index = SimilarityIndex(db)
+    start = time.perf_counter()
+    state = index.load(list(range(1, players + 1)),
+                       rng.choice(['Setter', 'Outside Hitter', 'Middle Blocker', 'Libero', 'Opposite'], players).tolist(),
+                       rng.gamma(2.0, 2.0, (players, len(SimilarityIndex.numeric_fields))))
+    print(f"Indekss: {players} spēlētāji, {state.columns.shape[0]} pazīmes, "
+          f"{state.columns.nbytes / 1e6:.0f} MB, izveide {time.perf_counter() - start:.2f} s")
+    
+    latencies = []
+    for player_id in rng.integers(1, players + 1, queries).tolist():
+        start = time.perf_counter()
+        index.similar(player_id, k)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"Top-{k}: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+@app.route('/predict', methods=['POST'])
+def predict_fixtures():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Viens izsaukums visai kārtai: {"fixtures": [[team1_id, team2_id], ...]}
+    fixtures = (request.get_json(silent=True) or {}).get('fixtures')
+    try:
+        pairs = np.array([(int(team1_id), int(team2_id)) for team1_id, team2_id in fixtures], dtype=np.int64).reshape(-1, 2)
+    except (TypeError, ValueError):
+        return jsonify({'error': "Sagaidīts saraksts 'fixtures' ar komandu pāriem"}), 400
+    if len(pairs) > 100000:
+        return jsonify({'error': "Vienā pieprasījumā ne vairāk kā 100000 spēles"}), 400
+    
+    probabilities = outcome_model.predict(pairs[:, 0], pairs[:, 1])
+    if probabilities is None:
+        return jsonify({'error': "Prognozēšanas modelis nav atrasts (flask train-outcome-model)"}), 404
+    return jsonify({
+        'model_version': outcome_model.get_model()['version'],
+        'predictions': [{'team1_id': team1_id, 'team2_id': team2_id, 'team1_win_probability': round(probability, 4)}
+                        for (team1_id, team2_id), probability in zip(pairs.tolist(), probabilities.tolist())]
+    })
+
+@app.route('/predict/upcoming')
+def predict_upcoming():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Visas neizspēlētās spēles (pēc izvēles - vienā datumā) tiek novērtētas vienā izsaukumā
+    query = """
+        SELECT m.id, m.date, m.team1_id, t1.name, m.team2_id, t2.name
+        FROM matches m
+        JOIN teams t1 ON m.team1_id = t1.id
+        JOIN teams t2 ON m.team2_id = t2.id
+        WHERE m.score_team1 IS NULL OR m.score_team2 IS NULL
+    """
+    params = []
+    if request.args.get('date'):
+        query += " AND m.date = ?"
+        params.append(request.args['date'])
+    fixtures_data = db.fetch_all(query + " ORDER BY m.date, m.id", params)
+    
+    probabilities = outcome_model.predict([row[2] for row in fixtures_data], [row[4] for row in fixtures_data])
+    if probabilities is None:
+        return jsonify({'error': "Prognozēšanas modelis nav atrasts (flask train-outcome-model)"}), 404
+    return jsonify({
+        'model_version': outcome_model.get_model()['version'],
+        'predictions': [{'match_id': match_id, 'date': date, 'team1': team1_name, 'team2': team2_name,
+                         'team1_win_probability': round(probability, 4)}
+                        for (match_id, date, _, team1_name, _, team2_name), probability
+                        in zip(fixtures_data, probabilities.tolist())]
+    })
+
+@app.cli.command('train-outcome-model')
+def train_outcome_model_command():
+    try:
+        result = outcome_model.train()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Modelis v{result['version']} saglabāts: {result['path']} ({result['samples']} spēles)")
+    print(f"Validācija: log loss {result['validation']['log_loss']:.4f}, "
+          f"precizitāte {result['validation']['accuracy'] * 100:.1f}%")
+
+@app.cli.command('bench-predict')
+@click.option('--fixtures', type=int, default=100000, help='Spēļu skaits vienā izsaukumā')
+@click.option('--repeat', type=int, default=10, help='Atkārtojumu skaits')
+def bench_predict_command(fixtures, repeat):
+    if outcome_model.get_model() is None:
+        raise click.ClickException("Prognozēšanas modelis nav atrasts (flask train-outcome-model)")
+    team_ids = [row[0] for row in db.fetch_all("SELECT id FROM teams")]
+    if len(team_ids) < 2:
+        raise click.ClickException("Nepieciešamas vismaz divas komandas")
+    
+    rng = np.random.default_rng()
+    team1_ids = rng.choice(team_ids, fixtures)
+    team2_ids = rng.choice(team_ids, fixtures)
+    outcome_model.predict(team1_ids[:1], team2_ids[:1])  # Modeļa un komandu stāvokļa ielāde
+    
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outcome_model.predict(team1_ids, team2_ids)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{fixtures} spēles: labākais {best * 1000:.1f} ms, mediāna {sorted(timings)[len(timings) // 2] * 1000:.1f} ms, "
+          f"{fixtures / best / 1e6:.2f} milj. prognožu/s")
+
+@app.before_request
+def start_request_profile():
+    # Profilēšana pēc pieprasījuma: galvene X-Profile ar VOLLEYBALL_PROFILE_TOKEN vai admin ?profile=1
+    header = request.headers.get('X-Profile')
+    # compare_digest ar str atļauj tikai ASCII, tāpēc salīdzina baitus
+    token_ok = bool(header and request_profiler.token
+                    and hmac.compare_digest(header.encode(), request_profiler.token.encode()))
+    if token_ok or ((header or request.args.get('profile')) and is_admin()):
+        g.profile = request_profiler.start(f"{request.method} {request.endpoint or request.path}")
+
+@app.after_request
+def mark_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        g.profile_done = (profile, response.status_code)
+        response.headers['X-Profile-Id'] = profile['name']
+    return response
+
+@app.teardown_request
+def stop_request_profile(error):
+    # teardown izpildās arī pēc izņēmuma, tāpēc profilētājs vienmēr tiek atbrīvots
+    profile_done = g.pop('profile_done', None) or (g.pop('profile', None), 500)
+    if profile_done[0] is not None:
+        request_profiler.stop(*profile_done)
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    if not is_admin():
+        return "Nepieciešamas admin tiesības", 403
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Profili - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; vertical-align: top; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            pre { font-size: 12px; white-space: pre-wrap; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Pieprasījumu profili</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Ierobežojumi</h2>
+                <p>Profilēšana: admin lapai pievieno <code>?profile=1</code> vai sūta galveni <code>X-Profile</code>
+                   {% if limits.header_enabled %}ar VOLLEYBALL_PROFILE_TOKEN{% else %}(bez VOLLEYBALL_PROFILE_TOKEN - tikai admin){% endif %}.</p>
+                <p>Paraugu intervāls: {{ limits.sample_interval_ms }} ms, maks. {{ limits.max_samples }} paraugi,
+                   ne biežāk kā reizi {{ limits.min_interval_s }} s, glabā {{ limits.max_profiles }} profilus,
+                   izlaisti pieprasījumi: {{ limits.skipped }}</p>
+                
+                {% if top_functions %}
+                <h2>{{ selected }}</h2>
+                <pre>{{ top_functions }}</pre>
+                {% endif %}
+                
+                <h2>Saglabātie profili</h2>
+                <table>
+                    <tr>
+                        <th>Laiks</th>
+                        <th>Maršruts</th>
+                        <th>Statuss</th>
+                        <th>Ilgums (ms)</th>
+                        <th>Paraugi</th>
+                        <th>Faili</th>
+                    </tr>
+                    {% for profile in profiles %}
+                    <tr>
+                        <td><a href="?name={{ profile.name }}">{{ profile.started }}</a></td>
+                        <td>{{ profile.route }}</td>
+                        <td>{{ profile.status }}</td>
+                        <td>{{ profile.duration_ms }}</td>
+                        <td>{{ profile.samples }}{% if profile.truncated %} (apgriezts){% endif %}</td>
+                        <td>
+                            <a href="{{ url_for('admin_profile_file', name=profile.name, extension='prof') }}">.prof</a>
+                            <a href="{{ url_for('admin_profile_file', name=profile.name, extension='folded') }}">.folded</a>
+                        </td>
+                    </tr>
+                    {% else %}
+                    <tr><td colspan="6">Profili nav saglabāti</td></tr>
+                    {% endfor %}
+                </table>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    profiles = request_profiler.list_profiles()
+    for profile in profiles:
+        profile['started'] = datetime.fromtimestamp(profile['started_at']).strftime('%Y-%m-%d %H:%M:%S')
+    selected = request.args.get('name')
+    return render_template_string(html, profiles=profiles, limits=request_profiler.get_limits(), selected=selected,
+                                  top_functions=request_profiler.get_top_functions(selected) if selected else None)
+
+@app.route('/admin/profiles/<name>.<extension>')
+def admin_profile_file(name, extension):
+    if not is_admin():
+        return "Nepieciešamas admin tiesības", 403
+    
+    path = request_profiler.get_path(name, extension)
+    if path is None:
+        return "Profils nav atrasts", 404
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=f"{name}.{extension}")
+
+@app.cli.command('bench-streaming')
+@click.option('--rows', type=int, multiple=True, default=[10000, 100000], help='Rindu skaits tabulās (var norādīt vairākas)')
+def bench_streaming_command(rows):
+    # Mēra /players un /matches laiku līdz pirmajam baitam un maksimālo RSS pieaugumu pagaidu datubāzē.
+    # Katrs mērījums notiek atsevišķā procesā, jo ru_maxrss procesa dzīves laikā tikai pieaug
+    def measure(path, db_name, results):
+        db.close()
+        db.db_name = db_name
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        with open('/proc/self/statm') as f:
+            baseline = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024
+        
+        start = time.perf_counter()
+        response = client.get(path, buffered=False)
+        first_byte = first_row = None
+        size = 0
+        for chunk in response.response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            if first_row is None and b'<td>' in chunk:
+                first_row = time.perf_counter() - start
+            size += len(chunk)
+        total = time.perf_counter() - start
+        response.close()
+        results.put((first_byte, first_row, total, size,
+                     resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline))
+    
+    context = multiprocessing.get_context('fork')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bench_db = Database(os.path.join(temp_dir, 'bench.db'))
+        bench_db.initialize_db()
+        team_ids = [row[0] for row in bench_db.fetch_all("SELECT id FROM teams")]
+        
+        for row_count in sorted(rows):
+            # Papildina datubāzi līdz row_count spēlētājiem (katram viena statistikas rinda) un spēlēm
+            players_count = bench_db.fetch_one("SELECT COUNT(*) FROM players")[0]
+            matches_count = bench_db.fetch_one("SELECT COUNT(*) FROM matches")[0]
+            bench_db.execute_many("INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, ?, ?, ?)",
+                                  [(team_ids[i % len(team_ids)], team_ids[(i + 1) % len(team_ids)],
+                                    f"20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d}", random.randint(0, 3), random.randint(0, 3))
+                                   for i in range(matches_count, row_count)])
+            first_player_id = bench_db.fetch_one("SELECT COALESCE(MAX(id), 0) FROM players")[0] + 1
+            bench_db.execute_many("INSERT INTO players (name, number, position, team_id) VALUES (?, ?, ?, ?)",
+                                  [(f"Spēlētājs {i}", i % 99 + 1, 'Setter', team_ids[i % len(team_ids)])
+                                   for i in range(players_count, row_count)])
+            bench_db.execute_many("INSERT INTO player_stats (player_id, match_id, points, blocks, serves) VALUES (?, ?, ?, ?, ?)",
+                                  [(player_id, random.randint(1, row_count), random.randint(0, 25), random.randint(0, 5), random.randint(0, 5))
+                                   for player_id in range(first_player_id, first_player_id + row_count - players_count)])
+            
+            for path in ('/players', '/matches'):
+                results = context.Queue()
+                process = context.Process(target=measure, args=(path, bench_db.db_name, results))
+                process.start()
+                first_byte, first_row, total, size, peak = results.get()
+                process.join()
+                print(f"{path} ({row_count} rindas): TTFB {first_byte * 1000:.1f} ms, "
+                      f"pirmā rinda {first_row * 1000:.1f} ms, kopā {total:.2f} s, "
+                      f"{size / 1e6:.1f} MB HTML, RSS pieaugums {peak / 1024:.1f} MB")
+        bench_db.close()
+
+@app.route('/admin/fragment-cache')
+def admin_fragment_cache():
+    if not is_admin():
+        return "Nepieciešamas admin tiesības", 403
+    
+    if request.args.get('clear'):
+        fragment_cache.clear()
+    return jsonify(fragment_cache.get_metrics())
+
+@app.cli.command('bench-fragment-cache')
+@click.option('--players', type=int, default=2000, help='Spēlētāju skaits pagaidu datubāzē')
+@click.option('--requests', 'requests_count', type=int, default=200, help='Pieprasījumi katrai lapai')
+def bench_fragment_cache_command(players, requests_count):
+    # Mēra procesora laiku vienam pieprasījumam ar un bez fragmentu keša pagaidu datubāzē
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bench_db = Database(os.path.join(temp_dir, 'bench.db'))
+        bench_db.initialize_db()
+        team_ids = [row[0] for row in bench_db.fetch_all("SELECT id FROM teams")]
+        match_ids = [row[0] for row in bench_db.fetch_all("SELECT id FROM matches")]
+        first_player_id = bench_db.fetch_one("SELECT COALESCE(MAX(id), 0) FROM players")[0] + 1
+        bench_db.execute_many("INSERT INTO players (name, number, position, team_id) VALUES (?, ?, ?, ?)",
+                              [(f"Spēlētājs {i}", i % 99 + 1, 'Setter', team_ids[i % len(team_ids)]) for i in range(players)])
+        bench_db.execute_many("INSERT INTO player_stats (player_id, match_id, points, blocks, serves) VALUES (?, ?, ?, ?, ?)",
+                              [(player_id, random.choice(match_ids), random.randint(0, 25), random.randint(0, 5), random.randint(0, 5))
+                               for player_id in range(first_player_id, first_player_id + players)])
+        bench_db.close()
+        
+        db.close()
+        db.db_name = bench_db.db_name
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        
+        def cpu_per_request(path):
+            client.get(path).get_data()
+            start = time.process_time()
+            for _ in range(requests_count):
+                client.get(path).get_data()
+            return (time.process_time() - start) / requests_count
+        
+        for path in ('/teams', '/players', f'/team/{team_ids[0]}'):
+            fragment_cache.enabled = False
+            uncached = cpu_per_request(path)
+            fragment_cache.enabled = True
+            cached = cpu_per_request(path)
+            print(f"{path}: bez keša {uncached * 1000:.2f} ms CPU, ar kešu {cached * 1000:.2f} ms CPU "
+                  f"({uncached / cached:.1f}x)")
+        print(f"Kešs: {fragment_cache.get_metrics()}")
+        db.close()
+
+@app.cli.command('refresh-sketches')
+def refresh_sketches_command():
+    # Pārbūvē mainīto sezonu skices ārpus pieprasījumiem (piemēram, pēc lielas datu ielādes)
+    start = time.perf_counter()
+    seasons = quantile_sketches.refresh()
+    print(f"Pārbūvētas {seasons} sezonu skices {time.perf_counter() - start:.2f} s")
+
+@app.cli.command('check-sketches')
+@click.option('--values', 'values_count', type=int, default=1000000, help='Sintētisko vērtību skaits')
+@click.option('--partitions', type=int, default=4, help='Partīciju skaits, kuru skices tiek apvienotas')
+@click.option('--max-error', type=float, default=0.02, help='Pieļaujamā ranga kļūda (daļa no elementu skaita)')
+def check_sketches_command(values_count, partitions, max_error):
+    # Salīdzina skiču rangus ar precīzajiem: sintētiskai plūsmai, kas sadalīta partīcijās, un īstajiem datiem
+    def rank_error(sketch_values, cumulative, exact_sorted, probes):
+        sketch_ranks = np.searchsorted(sketch_values, probes, side='right')
+        sketch_ranks = np.where(sketch_ranks > 0, cumulative[np.maximum(sketch_ranks - 1, 0)], 0) / cumulative[-1]
+        exact_ranks = np.searchsorted(exact_sorted, probes, side='right') / len(exact_sorted)
+        return float(np.abs(sketch_ranks - exact_ranks).max())
+    
+    rng = np.random.default_rng()
+    values = rng.gamma(2.0, 3.0, values_count)
+    start = time.perf_counter()
+    merged = KLLSketch(quantile_sketches.k)
+    for part in np.array_split(values, partitions):
+        sketch = KLLSketch(quantile_sketches.k)
+        sketch.update(part.tolist())
+        merged.merge(KLLSketch.from_json(sketch.to_json(), sketch.count, quantile_sketches.k))
+    elapsed = time.perf_counter() - start
+    exact_sorted = np.sort(values)
+    errors = {'sintētiskie': rank_error(*merged.cdf(), exact_sorted, np.quantile(values, np.linspace(0.01, 0.99, 99)))}
+    print(f"Sintētiskie: {values_count} vērtības, {partitions} partīcijas, skicē {sum(len(items) for items in merged.levels)} "
+          f"elementi, {elapsed:.2f} s, maks. ranga kļūda {errors['sintētiskie']:.4f}")
+    
+    # Īstie dati: precīzās procentiles pār spēlētājiem - katra spēlētāja vidējais spēlē katrā sezonā
+    quantile_sketches.refresh()
+    stats_data = db.fetch_all(f"""
+        SELECT p.position, AVG(COALESCE(ps.points, 0)), AVG(COALESCE(ps.blocks, 0)), AVG(COALESCE(ps.serves, 0))
+        FROM {db.career_table('player_stats')} ps
+        JOIN {db.career_table('matches')} m ON ps.match_id = m.id
+        JOIN players p ON ps.player_id = p.id
+        WHERE p.position IS NOT NULL
+        GROUP BY ps.player_id, substr(m.date, 1, 4)
+    """)
+    by_position = {}
+    for position, *stat_values in stats_data:
+        by_position.setdefault(position, []).append(stat_values)
+    for position, rows in sorted(by_position.items()):
+        columns = np.array(rows, dtype=np.float64)
+        for index, stat in enumerate(QuantileSketches.fields):
+            exact_sorted = np.sort(columns[:, index])
+            errors[f"{position}/{stat}"] = error = rank_error(*quantile_sketches.get_cdf(position, stat), exact_sorted,
+                                                              np.unique(exact_sorted))
+            print(f"{position} {stat}: {len(exact_sorted)} spēlētāju sezonas, maks. ranga kļūda {error:.4f}")
+    
+    worst = max(errors, key=errors.get)
+    if errors[worst] > max_error:
+        raise click.ClickException(f"Ranga kļūda {errors[worst]:.4f} ({worst}) pārsniedz {max_error}")
+    print(f"Visas ranga kļūdas nepārsniedz {max_error}")
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # {"queries": [{"type": "team", "id": 1, "include": ["players", "matches", "charts"]}, ...]}
+    # Novērtē jaunās spēles, lai komandu reitingi nebūtu novecojuši
+    elo.sync()
+    loader = BatchLoader(db)
+    try:
+        results = loader.resolve((request.get_json(silent=True) or {}).get('queries') or [])
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'results': results, 'statements': loader.statements, 'layers': loader.layers})
+
+@app.cli.command('check-batch')
+@click.option('--team-id', type=int, default=1, help='Komanda, kuras panelis tiek ielādēts')
+@click.option('--max-statements', type=int, default=20, help='Pieļaujamais SQL vaicājumu skaits paketei')
+def check_batch_command(team_id, max_statements):
+    # Komandas panelis: komanda ar sastāvu, spēlēm un līknēm, katrs spēlētājs un katra pēdējā spēle
+    team = BatchLoader(db).resolve([{'type': 'team', 'id': team_id, 'include': ['players', 'matches']}])[0]
+    if team is None:
+        raise click.ClickException("Komanda nav atrasta")
+    queries = [{'type': 'team', 'id': team_id, 'include': ['players', 'matches', 'charts']}]
+    queries.extend({'type': 'player', 'id': player['id'], 'include': ['charts']} for player in team['players'])
+    queries.extend({'type': 'match', 'id': match['id'], 'include': ['stats']} for match in team['matches'])
+    
+    def count_statements(run):
+        # Skaita visus SQL vaicājumus, ko izpilda šī pavediena savienojums
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        try:
+            run()
+        finally:
+            db.conn.set_trace_callback(None)
+        return len(statements)
+    
+    loader = BatchLoader(db)
+    batched = count_statements(lambda: loader.resolve(queries))
+    separate = count_statements(lambda: [BatchLoader(db).resolve([query]) for query in queries])
+    print(f"{len(queries)} vaicājumi: paketē {batched} SQL vaicājumi ({loader.statements} IN vaicājumi "
+          f"{loader.layers} slāņos), atsevišķi {separate} SQL vaicājumi")
+    if batched > max_statements:
+        raise click.ClickException(f"Pakete izpildīja {batched} SQL vaicājumus (atļauts {max_statements})")
+
+@app.route('/standings')
+def standings_page():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    # Tabula "uz datumu": pēc noklusējuma šodien
+    date = request.args.get('date') or datetime.now().strftime('%Y-%m-%d')
+    # strptime pieņem arī 2026-2-1; vaicājums salīdzina virknes, tāpēc datums tiek normalizēts
+    try:
+        date = datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return "Nederīgs datums, sagaidīts formāts GGGG-MM-DD", 400
+    
+    table = standings.get_table(date)
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Turnīra tabula - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Turnīra tabula {{ date }}</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <form method="get">
+                    <label for="date">Datums:</label>
+                    <input type="date" id="date" name="date" value="{{ date }}">
+                    <button type="submit">Rādīt</button>
+                </form>
+                <h2>{{ season }}. gada sezona</h2>
+                <table>
+                    <tr>
+                        <th>Vieta</th>
+                        <th>Komanda</th>
+                        <th>Spēles</th>
+                        <th>Uzvaras</th>
+                        <th>Zaudējumi</th>
+                        <th>Neizšķirti</th>
+                        <th>Seti</th>
+                    </tr>
+                    {% for row in table %}
+                    <tr>
+                        <td>{{ row.position }}</td>
+                        <td><a href="/team/{{ row.team_id }}">{{ row.name }}</a></td>
+                        <td>{{ row.played }}</td>
+                        <td>{{ row.wins }}</td>
+                        <td>{{ row.losses }}</td>
+                        <td>{{ row.draws }}</td>
+                        <td>{{ row.sets_for }}:{{ row.sets_against }}</td>
+                    </tr>
+                    {% endfor %}
+                </table>
+                <h2>Vietas sezonas gaitā</h2>
+                <img src="/standings/chart?season={{ season }}" alt="Turnīra tabulas vietu grafiks" width="100%">
+                <p><a href="/api/standings/series?season={{ season }}">Dati JSON formātā</a></p>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    return render_template_string(html, date=date, season=date[:4], table=table)
+
+@app.route('/standings/chart')
+def standings_chart():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    series = standings.get_series(request.args.get('season') or datetime.now().strftime('%Y'))
+    return send_file(BytesIO(render_standings_png(series)), mimetype='image/png')
+
+@app.route('/api/standings/series')
+def standings_series():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    return jsonify(standings.get_series(request.args.get('season') or datetime.now().strftime('%Y')))
+
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        
+        user_data = db.fetch_one("SELECT password_hash FROM users WHERE username = ?", (username,))
+        
+        if user_data and User.hash_password(password) == user_data[0]:
+            session['username'] = username
+            return redirect(url_for('home'))
+        else:
+            error_message = "Nepareizs lietotājvārds vai parole"
+            return render_template_string(LOGIN_HTML, error=error_message)
+    
+    return render_template_string(LOGIN_HTML)
+
+@app.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        
+        if password != confirm_password:
+            error_message = "Paroles nesakrīt"
+            return render_template_string(REGISTER_HTML, error=error_message)
+        
+        # Pārbauda, vai lietotājvārds jau eksistē
+        user_exists = db.fetch_one("SELECT COUNT(*) FROM users WHERE username = ?", (username,))
+        if user_exists[0] > 0:
+            error_message = "Lietotājvārds jau eksistē"
+            return render_template_string(REGISTER_HTML, error=error_message)
+        
+        # Reģistrē jaunu lietotāju
+        password_hash = User.hash_password(password)
+        db.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
+        
+        session['username'] = username
+        return redirect(url_for('home'))
+    
+    return render_template_string(REGISTER_HTML)
+
+@app.route('/logout')
+def logout():
+    session.pop('username', None)
+    return redirect(url_for('login'))
+
+@app.route('/teams')
+def teams():
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    admin = is_admin()
+    fragment_key = ('teams', 'admin' if admin else 'user')
+    fragment_version = fragment_cache.get_version()
+    cached_html = fragment_cache.get(fragment_key, fragment_version)
+    if cached_html is not None:
+        return cached_html
+    
+    # Novērtē jaunās spēles pirms reitingu attēlošanas
+    elo.sync()
+    
+    teams_data = db.fetch_all("SELECT id, name, city, coach FROM teams")
+    teams_list = []
+    
+    # Spēlētāju skaits un karjeras uzvaras/zaudējumi no koplietotā momentuzņēmuma
+    standings = {record['team_id']: record for record in aggregate_snapshot.get_standings(aggregate_snapshot.current())}
+    
+    for team_data in teams_data:
+        team_id, name, city, coach = team_data
+        record = standings.get(team_id, {'player_count': 0, 'wins': 0, 'losses': 0})
+        
+        teams_list.append({
+            'id': team_id,
+            'name': name,
+            'city': city,
+            'coach': coach,
+            'player_count': record['player_count'],
+            'wins': record['wins'],
+            'losses': record['losses']
+        })
+    
+    ratings = elo.get_ratings()
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Komandas - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Volejbola Komandas</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <h2>Komandu saraksts</h2>
+                {% if is_admin %}
+                <p><a href="/team/add" class="btn">Pievienot jaunu komandu</a></p>
+                {% endif %}
+                <table>
+                    <tr>
+                        <th>Nosaukums</th>
+                        <th>Pilsēta</th>
+                        <th>Treneris</th>
+                        <th>Spēlētāju skaits</th>
+                        <th>Uzvaras</th>
+                        <th>Zaudējumi</th>
+                        <th>Darbības</th>
+                    </tr>
+                    {% for team in teams %}
+                    <tr>
+                        <td>{{ team.name }}</td>
+                        <td>{{ team.city }}</td>
+                        <td>{{ team.coach }}</td>
+                        <td>{{ team.player_count }}</td>
+                        <td>{{ team.wins }}</td>
+                        <td>{{ team.losses }}</td>
+                        <td>
+                            <a href="/team/{{ team.id }}" class="btn">Detaļas</a>
+                            {% if is_admin %}
+                            <a href="/team/edit/{{ team.id }}" class="btn">Rediģēt</a>
+                            {% endif %}
+                        </td>
+                    </tr>
+                    {% endfor %}
+                </table>
+                
+                <h2>Reitingi (Elo)</h2>
+                <table>
+                    <tr>
+                        <th>Vieta</th>
+                        <th>Komanda</th>
+                        <th>Reitings</th>
+                        <th>Novērtētās spēles</th>
+                    </tr>
+                    {% for rating in ratings %}
+                    <tr>
+                        <td>{{ rating.position }}</td>
+                        <td><a href="/team/{{ rating.team_id }}">{{ rating.name }}</a></td>
+                        <td>{{ rating.rating }}</td>
+                        <td>{{ rating.matches }}</td>
+                    </tr>
+                    {% endfor %}
+                </table>
+                <p>
+                    <a href="/h2h" class="btn">Savstarpējo spēļu matrica</a>
+                    <a href="/simulation" class="btn">Sezonas prognoze</a>
+                    <a href="/standings" class="btn">Turnīra tabula</a>
+                </p>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    page = render_template_string(html, teams=teams_list, ratings=ratings, is_admin=admin)
+    fragment_cache.put(fragment_key, fragment_version, page)
+    return page
+
+@app.route('/team/<int:team_id>')
+def team_details(team_id):
+    if not is_authenticated():
+        return redirect(url_for('login'))
+    
+    admin = is_admin()
+    fragment_key = ('team', team_id, 'admin' if admin else 'user')
+    fragment_version = fragment_cache.get_version()
+    cached_html = fragment_cache.get(fragment_key, fragment_version)
+    if cached_html is not None:
+        return cached_html
+    
+    team_data = db.fetch_one("SELECT id, name, city, coach FROM teams WHERE id = ?", (team_id,))
+    if not team_data:
+        return "Komanda nav atrasta", 404
+    
+    team_id, name, city, coach = team_data
+    
+    # Novērtē jaunās spēles pirms reitinga attēlošanas
+    elo.sync()
+    
+    # Iegūst komandas spēlētājus; karjeras kopsummas - no koplietotā momentuzņēmuma
+    players_data = db.fetch_all("SELECT id, name, number, position FROM players WHERE team_id = ?", (team_id,))
+    snapshot = aggregate_snapshot.current()
+    
+    recent_points = chart_cache.get_recent_points(team_id)
+    
+    players = []
+    for player_data in players_data:
+        player_id, player_name, number, position = player_data
+        totals = aggregate_snapshot.get_player(player_id, snapshot) or {'points': 0, 'blocks': 0, 'serves': 0, 'games': 0}
+        points, blocks, serves, games = totals['points'], totals['blocks'], totals['serves'], totals['games']
+        
+        # Aprēķina vidējos rādītājus
+        avg_points = round(points / games if games > 0 else 0, 2)
+        avg_blocks = round(blocks / games if games > 0 else 0, 2)
+        avg_serves = round(serves / games if games > 0 else 0, 2)
+        
+        players.append({
+            'id': player_id,
+            'name': player_name,
+            'number': number,
+            'position': position,
+            'total_points': points or 0,
+            'total_blocks': blocks or 0,
+            'total_serves': serves or 0,
+            'games': games or 0,
+            'avg_points': avg_points,
+            'avg_blocks': avg_blocks,
+            'avg_serves': avg_serves,
+            'sparkline': sparkline_svg(recent_points.get(player_id, []))
+        })
+    
+    # Iegūst komandas spēļu informāciju (visas sezonas)
+    matches_data = db.fetch_all(f"""
+        SELECT m.id, t1.name as team1_name, t2.name as team2_name, 
+            m.date, m.score_team1, m.score_team2
+        FROM {db.career_table('matches')} m
+        JOIN teams t1 ON m.team1_id = t1.id
+        JOIN teams t2 ON m.team2_id = t2.id
+        WHERE m.team1_id = ? OR m.team2_id = ?
+        ORDER BY m.id
+    """, (team_id, team_id))
+    
+    matches = []
+    for match_data in matches_data:
+        match_id, team1_name, team2_name, date, score_team1, score_team2 = match_data
+        
+        # Nosaka, vai komanda uzvarēja
+        if score_team1 is None or score_team2 is None:
+            result = "Nav izspēlēta"
+        elif (team1_name == name and score_team1 > score_team2) or (team2_name == name and score_team2 > score_team1):
+            result = "Uzvara"
+        elif score_team1 == score_team2:
+            result = "Neizšķirts"
+        else:
+            result = "Zaudējums"
+        
+        matches.append({
+            'id': match_id,
+            'team1_name': team1_name,
+            'team2_name': team2_name,
+            'date': date,
+            'score': f"{score_team1} - {score_team2}",
+            'result': result
+        })
+    
+    # Komandas reitings un tā izmaiņas pēdējās spēlēs
+    rating = round(elo.get_rating(team_id))
+    rating_history = elo.get_team_history(team_id)
+    
+    html = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>{{ team_name }} - Volejbola Statistikas App</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f4f4f4; }
+            .container { width: 80%; margin: auto; padding: 20px; }
+            .header { background-color: #333; color: white; padding: 20px; text-align: center; }
+            .menu { background-color: #444; padding: 10px; margin-bottom: 20px; }
+            .menu a { color: white; padding: 10px; text-decoration: none; margin-right: 10px; }
+            .menu a:hover { background-color: #555; }
+            .content { background-color: white; padding: 20px; border-radius: 5px; }
+            .footer { text-align: center; padding: 10px; background-color: #333; color: white; margin-top: 20px; }
+            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
+            table, th, td { border: 1px solid #ddd; }
+            th, td { padding: 12px; text-align: left; }
+            th { background-color: #444; color: white; }
+            tr:nth-child(even) { background-color: #f2f2f2; }
+            .btn { padding: 8px 16px; background-color: #4CAF50; color: white; border: none; cursor: pointer; text-decoration: none; }
+            .btn:hover { background-color: #45a049; }
+            .section { margin-bottom: 30px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>{{ team_name }}</h1>
+        </div>
+        <div class="menu">
+            <a href="/">Sākums</a>
+            <a href="/teams">Komandas</a>
+            <a href="/players">Spēlētāji</a>
+            <a href="/matches">Spēles</a>
+            <a href="/api-data">API Dati</a>
+            <a href="/logout" style="float: right;">Iziet</a>
+        </div>
+        <div class="container">
+            <div class="content">
+                <div class="section">
+                    <h2>Komandas informācija</h2>
+                    <p><strong>Nosaukums:</strong> {{ team_name }}</p>
+                    <p><strong>Pilsēta:</strong> {{ team_city }}</p>
+                    <p><strong>Treneris:</strong> {{ team_coach }}</p>
+                    <p><strong>Reitings (Elo):</strong> {{ rating }}</p>
+                </div>
+                
+                <div class="section">
+                    <h2>Spēlētāji</h2>
+                    {% if is_admin %}
+                    <p><a href="/player/add/{{ team_id }}" class="btn">Pievienot jaunu spēlētāju</a></p>
+                    {% endif %}
+                    <table>
+                        <tr>
+                            <th>Nr.</th>
+                            <th>Vārds</th>
+                            <th>Pozīcija</th>
+                            <th>Spēles</th>
+                            <th>Punkti (vid.)</th>
+                            <th>Bloki (vid.)</th>
+                            <th>Serves (vid.)</th>
+                            <th>Forma</th>
+                            <th>Darbības</th>
+                        </tr>
+                        {% for player in players %}
+                        <tr>
+                            <td>{{ player.number }}</td>
+                            <td>{{ player.name }}</td>
+                            <td>{{ player.position }}</td>
+                            <td>{{ player.games }}</td>
+                            <td>{{ player.total_points }} ({{ player.avg_points }})</td>
+                            <td>{{ player.total_blocks }} ({{ player.avg_blocks }})</td>
+                            <td>{{ player.total_serves }} ({{ player.avg_serves }})</td>
+                            <td>{{ player.sparkline|safe }}</td>
+                            <td>
+                                <a href="/player/{{ player.id }}" class="btn">Detaļas</a>
+                                {% if is_admin %}
+                                <a href="/player/edit/{{ player.id }}" class="btn">Rediģēt</a>
+                                {% endif %}
+                            </td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+                
+                <div class="section">
+                    <h2>Spēles</h2>
+                    <table>
+                        <tr>
+                            <th>Datums</th>
+                            <th>Mājinieki</th>
+                            <th>Viesi</th>
+                            <th>Rezultāts</th>
+                            <th>Iznākums</th>
+                            <th>Darbības</th>
+                        </tr>
+                        {% for match in matches %}
+                        <tr>
+                            <td>{{ match.date }}</td>
+                            <td>{{ match.team1_name }}</td>
+                            <td>{{ match.team2_name }}</td>
+                            <td>{{ match.score }}</td>
+                            <td>{{ match.result }}</td>
+                            <td>
+                                <a href="/match/{{ match.id }}" class="btn">Detaļas</a>
+                            </td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+                
+                <div class="section">
+                    <h2>Reitinga izmaiņas</h2>
+                    <table>
+                        <tr>
+                            <th>Datums</th>
+                            <th>Pretinieks</th>
+                            <th>Rezultāts</th>
+                            <th>Reitings pirms</th>
+                            <th>Reitings pēc</th>
+                            <th>Izmaiņa</th>
+                        </tr>
+                        {% for entry in rating_history %}
+                        <tr>
+                            <td>{{ entry.date }}</td>
+                            <td>{{ entry.opponent }}</td>
+                            <td>{{ entry.score }}</td>
+                            <td>{{ entry.before }}</td>
+                            <td>{{ entry.after }}</td>
+                            <td>{{ entry.change }}</td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                </div>
+            </div>
+        </div>
+        <div class="footer">
+            &copy; 2023 Volejbola Statistikas Lietotne
+        </div>
+    </body>
+    </html>
+    '''
+    page = render_template_string(html, 
+                                team_id=team_id,
+                                team_name=name,
+                                team_city=city,
+                                team_coach=coach,
+                                rating=rating,
+                                players=players,
+                                matches=matches,
+                                rating_history=rating_history,
+                                is_admin=admin)
+    fragment_cache.put(fragment_key, fragment_version, page)
+    return page
+
+@app.cli.command('recompute-ratings')
+def recompute_ratings_command():
+    # Pārrēķina visus reitingus no spēļu vēstures (piemēram, pēc rezultātu labošanas)
+    start = time.perf_counter()
+    count = elo.recompute()
+    elapsed = time.perf_counter() - start
+    print(f"Novērtētas {count} spēles {elapsed:.2f} s")
@@ -0,0 +1,32 @@
+# Sezonas simulācijas aprēķini, ko izpilda procesu pūla darbinieki. Atsevišķs modulis bez blakusefektiem:
+# 'spawn' darbinieks importē tikai šo failu, nevis projekts.py ar datubāzes inicializāciju un lietotni
+import numpy as np
+
+
+# Viena simulāciju porcija
+def simulate_season_chunk(job):
+    base_wins, tiebreak, home, away, win_probability, simulations, seed = job
+    rng = np.random.default_rng(seed)
+    team_count = len(base_wins)
+    counts = np.zeros(team_count * team_count, dtype=np.int64)
+    positions = np.arange(team_count)
+    
+    # Spēle x komanda matricas: uzvaru skaits visās simulācijās ir viena matricu reizināšana
+    home_teams = np.zeros((len(home), team_count), dtype=np.float32)
+    home_teams[np.arange(len(home)), home] = 1
+    away_teams = np.zeros((len(away), team_count), dtype=np.float32)
+    away_teams[np.arange(len(away)), away] = 1
+    
+    # Apakšporcijas ierobežo atmiņu: simulācijas x atlikušās spēles
+    batch_size = max(1, 2000000 // max(1, len(home)))
+    for start in range(0, simulations, batch_size):
+        size = min(batch_size, simulations - start)
+        home_won = (rng.random((size, len(home))) < win_probability).astype(np.float32)
+        wins = base_wins + home_won @ home_teams + (1 - home_won) @ away_teams
+        
+        # Vienādu uzvaru gadījumā izšķir pašreizējā setu starpība, pēc tam nejaušība
+        key = wins * 1000000.0 + tiebreak + rng.random((size, team_count))
+        order = np.argsort(-key, axis=1)
+        counts += np.bincount((order * team_count + positions).ravel(), minlength=team_count * team_count)
+    
+    return counts.reshape(team_count, team_count)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# Lietotne izveido volleyball.db un pārējos failus darba direktorijā,
+# tāpēc testi to importē pagaidu direktorijā
+@pytest.fixture(scope='session')
+def projekts(tmp_path_factory):
+    os.chdir(tmp_path_factory.mktemp('app'))
+    import projekts
+    return projekts
+
+
+@pytest.fixture
+def client(projekts):
+    client = projekts.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['username'] = 'admin'
+    return client
+
+
+@pytest.fixture
+def league(projekts, tmp_path):
+    # Atsevišķa datubāze ar pagājušās sezonas spēlēm, lai arhivēšana neietekmētu pārējos testus
+    db = projekts.Database(str(tmp_path / 'league.db'))
+    db.initialize_db()
+    db.execute("UPDATE matches SET date = '2025' || substr(date, 5)")
+    yield db, projekts.SeasonPartitions(db, str(tmp_path / 'seasons'))
+    db.close()
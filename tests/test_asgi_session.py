@@ -0,0 +1,17 @@
+def scope_with_cookie(projekts, cookie):
+    name = projekts.app.config['SESSION_COOKIE_NAME']
+    return {'type': 'http', 'headers': [(b'cookie', f'{name}={cookie}'.encode('latin-1'))]}
+
+
+def test_valid_session_cookie(projekts):
+    serializer = projekts.app.session_interface.get_signing_serializer(projekts.app)
+    cookie = serializer.dumps({'username': 'admin'})
+    assert projekts.asgi_app.get_session(scope_with_cookie(projekts, cookie)) == {'username': 'admin'}
+
+
+def test_invalid_session_cookies_are_ignored(projekts):
+    serializer = projekts.app.session_interface.get_signing_serializer(projekts.app)
+    cookie = serializer.dumps({'username': 'admin'})
+    for broken in ('nav-paraksta', cookie[:-2] + 'xx', '.' + cookie, 'e30.ZZZ.abc'):
+        assert projekts.asgi_app.get_session(scope_with_cookie(projekts, broken)) == {}
+    assert projekts.asgi_app.get_session({'type': 'http', 'headers': []}) == {}
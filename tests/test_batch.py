@@ -0,0 +1,95 @@
+import pytest
+
+
+def batch(client, *queries):
+    return client.post('/api/batch', json={'queries': list(queries)})
+
+
+@pytest.mark.parametrize('query', [
+    {'type': 'team', 'id': 10 ** 30},
+    {'type': 'team', 'id': -10 ** 30},
+    {'type': 'team', 'id': 1, 'include': 'players'},
+    {'type': 'team', 'id': 1, 'include': {'players': True}},
+    {'type': 'team', 'id': 1, 'include': [1, 2]},
+    {'type': 'team', 'id': 'x'},
+    {'type': 'stadium', 'id': 1},
+    {'type': 'team'},
+    'team',
+])
+def test_invalid_queries(client, query):
+    response = batch(client, query)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_rating_is_synced(projekts, client):
+    team1_id, team2_id = [row[0] for row in projekts.db.fetch_all("SELECT id FROM teams ORDER BY id LIMIT 2")]
+    match_id = projekts.db.execute("""
+        INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, '2026-07-01', 3, 0)
+    """, (team1_id, team2_id)).lastrowid
+    try:
+        team = batch(client, {'type': 'team', 'id': team1_id}).get_json()['results'][0]
+        assert projekts.db.fetch_one("SELECT 1 FROM rating_history WHERE match_id = ?", (match_id,))
+        assert team['rating'] == round(projekts.elo.get_rating(team1_id), 1)
+    finally:
+        projekts.db.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+        projekts.elo.recompute()
+
+
+# Komandas panelis vienā paketē (tas pats scenārijs, ko `flask check-batch` mēra uz īstajiem datiem)
+
+def test_team_dashboard_statements(projekts, client):
+    team_id = projekts.db.fetch_one("SELECT id FROM teams ORDER BY id LIMIT 1")[0]
+    team = batch(client, {'type': 'team', 'id': team_id, 'include': ['players', 'matches']}).get_json()['results'][0]
+    assert team['players'] and team['matches']
+    
+    queries = [{'type': 'team', 'id': team_id, 'include': ['players', 'matches', 'charts']}]
+    queries.extend({'type': 'player', 'id': player['id'], 'include': ['charts']} for player in team['players'])
+    queries.extend({'type': 'match', 'id': match['id'], 'include': ['stats']} for match in team['matches'])
+    data = batch(client, *queries).get_json()
+    
+    assert len(data['results']) == len(queries)
+    assert all(result is not None for result in data['results'])
+    # Vaicājumu skaits atkarīgs no slāņiem, nevis no spēlētāju un spēļu skaita. Pirmajā slānī
+    # septiņi ielādētāji, otrajā viens vaicājums pret players (sastāvs un statistikas spēlētāji),
+    # viens pret spēlēm un viens pret komandām; trešajā viss jau kešā
+    assert data['statements'] == 10
+    assert data['layers'] <= 4
+    assert data['results'][0]['players'][0]['recent_points'] is not None
+
+
+def test_shared_table_loaders_use_one_statement(projekts):
+    team_id, player_id = projekts.db.fetch_one("SELECT team_id, id FROM players WHERE team_id IS NOT NULL ORDER BY id DESC LIMIT 1")
+    other_team = projekts.db.fetch_one("SELECT id FROM teams WHERE id != ? ORDER BY id LIMIT 1", (team_id,))[0]
+    match_id = projekts.db.fetch_one("SELECT id FROM matches WHERE ? NOT IN (team1_id, team2_id) LIMIT 1", (other_team,))
+    loader = projekts.BatchLoader(projekts.db)
+    
+    def resolver():
+        loaded = yield [('player', player_id), ('roster', other_team), ('match', match_id[0] if match_id else 0),
+                        ('team_matches', other_team)]
+        return loaded
+    
+    player, roster, match, matches = loader.execute([resolver()])[0]
+    assert loader.statements == 2
+    assert player['id'] == player_id
+    assert [row['id'] for row in roster] == [row[0] for row in projekts.db.fetch_all(
+        "SELECT id FROM players WHERE team_id = ? ORDER BY id", (other_team,))]
+    assert (match is None) == (match_id is None)
+    assert matches and all(other_team in (row['team1_id'], row['team2_id']) for row in matches)
+    assert [row['id'] for row in matches] == [row[0] for row in projekts.db.fetch_all("""
+        SELECT id FROM matches WHERE ? IN (team1_id, team2_id) ORDER BY date DESC, id DESC LIMIT ?
+    """, (other_team, loader.recent_matches))]
+
+
+def test_roster_and_team_matches_prime_caches(projekts):
+    team_id = projekts.db.fetch_one("SELECT id FROM teams ORDER BY id LIMIT 1")[0]
+    loader = projekts.BatchLoader(projekts.db)
+    team = loader.resolve([{'type': 'team', 'id': team_id, 'include': ['players', 'matches']}])[0]
+    statements = loader.statements
+    
+    # Sastāva spēlētāji un komandas spēles jau ir kešā - atsevišķi vaicājumi tiem nav vajadzīgi
+    queries = [{'type': 'player', 'id': player['id']} for player in team['players']]
+    queries.extend({'type': 'match', 'id': match['id']} for match in team['matches'])
+    results = loader.resolve(queries)
+    assert loader.statements == statements
+    assert [result['id'] for result in results] == [query['id'] for query in queries]
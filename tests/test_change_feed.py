@@ -0,0 +1,40 @@
+import time
+
+
+def test_zero_limit_returns_one_change(projekts, client):
+    projekts.db.execute("UPDATE teams SET coach = coach WHERE id = (SELECT MIN(id) FROM teams)")
+    response = client.get('/changes?limit=0')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['changes']) == 1
+    assert data['cursor'] == data['changes'][0]['seq']
+    
+    changes, _ = projekts.change_feed.poll(0, limit=-3)
+    assert len(changes) == 1
+
+
+def test_prune_without_consumers_uses_retention(projekts, monkeypatch):
+    feed = projekts.change_feed
+    projekts.db.execute("DELETE FROM change_cursors")
+    projekts.db.execute("UPDATE teams SET coach = coach WHERE id = (SELECT MIN(id) FROM teams)")
+    old_seq = feed.latest()
+    projekts.db.execute("UPDATE changes SET changed_at = ? WHERE seq = ?", (time.time() - feed.retention - 60, old_seq))
+    projekts.db.execute("UPDATE teams SET coach = coach WHERE id = (SELECT MIN(id) FROM teams)")
+    recent_seq = feed.latest()
+    
+    assert feed.prune() >= 1
+    remaining = {row[0] for row in projekts.db.fetch_all("SELECT seq FROM changes")}
+    assert old_seq not in remaining
+    assert recent_seq in remaining
+
+
+def test_prune_keeps_unconsumed_changes(projekts):
+    feed = projekts.change_feed
+    projekts.db.execute("UPDATE teams SET coach = coach WHERE id = (SELECT MIN(id) FROM teams)")
+    feed.commit_cursor('tests', feed.latest())
+    projekts.db.execute("UPDATE teams SET coach = coach WHERE id = (SELECT MIN(id) FROM teams)")
+    pending = feed.latest()
+    
+    feed.prune()
+    assert projekts.db.fetch_one("SELECT seq FROM changes WHERE seq > ?", (pending - 1,))[0] == pending
+    projekts.db.execute("DELETE FROM change_cursors WHERE consumer = 'tests'")
@@ -0,0 +1,55 @@
+import pytest
+
+
+# Statistikas izmaiņa zīmēšanas laikā nedrīkst tikt pazaudēta: uzzīmētais grafiks paliek novecojis
+
+@pytest.fixture
+def cache(projekts, tmp_path):
+    return projekts.ChartCache(projekts.db, cache_dir=str(tmp_path / 'charts'))
+
+
+def add_stat(projekts, player_id):
+    team_id, match_id = projekts.db.fetch_one("""
+        SELECT p.team_id, m.id FROM players p JOIN matches m ON p.team_id IN (m.team1_id, m.team2_id)
+        WHERE p.id = ? LIMIT 1
+    """, (player_id,))
+    projekts.db.execute("INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, 4, 0, 1, ?)",
+                        (player_id, match_id, team_id))
+
+
+def test_store_keeps_concurrent_change_stale(projekts, cache):
+    player_id = projekts.db.fetch_one("SELECT player_id FROM player_form ORDER BY stat_id LIMIT 1")[0]
+    cache.store(player_id, cache.get_stats(player_id), b'png')
+    assert cache.lookup(player_id) is not None
+    
+    stats = cache.get_stats(player_id)
+    add_stat(projekts, player_id)
+    path = cache.store(player_id, stats, b'png')
+    assert cache.lookup(player_id) is None
+    assert cache.lookup(player_id, allow_stale=True) == path
+    
+    cache.store(player_id, cache.get_stats(player_id), b'png')
+    assert cache.lookup(player_id) is not None
+
+
+def test_prerender_keeps_concurrent_change_stale(projekts, cache, monkeypatch):
+    player_id = projekts.db.fetch_one("SELECT player_id FROM player_form ORDER BY stat_id DESC LIMIT 1")[0]
+    projekts.db.execute("UPDATE chart_renders SET stale = 1")
+    get_stale_stats = cache.get_stale_stats
+    calls = []
+    
+    def changing_during_render():
+        stale = get_stale_stats()
+        if not calls:
+            # Izmaiņa pēc statistikas nolasīšanas, pirms rezultāta ierakstīšanas
+            add_stat(projekts, player_id)
+        calls.append(len(stale))
+        return stale
+    
+    monkeypatch.setattr(cache, 'get_stale_stats', changing_during_render)
+    result = cache.prerender(workers=1)
+    assert result['players'] > 1
+    assert cache.lookup(player_id) is None
+    
+    stale = projekts.db.fetch_all("SELECT player_id FROM chart_renders WHERE stale = 1")
+    assert [row[0] for row in stale] == [player_id]
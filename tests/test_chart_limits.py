@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+
+# Grafiku maršruta ierobežotāja uzvedība (tas pats scenārijs, ko mēra `flask flood-test`)
+
+@pytest.fixture
+def saturated(projekts, monkeypatch):
+    # Visas vietas aizņemtas un rinda nulle: katrs zīmēšanas pieprasījums tiek atraidīts uzreiz
+    limiter = projekts.route_limiters['player_chart']
+    monkeypatch.setattr(limiter, 'max_queue', 0)
+    for _ in range(limiter.max_concurrent):
+        assert limiter.acquire()
+    yield limiter
+    for _ in range(limiter.max_concurrent):
+        limiter.release()
+
+
+def new_player(projekts):
+    team_id = projekts.db.fetch_one("SELECT id FROM teams ORDER BY id LIMIT 1")[0]
+    projekts.db.execute("INSERT INTO players (name, number, position, team_id) VALUES ('Testa spēlētājs', 99, 'Setter', ?)",
+                        (team_id,))
+    return projekts.db.fetch_one("SELECT MAX(id) FROM players")[0]
+
+
+def test_cached_chart_bypasses_limiter(projekts, client, saturated):
+    player_id = projekts.db.fetch_one("SELECT id FROM players ORDER BY id LIMIT 1")[0]
+    saturated.release()
+    try:
+        assert client.get(f'/player/{player_id}/chart').status_code == 200
+    finally:
+        saturated.acquire()
+    rejected = saturated.get_metrics()['rejected']
+    
+    response = client.get(f'/player/{player_id}/chart')
+    assert response.status_code == 200
+    assert 'Warning' not in response.headers
+    assert saturated.get_metrics()['rejected'] == rejected
+
+
+def test_stale_chart_served_when_overloaded(projekts, client, saturated):
+    player_id = projekts.db.fetch_one("SELECT id FROM players ORDER BY id LIMIT 1 OFFSET 1")[0]
+    saturated.release()
+    try:
+        assert client.get(f'/player/{player_id}/chart').status_code == 200
+    finally:
+        saturated.acquire()
+    projekts.db.execute("UPDATE chart_renders SET stale = 1 WHERE player_id = ?", (player_id,))
+    
+    response = client.get(f'/player/{player_id}/chart')
+    assert response.status_code == 200
+    assert response.headers['Warning'].startswith('110')
+
+
+def test_uncached_chart_rejected_when_overloaded(projekts, client, saturated):
+    response = client.get(f'/player/{new_player(projekts)}/chart')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(saturated.retry_after)
+    assert client.get('/teams').status_code == 200
+
+
+def test_flood_never_fails(projekts):
+    player_ids = [row[0] for row in projekts.db.fetch_all("SELECT id FROM players")]
+    statuses = set()
+    teams_statuses = set()
+    lock = threading.Lock()
+    stop_at = time.time() + 1.0
+    
+    def logged_in_client():
+        client = projekts.app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        return client
+    
+    def flood(index):
+        client = logged_in_client()
+        while time.time() < stop_at:
+            player_id = player_ids[index % len(player_ids)]
+            projekts.db.execute("UPDATE chart_renders SET stale = 1 WHERE player_id = ?", (player_id,))
+            status = client.get(f'/player/{player_id}/chart').status_code
+            with lock:
+                statuses.add(status)
+            index += 1
+    
+    flooders = [threading.Thread(target=flood, args=(index,)) for index in range(8)]
+    for flooder in flooders:
+        flooder.start()
+    client = logged_in_client()
+    while time.time() < stop_at:
+        teams_statuses.add(client.get('/teams').status_code)
+    for flooder in flooders:
+        flooder.join()
+    
+    assert statuses <= {200, 503}
+    assert teams_statuses == {200}
+    assert projekts.route_limiters['player_chart'].get_metrics()['active'] == 0
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def elo_db(projekts, tmp_path):
+    db = projekts.Database(str(tmp_path / 'elo.db'))
+    db.initialize_db()
+    elo = projekts.EloRating(db)
+    elo.sync()
+    yield db, elo
+    db.close()
+
+
+def ratings_state(db):
+    return ([(team_id, round(rating, 6), matches) for team_id, rating, matches in
+             db.fetch_all("SELECT team_id, rating, matches FROM team_ratings ORDER BY team_id")],
+            [(match_id, round(rating1, 6), round(rating2, 6), round(delta, 6)) for match_id, rating1, rating2, delta in
+             db.fetch_all("SELECT match_id, rating1, rating2, delta FROM rating_history ORDER BY match_id")])
+
+
+def assert_sync_matches_recompute(db, elo):
+    elo.sync()
+    incremental = ratings_state(db)
+    elo.recompute()
+    assert incremental == ratings_state(db)
+
+
+def add_match(db, team1_id, team2_id, date, score1, score2):
+    return db.execute("INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, ?, ?, ?)",
+                      (team1_id, team2_id, date, score1, score2)).lastrowid
+
+
+def test_incremental_inserts(elo_db):
+    db, elo = elo_db
+    for day, (team1_id, team2_id, score1, score2) in enumerate([(1, 2, 3, 0), (3, 4, 1, 3), (1, 4, 2, 2), (2, 3, 3, 2)]):
+        add_match(db, team1_id, team2_id, f'2099-01-{day + 10}', score1, score2)
+        assert_sync_matches_recompute(db, elo)
+
+
+def test_late_scored_fixture(elo_db):
+    db, elo = elo_db
+    fixture_id = add_match(db, 1, 2, '2099-02-01', None, None)
+    add_match(db, 1, 3, '2099-02-05', 3, 1)
+    add_match(db, 2, 3, '2099-02-08', 0, 3)
+    elo.sync()
+    assert not db.fetch_one("SELECT 1 FROM rating_history WHERE match_id = ?", (fixture_id,))
+    
+    db.execute("UPDATE matches SET score_team1 = 0, score_team2 = 3 WHERE id = ?", (fixture_id,))
+    assert_sync_matches_recompute(db, elo)
+    assert db.fetch_one("SELECT 1 FROM rating_history WHERE match_id = ?", (fixture_id,))
+
+
+def test_score_edit_and_delete(elo_db):
+    db, elo = elo_db
+    match_id = add_match(db, 1, 2, '2099-03-01', 3, 0)
+    add_match(db, 2, 4, '2099-03-05', 3, 1)
+    elo.sync()
+    
+    db.execute("UPDATE matches SET score_team1 = 1, score_team2 = 3 WHERE id = ?", (match_id,))
+    assert db.fetch_one("SELECT stale FROM rating_state")[0] == 1
+    assert_sync_matches_recompute(db, elo)
+    assert db.fetch_one("SELECT stale FROM rating_state")[0] == 0
+    
+    db.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+    assert_sync_matches_recompute(db, elo)
+    assert not db.fetch_one("SELECT 1 FROM rating_history WHERE match_id = ?", (match_id,))
+
+
+def test_unchanged_update_keeps_ratings(elo_db):
+    db, elo = elo_db
+    db.execute("UPDATE matches SET score_team1 = score_team1")
+    assert db.fetch_one("SELECT stale FROM rating_state")[0] == 0
+
+
+def test_archive_does_not_invalidate(league, projekts):
+    db, partitions = league
+    elo = projekts.EloRating(db)
+    elo.sync()
+    before = ratings_state(db)
+    partitions.archive('2025')
+    assert db.fetch_one("SELECT stale FROM rating_state")[0] == 0
+    elo.sync()
+    assert ratings_state(db) == before
+    elo.recompute()
+    assert ratings_state(db) == before
+
+
+def test_concurrent_sync_rates_each_match_once(elo_db, projekts):
+    db, elo = elo_db
+    for day in range(30):
+        add_match(db, day % 4 + 1, (day + 1) % 4 + 1, f'2099-05-{day + 1:02d}', 3, day % 3)
+    errors = []
+    
+    def run():
+        # Katram pavedienam savs savienojums (Database.local), kopīga datubāze
+        try:
+            projekts.EloRating(db).sync()
+        except projekts.sqlite3.OperationalError as error:
+            errors.append(error)
+    
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    
+    rated = db.fetch_one("SELECT COUNT(*) FROM rating_history")[0]
+    assert db.fetch_one("SELECT SUM(matches) FROM team_ratings")[0] == 2 * rated
+    concurrent = ratings_state(db)
+    elo.recompute()
+    assert concurrent == ratings_state(db)
@@ -0,0 +1,34 @@
+def test_recompute_invalidates_cached_pages(projekts, client):
+    projekts.elo.sync()
+    team_id = projekts.db.fetch_one("SELECT id FROM teams ORDER BY id LIMIT 1")[0]
+    assert client.get('/teams').status_code == 200
+    assert client.get(f'/team/{team_id}').status_code == 200
+    
+    version = projekts.fragment_cache.get_version()
+    assert projekts.fragment_cache.get(('teams', 'admin'), version) is not None
+    
+    # Cits K koeficients maina visus reitingus, bet ne spēles
+    original = projekts.elo.k_factor
+    projekts.elo.k_factor = original * 2
+    try:
+        projekts.elo.recompute()
+        assert projekts.fragment_cache.get_version() != version
+        assert projekts.fragment_cache.get(('teams', 'admin'), projekts.fragment_cache.get_version()) is None
+    finally:
+        projekts.elo.k_factor = original
+        projekts.elo.recompute()
+
+
+def test_sync_changes_rating_version(projekts):
+    projekts.elo.sync()
+    version = projekts.fragment_cache.get_version()
+    team1_id, team2_id = [row[0] for row in projekts.db.fetch_all("SELECT id FROM teams ORDER BY id LIMIT 2")]
+    match_id = projekts.db.execute("""
+        INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, '2026-06-01', 3, 2)
+    """, (team1_id, team2_id)).lastrowid
+    seq = projekts.change_feed.latest()
+    assert projekts.elo.sync() == 1
+    assert projekts.change_feed.latest() == seq
+    assert projekts.fragment_cache.get_version()[1] != version[1]
+    projekts.db.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+    projekts.elo.recompute()
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+
+def test_ids_are_not_reused_after_archive(league):
+    db, partitions = league
+    last_match = db.fetch_one("SELECT MAX(id) FROM matches")[0]
+    last_stat = db.fetch_one("SELECT MAX(id) FROM player_stats")[0]
+    player_id, team_id = db.fetch_one("SELECT id, team_id FROM players ORDER BY id LIMIT 1")
+    
+    partitions.archive('2025')
+    assert db.fetch_one("SELECT COUNT(*) FROM main.matches")[0] == 0
+    
+    match_id = db.execute("""
+        INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, '2026-03-01', 3, 1)
+    """, (team_id, team_id + 1)).lastrowid
+    stat_id = db.execute("""
+        INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, 10, 1, 2, ?)
+    """, (player_id, match_id, team_id)).lastrowid
+    assert match_id > last_match
+    assert stat_id > last_stat
+    assert db.fetch_one("SELECT match_id, won FROM player_form WHERE stat_id = ?", (stat_id,)) == (match_id, 1)
+
+
+def test_old_tables_are_rebuilt_with_autoincrement(projekts, tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE matches (id INTEGER PRIMARY KEY, team1_id INTEGER, team2_id INTEGER, date TEXT,
+                              score_team1 INTEGER, score_team2 INTEGER)
+    """)
+    conn.execute("""
+        CREATE TABLE player_stats (id INTEGER PRIMARY KEY, player_id INTEGER, match_id INTEGER,
+                                   points INTEGER DEFAULT 0, blocks INTEGER DEFAULT 0, serves INTEGER DEFAULT 0)
+    """)
+    conn.execute("CREATE TABLE teams (id INTEGER PRIMARY KEY, name TEXT NOT NULL, city TEXT, coach TEXT)")
+    conn.executemany("INSERT INTO teams (id, name) VALUES (?, ?)", [(1, 'Lauvas'), (2, 'Tīģeri')])
+    conn.execute("INSERT INTO matches VALUES (7, 1, 2, '2025-05-01', 3, 0)")
+    conn.execute("INSERT INTO player_stats VALUES (40, 1, 7, 5, 0, 0)")
+    conn.commit()
+    conn.close()
+    
+    db = projekts.Database(path)
+    db.initialize_db()
+    try:
+        for table in ('matches', 'player_stats'):
+            assert 'AUTOINCREMENT' in db.fetch_one("SELECT sql FROM sqlite_master WHERE name = ?", (table,))[0]
+        assert db.fetch_one("SELECT team1_id, team2_id, date FROM matches WHERE id = 7") == (1, 2, '2025-05-01')
+        assert db.fetch_one("SELECT points, match_id FROM player_stats WHERE id = 40") == (5, 7)
+        # Tabulas indeksi un trigeri izveidoti no jauna
+        for name in ('idx_matches_date', 'trg_matches_changes_insert', 'trg_player_stats_form_insert'):
+            assert db.fetch_one("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+    finally:
+        db.close()
+
+
+def test_archive_count_is_capped(league, monkeypatch):
+    db, partitions = league
+    monkeypatch.setattr(partitions, 'max_partitions', 0)
+    with pytest.raises(ValueError):
+        partitions.archive('2025')
+    assert db.fetch_one("SELECT COUNT(*) FROM main.matches")[0] > 0
+
+
+def test_batch_team_matches_include_archived_seasons(projekts, league):
+    db, partitions = league
+    team_id = db.fetch_one("SELECT team1_id FROM matches ORDER BY id LIMIT 1")[0]
+    before = projekts.BatchLoader(db).fetch('team_matches', [team_id])[team_id]
+    assert before
+    partitions.archive('2025')
+    assert projekts.BatchLoader(db).fetch('team_matches', [team_id])[team_id] == before
@@ -0,0 +1,13 @@
+def test_non_ascii_profile_header(projekts, monkeypatch):
+    monkeypatch.setattr(projekts.request_profiler, 'token', 'slepens')
+    client = projekts.app.test_client()
+    response = client.get('/', headers={'X-Profile': 'šā'.encode('utf-8').decode('latin-1')})
+    assert response.status_code == 302
+    assert 'X-Profile-Id' not in response.headers
+
+
+def test_profile_token_header(projekts, monkeypatch):
+    monkeypatch.setattr(projekts.request_profiler, 'token', 'slepens')
+    client = projekts.app.test_client()
+    assert 'X-Profile-Id' not in client.get('/', headers={'X-Profile': 'nepareizs'}).headers
+    assert 'X-Profile-Id' in client.get('/', headers={'X-Profile': 'slepens'}).headers
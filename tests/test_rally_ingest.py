@@ -0,0 +1,96 @@
+import logging
+import sqlite3
+from queue import Full
+
+import pytest
+
+
+@pytest.fixture
+def ingest(projekts, tmp_path):
+    db = projekts.Database(str(tmp_path / 'ingest.db'))
+    db.initialize_db()
+    # Fona pavediens šajos testos neraksta pats - flush tiek izsaukts tieši
+    ingest = projekts.RallyIngest(db.db_name, flush_interval=3600, max_batch=10 ** 6, max_buffered=10)
+    yield db, ingest
+    db.close()
+
+
+def events(db, count, action='point'):
+    match_id, player_id = db.fetch_one("SELECT match_id, player_id FROM player_stats ORDER BY id LIMIT 1")
+    return [{'match_id': match_id, 'player_id': player_id, 'action': action, 'set': 1 + i % 3, 'timestamp': 1000 + i}
+            for i in range(count)]
+
+
+@pytest.mark.parametrize('event', [
+    'point',
+    ['point'],
+    {'match_id': 1, 'player_id': 1, 'action': 'dance', 'set': 1},
+    {'match_id': 1, 'player_id': 1, 'action': 'point', 'set': 0},
+    {'match_id': 1, 'player_id': 1, 'action': 'point'},
+    {'player_id': 1, 'action': 'point', 'set': 1},
+    {'match_id': 'x', 'player_id': 1, 'action': 'point', 'set': 1},
+])
+def test_invalid_event_rejects_whole_request(ingest, event):
+    db, ingest = ingest
+    with pytest.raises((KeyError, TypeError, ValueError)):
+        ingest.submit(events(db, 2) + [event])
+    assert ingest.received == 0
+    assert len(ingest.buffer) == 0
+
+
+def test_buffer_is_bounded(ingest):
+    db, ingest = ingest
+    assert ingest.submit(events(db, 6)) == 6
+    with pytest.raises(Full):
+        ingest.submit(events(db, 5))
+    assert ingest.rejected == 5
+    assert len(ingest.buffer) == 6
+    assert ingest.flush(db) == 6
+    assert ingest.submit(events(db, 5)) == 5
+
+
+def test_failed_batch_is_retried(ingest, monkeypatch):
+    db, ingest = ingest
+    ingest.submit(events(db, 4))
+    ingest.submit(events(db, 2, action='ace'))
+    write_batch = ingest.write_batch
+    
+    def failing(*args):
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(ingest, 'write_batch', failing)
+    with pytest.raises(sqlite3.OperationalError):
+        ingest.flush(db)
+    assert ingest.failed_flushes == 1
+    assert [event[2] for event, _ in ingest.buffer] == ['point'] * 4 + ['ace'] * 2
+    
+    monkeypatch.setattr(ingest, 'write_batch', write_batch)
+    assert ingest.flush(db) == 6
+    assert db.fetch_all("SELECT action FROM rally_events ORDER BY id") == [('point',)] * 4 + [('ace',)] * 2
+    assert db.fetch_one("SELECT SUM(points), SUM(serves) FROM player_set_stats")[:2] == (6, 2)
+
+
+def test_background_failure_is_logged(ingest, monkeypatch, caplog):
+    db, ingest = ingest
+    
+    def failing(*args):
+        raise sqlite3.OperationalError("database is locked")
+    
+    monkeypatch.setattr(ingest, 'write_batch', failing)
+    monkeypatch.setattr(ingest, 'flush_interval', 0.01)
+    with caplog.at_level(logging.ERROR):
+        ingest.submit(events(db, 1))
+        for _ in range(200):
+            if ingest.failed_flushes:
+                break
+            ingest.wakeup.wait(0.01)
+    assert ingest.failed_flushes >= 1
+    assert any(record.exc_info for record in caplog.records if 'Notikumu' in record.getMessage())
+    assert len(ingest.buffer) == 1
+
+
+def test_full_buffer_returns_503(projekts, client, monkeypatch):
+    monkeypatch.setattr(projekts.rally_ingest, 'max_buffered', 0)
+    response = client.post('/ingest/rallies', json={'match_id': 1, 'player_id': 1, 'action': 'point', 'set': 1})
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
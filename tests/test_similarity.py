@@ -0,0 +1,69 @@
+import threading
+
+import numpy as np
+
+
+def add_player(projekts, position):
+    team_id = projekts.db.fetch_one("SELECT id FROM teams ORDER BY id LIMIT 1")[0]
+    return projekts.db.execute("INSERT INTO players (name, number, position, team_id) VALUES ('Līdzības tests', 77, ?, ?)",
+                               (position, team_id)).lastrowid
+
+
+def test_new_position_rebuilds_encoding(projekts, client):
+    index = projekts.similarity_index
+    index.refresh()
+    assert 'Universal' not in index.state.positions
+    
+    player_id = add_player(projekts, 'Universal')
+    other_id = add_player(projekts, 'Universal')
+    response = client.get(f'/player/{player_id}/similar?k=1')
+    assert response.status_code == 200
+    
+    state = index.state
+    assert 'Universal' in state.positions
+    column = len(index.numeric_fields) + state.positions.index('Universal')
+    assert state.columns[column, state.rows[player_id]] == 1
+    # Vienīgais otrs spēlētājs tajā pašā pozīcijā un ar tādu pašu (tukšu) statistiku ir tuvākais
+    assert index.similar(player_id, 1)[0][0] == other_id
+
+
+def test_refresh_publishes_new_state(projekts):
+    index = projekts.similarity_index
+    index.refresh()
+    before = index.state
+    player_id = add_player(projekts, before.positions[0])
+    index.refresh()
+    
+    assert index.state is not before
+    assert player_id in index.state.rows
+    assert player_id not in before.rows
+    assert not before.columns.flags.writeable
+
+
+def test_similar_during_refresh(projekts):
+    index = projekts.similarity_index
+    index.refresh()
+    player_id = next(iter(index.state.rows))
+    position = index.state.positions[0]
+    errors = []
+    stop = threading.Event()
+    
+    def query():
+        while not stop.is_set():
+            try:
+                result = index.similar(player_id, 5)
+                assert result is None or all(np.isfinite(distance) for _, distance in result)
+            except (AssertionError, IndexError, KeyError, ValueError) as error:
+                errors.append(error)
+                return
+    
+    thread = threading.Thread(target=query)
+    thread.start()
+    try:
+        for _ in range(20):
+            add_player(projekts, position)
+            index.refresh()
+    finally:
+        stop.set()
+        thread.join()
+    assert errors == []
@@ -0,0 +1,65 @@
+import pytest
+
+
+def test_rejects_empty_simulation(projekts):
+    with pytest.raises(ValueError):
+        projekts.season_simulator.simulate(simulations=0)
+    with pytest.raises(ValueError):
+        projekts.season_simulator.simulate(simulations=-5)
+    with pytest.raises(ValueError):
+        projekts.season_simulator.simulate(simulations=10, workers=0)
+
+
+def test_single_simulation_with_many_workers(projekts):
+    # Procesu skaits nepārsniedz simulāciju skaitu, tāpēc neviena porcija nav tukša
+    results = projekts.season_simulator.simulate(simulations=1, workers=4)
+    assert results['simulations'] == 1
+    for team in results['teams']:
+        assert sum(team['positions']) == pytest.approx(1, abs=0.01)
+
+
+def test_process_pool_is_reused(projekts):
+    simulator = projekts.season_simulator
+    first = simulator.simulate(simulations=200, workers=2)
+    executor = simulator.executors[2]
+    second = simulator.simulate(simulations=200, workers=2)
+    assert simulator.executors[2] is executor
+    assert executor._mp_context.get_start_method() == 'spawn'
+    for results in (first, second):
+        for team in results['teams']:
+            assert sum(team['positions']) == pytest.approx(1, abs=0.01)
+
+
+def test_simulation_page_uses_cache(projekts, client):
+    assert client.get('/simulation').status_code == 200
+    season = projekts.season_simulator.get_current_season()
+    cached = projekts.season_simulator.cache[season]
+    assert client.get('/simulation').status_code == 200
+    assert projekts.season_simulator.cache[season] is cached
+
+
+def test_workers_do_not_import_the_app(projekts):
+    # 'spawn' darbiniekam pietiek ar simulation moduli; projekts.py imports inicializētu datubāzi
+    simulator = projekts.season_simulator
+    simulator.simulate(simulations=200, workers=2)
+    executor = simulator.executors[2]
+    assert projekts.simulate_season_chunk.__module__ == 'simulation'
+    assert executor.submit(eval, "'projekts' in __import__('sys').modules").result(timeout=60) is False
+    assert executor.submit(eval, "'simulation' in __import__('sys').modules").result(timeout=60) is True
+
+
+def test_unknown_season_is_not_cached(projekts, client):
+    simulator = projekts.season_simulator
+    cache, locks = dict(simulator.cache), dict(simulator.season_locks)
+    with pytest.raises(ValueError):
+        simulator.get_results('1899')
+    with pytest.raises(ValueError):
+        simulator.simulate('nav-sezona', simulations=10)
+    for season in ('1900', '1901', 'x' * 100):
+        assert client.get('/simulation', query_string={'season': season}).status_code == 404
+    assert simulator.cache == cache
+    assert simulator.season_locks == locks
+    
+    season = simulator.get_current_season()
+    assert client.get('/simulation', query_string={'season': season}).status_code == 200
+    assert set(simulator.season_locks) == set(locks) | {season}
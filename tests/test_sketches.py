@@ -0,0 +1,190 @@
+import threading
+
+import numpy as np
+import pytest
+
+
+# Skiču precizitāte (tas pats, ko `flask check-sketches` pārbauda lielākam datu apjomam)
+
+def rank_error(sketch, values):
+    sketch_values, cumulative = sketch.cdf()
+    exact_sorted = np.sort(values)
+    probes = np.quantile(values, np.linspace(0.01, 0.99, 99))
+    sketch_ranks = np.searchsorted(sketch_values, probes, side='right')
+    sketch_ranks = np.where(sketch_ranks > 0, cumulative[np.maximum(sketch_ranks - 1, 0)], 0) / cumulative[-1]
+    exact_ranks = np.searchsorted(exact_sorted, probes, side='right') / len(exact_sorted)
+    return float(np.abs(sketch_ranks - exact_ranks).max())
+
+
+def test_merged_partitions_rank_error(projekts):
+    values = np.random.default_rng(7).gamma(2.0, 3.0, 200000)
+    merged = projekts.KLLSketch(200)
+    for part in np.array_split(values, 4):
+        sketch = projekts.KLLSketch(200)
+        sketch.update(part.tolist())
+        merged.merge(projekts.KLLSketch.from_json(sketch.to_json(), sketch.count, 200))
+    assert merged.count == len(values)
+    assert rank_error(merged, values) < 0.02
+
+
+def test_small_stream_is_exact(projekts):
+    values = np.arange(100, dtype=np.float64)
+    sketch = projekts.KLLSketch(200)
+    sketch.update(values.tolist())
+    assert rank_error(sketch, values) == 0
+
+
+def player_averages(db, position, stat):
+    # Precīzās vērtības: katra spēlētāja vidējais spēlē katrā sezonā
+    return sorted(value for value, in db.fetch_all(f"""
+        SELECT AVG(COALESCE(ps.{stat}, 0))
+        FROM {db.career_table('player_stats')} ps
+        JOIN {db.career_table('matches')} m ON ps.match_id = m.id
+        JOIN players p ON ps.player_id = p.id
+        WHERE p.position = ?
+        GROUP BY ps.player_id, substr(m.date, 1, 4)
+    """, (position,)))
+
+
+def assert_exact(projekts, db, sketches):
+    # Mazos datos skice satur visas vērtības, tāpēc tai jāsakrīt ar precīzo sadalījumu pār spēlētājiem
+    positions = [position for position, in db.fetch_all("SELECT DISTINCT position FROM players WHERE position IS NOT NULL")]
+    for position in positions:
+        for stat in projekts.QuantileSketches.fields:
+            exact = player_averages(db, position, stat)
+            values, cumulative = sketches.get_cdf(position, stat)
+            assert values.tolist() == pytest.approx(exact)
+            assert rank_error_exact(values, cumulative, np.array(exact)) == 0
+
+
+def rank_error_exact(values, cumulative, exact_sorted):
+    if not len(exact_sorted):
+        return 0
+    probes = np.unique(exact_sorted)
+    sketch_ranks = np.searchsorted(values, probes, side='right')
+    sketch_ranks = np.where(sketch_ranks > 0, cumulative[np.maximum(sketch_ranks - 1, 0)], 0) / cumulative[-1]
+    exact_ranks = np.searchsorted(exact_sorted, probes, side='right') / len(exact_sorted)
+    return float(np.abs(sketch_ranks - exact_ranks).max())
+
+
+def test_sketches_hold_player_averages(projekts, tmp_path):
+    db = projekts.Database(str(tmp_path / 'sketch.db'))
+    db.initialize_db()
+    sketches = projekts.QuantileSketches(db)
+    sketches.refresh()
+    assert_exact(projekts, db, sketches)
+    
+    # Vairākas spēles vienam spēlētājam maina tikai viņa vidējo, nevis vērtību skaitu
+    player_id, position, team_id = db.fetch_one("""
+        SELECT id, position, team_id FROM players WHERE position IS NOT NULL ORDER BY id LIMIT 1
+    """)
+    match_id = db.fetch_one("SELECT id FROM matches WHERE ? IN (team1_id, team2_id) LIMIT 1", (team_id,))[0]
+    key = (db.fetch_one("SELECT substr(date, 1, 4) FROM matches WHERE id = ?", (match_id,))[0], position, 'points')
+    count = sketches.sketches[key].count
+    for points in (30, 40, 50):
+        db.execute("INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, ?, 1, 2, ?)",
+                   (player_id, match_id, points, team_id))
+    sketches.refresh()
+    assert sketches.sketches[key].count == count
+    assert_exact(projekts, db, sketches)
+    
+    db.execute("UPDATE player_stats SET points = points + 5 WHERE player_id = ?", (player_id,))
+    db.execute("DELETE FROM player_stats WHERE id = (SELECT MAX(id) FROM player_stats)")
+    sketches.refresh()
+    assert_exact(projekts, db, sketches)
+    
+    # Spēlētājs ar vienu sezonu atrodas savas vērtības vidū: puse no vienādajām skaitās zemāk
+    averages = player_averages(db, position, 'points')
+    average = db.fetch_one("SELECT AVG(points) FROM player_stats WHERE player_id = ?", (player_id,))[0]
+    below = sum(value < average - 1e-9 for value in averages)
+    equal = sum(abs(value - average) <= 1e-9 for value in averages)
+    assert sketches.percentile(position, 'points', average) == round((below + equal / 2) / len(averages) * 100, 1)
+    db.close()
+
+
+def test_new_rows_survive_archive(projekts, league):
+    db, partitions = league
+    sketches = projekts.QuantileSketches(db)
+    sketches.refresh()
+    player_id, position, team_id = db.fetch_one("""
+        SELECT id, position, team_id FROM players WHERE position IS NOT NULL ORDER BY id LIMIT 1
+    """)
+    match_id = db.fetch_one("SELECT id FROM matches WHERE ? IN (team1_id, team2_id) LIMIT 1", (team_id,))[0]
+    
+    # Jaunā rinda vēl nav skicē, kad sezona tiek pārvietota uz arhīvu
+    db.execute("INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, 99, 0, 0, ?)",
+               (player_id, match_id, team_id))
+    partitions.archive('2025')
+    sketches.refresh()
+    
+    assert_exact(projekts, db, sketches)
+    assert db.fetch_one("SELECT COUNT(*) FROM sketch_dirty")[0] == 0
+
+
+def test_page_view_does_not_rebuild(projekts, tmp_path, monkeypatch):
+    db = projekts.Database(str(tmp_path / 'sketch.db'))
+    db.initialize_db()
+    sketches = projekts.QuantileSketches(db)
+    sketches.refresh()
+    player_id, position, team_id = db.fetch_one("""
+        SELECT id, position, team_id FROM players WHERE position IS NOT NULL ORDER BY id LIMIT 1
+    """)
+    match_id = db.fetch_one("SELECT id FROM matches WHERE ? IN (team1_id, team2_id) LIMIT 1", (team_id,))[0]
+    db.execute("INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, 99, 0, 0, ?)",
+               (player_id, match_id, team_id))
+    before = sketches.get_cdf(position, 'points')[0].tolist()
+    
+    started, release = threading.Event(), threading.Event()
+    build = projekts.QuantileSketches.build
+    
+    def slow_build(self):
+        started.set()
+        assert release.wait(10)
+        return build(self)
+    
+    monkeypatch.setattr(projekts.QuantileSketches, 'build', slow_build)
+    # Kamēr fonā notiek pārbūve, lapa saņem procentiles pēc iepriekšējām skicēm un negaida
+    averages = {'points': 99, 'blocks': 0, 'serves': 0}
+    assert sketches.get_percentiles(position, averages)['points'] is not None
+    assert started.wait(10)
+    assert sketches.get_cdf(position, 'points')[0].tolist() == before
+    assert db.fetch_one("SELECT COUNT(*) FROM sketch_dirty")[0] == 1
+    sketches.get_percentiles(position, averages)
+    release.set()
+    sketches.thread.join(10)
+    
+    assert db.fetch_one("SELECT COUNT(*) FROM sketch_dirty")[0] == 0
+    assert sketches.get_cdf(position, 'points')[0].tolist() != before
+    assert_exact(projekts, db, sketches)
+    db.close()
+
+
+def test_percentiles_during_refresh(projekts):
+    sketches = projekts.quantile_sketches
+    sketches.refresh()
+    position = next(iter(sketches.sketches))[1]
+    player_id, team_id = projekts.db.fetch_one("SELECT id, team_id FROM players WHERE position = ? LIMIT 1", (position,))
+    match_id = projekts.db.fetch_one("SELECT id FROM matches LIMIT 1")[0]
+    errors = []
+    stop = threading.Event()
+    
+    def query():
+        while not stop.is_set():
+            try:
+                assert 0 <= sketches.percentile(position, 'points', 10) <= 100
+            except (AssertionError, IndexError, KeyError, ValueError) as error:
+                errors.append(error)
+                return
+    
+    thread = threading.Thread(target=query)
+    thread.start()
+    try:
+        for points in range(20):
+            projekts.db.execute("""
+                INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, ?, 0, 0, ?)
+            """, (player_id, match_id, points, team_id))
+            sketches.refresh()
+    finally:
+        stop.set()
+        thread.join()
+    assert errors == []
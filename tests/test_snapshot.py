@@ -0,0 +1,67 @@
+import threading
+
+
+def make_snapshot(projekts, tmp_path, **kwargs):
+    db = projekts.Database(str(tmp_path / 'snap.db'))
+    db.initialize_db()
+    feed = projekts.ChangeFeed(db)
+    return db, projekts.AggregateSnapshot(str(tmp_path / 'aggregates.snap'), check_interval=0, db=db,
+                                          change_feed=feed, **kwargs)
+
+
+def add_points(db, points):
+    stat_id, player_id = db.fetch_one("SELECT id, player_id FROM player_stats ORDER BY id LIMIT 1")
+    db.execute("UPDATE player_stats SET points = points + ? WHERE id = ?", (points, stat_id))
+    return player_id
+
+
+def test_rebuild_runs_in_background_and_serves_previous_state(projekts, tmp_path, monkeypatch):
+    db, snapshot = make_snapshot(projekts, tmp_path)
+    first = snapshot.current()
+    player_id = add_points(db, 7)
+    before = snapshot.get_player(player_id, first)['points']
+    
+    started, release = threading.Event(), threading.Event()
+    build = projekts.SnapshotBuilder.build
+    
+    def slow_build(self, data_version=0):
+        started.set()
+        assert release.wait(10)
+        return build(self, data_version)
+    
+    monkeypatch.setattr(projekts.SnapshotBuilder, 'build', slow_build)
+    # Kamēr fona pavediens būvē, pieprasījumi saņem iepriekšējo momentuzņēmumu un negaida
+    assert snapshot.current() is first
+    assert started.wait(10)
+    assert snapshot.current() is first
+    release.set()
+    snapshot.thread.join(10)
+    
+    state = snapshot.current()
+    assert state is not first
+    assert state.data_version == projekts.ChangeFeed(db).latest()
+    assert snapshot.get_player(player_id, state)['points'] == before + 7
+
+
+def test_replaced_mapping_is_closed(projekts, tmp_path):
+    db, snapshot = make_snapshot(projekts, tmp_path, grace=0)
+    first = snapshot.current()
+    add_points(db, 1)
+    snapshot.current()
+    snapshot.thread.join(10)
+    second = snapshot.current()
+    assert second is not first
+    assert first.mapping.closed
+    assert not second.mapping.closed
+
+
+def test_replaced_mapping_stays_open_during_grace(projekts, tmp_path):
+    db, snapshot = make_snapshot(projekts, tmp_path, grace=3600)
+    first = snapshot.current()
+    add_points(db, 1)
+    snapshot.current()
+    snapshot.thread.join(10)
+    assert snapshot.current() is not first
+    # Lasītājs, kas paņēma veco stāvokli pirms aizstāšanas, to vēl var izmantot
+    assert not first.mapping.closed
+    assert snapshot.get_standings(first)
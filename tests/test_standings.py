@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.fixture
+def requested_dates(projekts, monkeypatch):
+    dates = []
+    get_table = projekts.standings.get_table
+    
+    def recording_get_table(date):
+        dates.append(date)
+        return get_table(date)
+    
+    monkeypatch.setattr(projekts.standings, 'get_table', recording_get_table)
+    return dates
+
+
+def test_date_is_normalized(client, requested_dates):
+    assert client.get('/standings?date=2026-2-1').status_code == 200
+    assert client.get('/standings?date=2026-02-01').status_code == 200
+    assert requested_dates == ['2026-02-01', '2026-02-01']
+
+
+@pytest.mark.parametrize('date', ['2026-13-01', '2026-02-30', '01.02.2026', 'rīt'])
+def test_invalid_date(client, requested_dates, date):
+    assert client.get(f'/standings?date={date}').status_code == 400
+    assert requested_dates == []
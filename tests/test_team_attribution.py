@@ -0,0 +1,41 @@
+import pytest
+
+
+# Pēc spēlētāja pārejas vēsturiskā statistika paliek komandai, par kuru viņš spēlēja (player_stats.team_id)
+
+@pytest.fixture
+def transfer(projekts):
+    db = projekts.db
+    team_ids = []
+    for name in ('Pārejas A', 'Pārejas B', 'Pārejas C'):
+        team_ids.append(db.execute("INSERT INTO teams (name, city, coach) VALUES (?, 'Rīga', 'Treneris')", (name,)).lastrowid)
+    team_a, team_b, team_c = team_ids
+    player_id = db.execute("INSERT INTO players (name, number, position, team_id) VALUES ('Pārejas spēlētājs', 5, 'Setter', ?)",
+                           (team_a,)).lastrowid
+    match_id = db.execute("""
+        INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, '2026-04-01', 3, 1)
+    """, (team_a, team_b)).lastrowid
+    db.execute("INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, 17, 2, 3, ?)",
+               (player_id, match_id, team_a))
+    db.execute("UPDATE players SET team_id = ? WHERE id = ?", (team_c, player_id))
+    return {'player_id': player_id, 'match_id': match_id, 'team_a': team_a, 'team_b': team_b, 'team_c': team_c}
+
+
+def test_export_uses_team_at_game_time(projekts, transfer):
+    columns = projekts.LeagueExport.columns
+    rows = [dict(zip(columns, row)) for row in projekts.league_export.iter_rows(team_id=transfer['team_a'])]
+    assert [row['player_id'] for row in rows] == [transfer['player_id']]
+    assert rows[0]['team_id'] == transfer['team_a']
+    assert rows[0]['team_name'] == 'Pārejas A'
+    assert list(projekts.league_export.iter_rows(team_id=transfer['team_c'])) == []
+
+
+def test_live_box_score_uses_team_at_game_time(projekts, transfer):
+    snapshot = projekts.MatchBroadcaster(None, transfer['match_id']).load_snapshot(projekts.db)
+    assert snapshot['players'][str(transfer['player_id'])]['team_id'] == transfer['team_a']
+
+
+def test_outcome_features_use_team_at_game_time(projekts, transfer):
+    data, points = projekts.outcome_model.load_history()
+    row = [int(match_id) for match_id in data[:, 0]].index(transfer['match_id'])
+    assert points[row].tolist() == [17, 0]
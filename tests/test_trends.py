@@ -0,0 +1,146 @@
+import pytest
+
+
+# Trigeru uzturētās tabulas (player_form, player_season_stats, player_streaks) tiek salīdzinātas
+# ar pilnu pārrēķinu no player_stats pēc katras izmaiņas
+
+def recompute(db):
+    rows = db.fetch_all("""
+        SELECT ps.id, ps.player_id, ps.match_id, m.date, COALESCE(ps.points, 0), COALESCE(ps.blocks, 0),
+            COALESCE(ps.serves, 0), COALESCE(ps.team_id, p.team_id), m.team1_id, m.team2_id, m.score_team1, m.score_team2
+        FROM player_stats ps
+        JOIN matches m ON ps.match_id = m.id
+        JOIN players p ON ps.player_id = p.id
+    """)
+    form = {}
+    for stat_id, player_id, match_id, date, points, blocks, serves, team, team1, team2, score1, score2 in rows:
+        scored = score1 is not None and score2 is not None
+        won = scored and ((team == team1 and score1 > score2) or (team == team2 and score2 > score1))
+        drawn = scored and team in (team1, team2) and score1 == score2
+        form[stat_id] = (player_id, match_id, date, date[:4], points, blocks, serves, int(won), int(drawn))
+    
+    seasons = {}
+    for player_id, _, _, season, points, blocks, serves, won, _ in form.values():
+        games, total_points, total_blocks, total_serves, wins = seasons.get((player_id, season), (0, 0, 0, 0, 0))
+        seasons[(player_id, season)] = (games + 1, total_points + points, total_blocks + blocks,
+                                        total_serves + serves, wins + won)
+    
+    streaks = {}
+    for stat_id, (player_id, _, date, *_rest, won, _) in sorted(form.items(), key=lambda item: (item[1][2], item[0])):
+        current, best = streaks.get(player_id, (0, 0))
+        current = current + 1 if won else 0
+        streaks[player_id] = (current, max(best, current))
+    return form, seasons, streaks
+
+
+def assert_consistent(db):
+    form, seasons, streaks = recompute(db)
+    assert {row[0]: tuple(row[1:]) for row in db.fetch_all("""
+        SELECT stat_id, player_id, match_id, date, season, points, blocks, serves, won, drawn FROM player_form
+    """)} == form
+    assert {(row[0], row[1]): tuple(row[2:]) for row in db.fetch_all("""
+        SELECT player_id, season, games, points, blocks, serves, wins FROM player_season_stats
+    """)} == seasons
+    stored = {row[0]: (row[1], row[2]) for row in db.fetch_all(
+        "SELECT player_id, current_streak, best_streak FROM player_streaks")}
+    # Spēlētājam, kura visas spēles izdzēstas, sērija paliek kā 0/0
+    assert {player_id: streak for player_id, streak in stored.items() if streak != (0, 0)} == \
+        {player_id: streak for player_id, streak in streaks.items() if streak != (0, 0)}
+
+
+@pytest.fixture
+def trends_db(projekts, tmp_path):
+    db = projekts.Database(str(tmp_path / 'trends.db'))
+    db.initialize_db()
+    yield db
+    db.close()
+
+
+def first_player(db):
+    return db.fetch_one("SELECT id, team_id FROM players ORDER BY id LIMIT 1")
+
+
+def add_match(db, team1_id, team2_id, date, score1, score2):
+    return db.execute("INSERT INTO matches (team1_id, team2_id, date, score_team1, score_team2) VALUES (?, ?, ?, ?, ?)",
+                      (team1_id, team2_id, date, score1, score2)).lastrowid
+
+
+def add_stat(db, player_id, match_id, team_id, points=10):
+    return db.execute("INSERT INTO player_stats (player_id, match_id, points, blocks, serves, team_id) VALUES (?, ?, ?, 1, 2, ?)",
+                      (player_id, match_id, points, team_id)).lastrowid
+
+
+def test_sample_data_is_consistent(trends_db):
+    assert trends_db.fetch_one("SELECT COUNT(*) FROM player_form")[0] > 0
+    assert_consistent(trends_db)
+
+
+def test_insert_latest_and_historical_games(trends_db):
+    player_id, team_id = first_player(trends_db)
+    opponent = team_id % 4 + 1
+    for date, score in (('2099-01-01', (3, 0)), ('2099-01-08', (3, 1)), ('2020-05-01', (0, 3)), ('2099-01-05', (3, 2))):
+        add_stat(trends_db, player_id, add_match(trends_db, team_id, opponent, date, *score), team_id)
+        assert_consistent(trends_db)
+
+
+def test_update_stat_and_match(trends_db):
+    player_id, team_id = first_player(trends_db)
+    opponent = team_id % 4 + 1
+    match_id = add_match(trends_db, team_id, opponent, '2099-02-01', 3, 0)
+    stat_id = add_stat(trends_db, player_id, match_id, team_id)
+    
+    trends_db.execute("UPDATE player_stats SET points = 25, blocks = 4 WHERE id = ?", (stat_id,))
+    assert_consistent(trends_db)
+    # Rezultāta labojums maina uzvaru sēriju
+    trends_db.execute("UPDATE matches SET score_team1 = 1, score_team2 = 3 WHERE id = ?", (match_id,))
+    assert_consistent(trends_db)
+    trends_db.execute("UPDATE matches SET score_team1 = 2, score_team2 = 2 WHERE id = ?", (match_id,))
+    assert_consistent(trends_db)
+    # Datuma maiņa pārvieto spēli uz citu sezonu
+    trends_db.execute("UPDATE matches SET date = '2030-06-01' WHERE id = ?", (match_id,))
+    assert_consistent(trends_db)
+    # Spēlētājs pārcelts uz citu spēli
+    other_match = add_match(trends_db, opponent, team_id, '2099-03-01', 3, 1)
+    trends_db.execute("UPDATE player_stats SET match_id = ? WHERE id = ?", (other_match, stat_id))
+    assert_consistent(trends_db)
+
+
+def test_fixture_scored_later(trends_db):
+    player_id, team_id = first_player(trends_db)
+    match_id = add_match(trends_db, team_id, team_id % 4 + 1, '2099-04-01', None, None)
+    add_stat(trends_db, player_id, match_id, team_id)
+    assert_consistent(trends_db)
+    trends_db.execute("UPDATE matches SET score_team1 = 3, score_team2 = 0 WHERE id = ?", (match_id,))
+    assert_consistent(trends_db)
+
+
+def test_delete_stats(trends_db):
+    player_id, team_id = first_player(trends_db)
+    for stat_id, in trends_db.fetch_all("SELECT id FROM player_stats WHERE player_id = ? ORDER BY id", (player_id,)):
+        trends_db.execute("DELETE FROM player_stats WHERE id = ?", (stat_id,))
+        assert_consistent(trends_db)
+
+
+def test_transfer_keeps_history(trends_db):
+    player_id, team_id = first_player(trends_db)
+    new_team = team_id % 4 + 1
+    before = trends_db.fetch_all("SELECT stat_id, won, drawn FROM player_form WHERE player_id = ? ORDER BY stat_id",
+                                 (player_id,))
+    trends_db.execute("UPDATE players SET team_id = ? WHERE id = ?", (new_team, player_id))
+    # Jaunā spēle par jauno komandu pret veco
+    add_stat(trends_db, player_id, add_match(trends_db, new_team, team_id, '2099-05-01', 3, 0), new_team)
+    assert_consistent(trends_db)
+    assert trends_db.fetch_all("SELECT stat_id, won, drawn FROM player_form WHERE player_id = ? ORDER BY stat_id",
+                               (player_id,))[:len(before)] == before
+    # Vecās komandas spēles rezultāta labojums joprojām attiecas uz veco komandu
+    old_match = trends_db.fetch_one("SELECT match_id FROM player_form WHERE stat_id = ?", (before[0][0],))[0]
+    trends_db.execute("UPDATE matches SET score_team1 = score_team2, score_team2 = score_team1 WHERE id = ?", (old_match,))
+    assert_consistent(trends_db)
+
+
+def test_trends_page(projekts, client):
+    player_id = projekts.db.fetch_one("SELECT player_id FROM player_form ORDER BY stat_id LIMIT 1")[0]
+    response = client.get(f'/player/{player_id}/trends?n=3')
+    assert response.status_code == 200
+    assert 'Forma' in response.get_data(as_text=True)
+    assert client.get('/player/999999/trends').status_code == 404